@@ -0,0 +1,247 @@
+"""
+Persistent quiz attempt and score store.
+- Append-only tables: an attempt row when a quiz starts, an answer row per
+  question as it is answered, a result row when the quiz ends. A crash
+  mid-quiz leaves a complete record of everything answered so far
+- SQLite in WAL mode with synchronous=FULL, so a committed batch survives
+  an application crash or power cut
+- All writes go through one background thread that commits whatever has
+  queued up in a single transaction, so the Tk thread never waits on disk.
+  If a statement fails, the batch is redone one write at a time so only
+  that write is lost; it is logged to stderr and returned by flush()
+- Per-learner / per-subject and per-subject totals are kept up to date in
+  the same transaction as each result, so dashboards read one row instead
+  of scanning the history (rebuild_aggregates() recomputes them)
+"""
+
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+MAX_BATCH = 500
+_STOP = object()
+
+
+def default_store_path():
+    return os.path.join(os.getcwd(), "progress", "quiz.sqlite")
+
+
+class BatchWriter(threading.Thread):
+    """Owns the only write connection; runs queued statements in batched transactions."""
+
+    def __init__(self, path):
+        super().__init__(name="progress-writer", daemon=True)
+        self.path = path
+        self.error = None           # the latest failure
+        self._failures = []         # (statement or function name, exception) since the last flush
+        self._failures_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._ready = threading.Event()
+        self.start()
+        self._ready.wait()
+
+    def execute(self, sql, params=()):
+        self._queue.put((sql, params))
+
+    def call(self, fn):
+        # fn(db) runs on the writer thread inside the current batch's transaction
+        self._queue.put((fn, None))
+
+    def flush(self):
+        # Waits for everything queued so far; returns the writes that failed since the last flush
+        self._queue.join()
+        with self._failures_lock:
+            failures, self._failures = self._failures, []
+        return failures
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self.join()
+
+    def run(self):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=FULL")
+        self._ready.set()
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(item is _STOP for item in batch)
+            writes = [item for item in batch if item is not _STOP]
+            try:
+                try:
+                    with db:
+                        for item in writes:
+                            self._apply(db, item)
+                except Exception:
+                    # The whole batch was rolled back: redo it one write at a time so only the bad one is lost
+                    for item in writes:
+                        try:
+                            with db:
+                                self._apply(db, item)
+                        except Exception as e:
+                            self._failed(item, e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        db.close()
+
+    @staticmethod
+    def _apply(db, item):
+        target, params = item
+        if callable(target):
+            target(db)
+        else:
+            db.execute(target, params)
+
+    def _failed(self, item, error):
+        target = item[0]
+        what = getattr(target, "__qualname__", None) or " ".join(target.split())[:80]
+        print(f"progress-writer: write dropped ({what}): {error!r}", file=sys.stderr)
+        self.error = error
+        with self._failures_lock:
+            self._failures.append((what, error))
+
+
+class AttemptStore:
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        db = sqlite3.connect(self.path)
+        db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS attempts (
+                id TEXT PRIMARY KEY, learner TEXT, subject TEXT, started REAL, total INTEGER);
+            CREATE TABLE IF NOT EXISTS answers (
+                attempt_id TEXT, seq INTEGER, position INTEGER, choice TEXT, correct INTEGER, answered REAL,
+                PRIMARY KEY (attempt_id, seq));
+            CREATE TABLE IF NOT EXISTS results (
+                attempt_id TEXT PRIMARY KEY, score INTEGER, total INTEGER, finished REAL);
+            CREATE TABLE IF NOT EXISTS learner_stats (
+                learner TEXT, subject TEXT, attempts INTEGER, questions INTEGER, correct INTEGER,
+                best_percent REAL, last_percent REAL, last_finished REAL, PRIMARY KEY (learner, subject));
+            CREATE TABLE IF NOT EXISTS subject_stats (
+                subject TEXT PRIMARY KEY, learners INTEGER, attempts INTEGER, questions INTEGER, correct INTEGER);
+            CREATE INDEX IF NOT EXISTS attempts_by_learner ON attempts (learner, started);
+        """)
+        db.commit()
+        db.close()
+        self.writer = BatchWriter(self.path)
+        # Reads (dashboards) use their own connection; WAL lets them run alongside the writer
+        self._lock = threading.Lock()
+        self._read_db = sqlite3.connect(self.path, check_same_thread=False)
+
+    # ---------- Writes (queued, return immediately) ----------
+
+    def start_attempt(self, learner, subject, total, started=None):
+        attempt_id = uuid.uuid4().hex
+        self.writer.execute("INSERT INTO attempts VALUES (?, ?, ?, ?, ?)",
+                            (attempt_id, learner, subject, started or time.time(), total))
+        return attempt_id
+
+    def record_answer(self, attempt_id, seq, position, choice, correct, answered=None):
+        self.writer.execute("INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                            (attempt_id, seq, position, choice, int(correct), answered or time.time()))
+
+    def finish_attempt(self, attempt_id, learner, subject, score, total, finished=None):
+        finished = finished or time.time()
+        percent = 100.0 * score / total if total else 0.0
+
+        def write(db):
+            db.execute("INSERT INTO results VALUES (?, ?, ?, ?)", (attempt_id, score, total, finished))
+            new_learner = db.execute("SELECT 1 FROM learner_stats WHERE learner = ? AND subject = ?",
+                                     (learner, subject)).fetchone() is None
+            db.execute("""
+                INSERT INTO learner_stats VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (learner, subject) DO UPDATE SET
+                    attempts = attempts + 1, questions = questions + excluded.questions,
+                    correct = correct + excluded.correct, best_percent = MAX(best_percent, excluded.best_percent),
+                    last_percent = excluded.last_percent, last_finished = excluded.last_finished
+            """, (learner, subject, total, score, percent, percent, finished))
+            db.execute("""
+                INSERT INTO subject_stats VALUES (?, 1, 1, ?, ?)
+                ON CONFLICT (subject) DO UPDATE SET
+                    learners = learners + ?, attempts = attempts + 1,
+                    questions = questions + excluded.questions, correct = correct + excluded.correct
+            """, (subject, total, score, int(new_learner)))
+
+        self.writer.call(write)
+
+    def flush(self):
+        # Returns the writes that failed since the last flush, see BatchWriter.flush
+        return self.writer.flush()
+
+    def pending_writes(self):
+        return self.writer.pending()
+
+    # ---------- Reads (precomputed) ----------
+
+    def learner_summary(self, learner):
+        # {subject: {"attempts", "questions", "correct", "average", "best", "last"}}
+        with self._lock:
+            rows = self._read_db.execute(
+                "SELECT subject, attempts, questions, correct, best_percent, last_percent FROM learner_stats"
+                " WHERE learner = ?", (learner,)).fetchall()
+        return {subject: {"attempts": attempts, "questions": questions, "correct": correct,
+                          "average": 100.0 * correct / questions if questions else 0.0,
+                          "best": best, "last": last}
+                for subject, attempts, questions, correct, best, last in rows}
+
+    def subject_summary(self):
+        with self._lock:
+            rows = self._read_db.execute(
+                "SELECT subject, learners, attempts, questions, correct FROM subject_stats").fetchall()
+        return {subject: {"learners": learners, "attempts": attempts,
+                          "average": 100.0 * correct / questions if questions else 0.0}
+                for subject, learners, attempts, questions, correct in rows}
+
+    def recent_attempts(self, learner, limit=20):
+        with self._lock:
+            return self._read_db.execute("""
+                SELECT a.subject, a.started, r.score, r.total FROM attempts a
+                LEFT JOIN results r ON r.attempt_id = a.id
+                WHERE a.learner = ? ORDER BY a.started DESC LIMIT ?
+            """, (learner, limit)).fetchall()
+
+    # ---------- Maintenance ----------
+
+    def rebuild_aggregates(self):
+        # Recompute the dashboard tables from the append-only history
+        def write(db):
+            db.execute("DELETE FROM learner_stats")
+            db.execute("DELETE FROM subject_stats")
+            db.execute("""
+                INSERT INTO learner_stats
+                SELECT a.learner, a.subject, COUNT(*), SUM(r.total), SUM(r.score),
+                       MAX(100.0 * r.score / MAX(r.total, 1)),
+                       (SELECT 100.0 * r2.score / MAX(r2.total, 1) FROM results r2 JOIN attempts a2
+                        ON a2.id = r2.attempt_id WHERE a2.learner = a.learner AND a2.subject = a.subject
+                        ORDER BY r2.finished DESC LIMIT 1),
+                       MAX(r.finished)
+                FROM attempts a JOIN results r ON r.attempt_id = a.id GROUP BY a.learner, a.subject
+            """)
+            db.execute("""
+                INSERT INTO subject_stats
+                SELECT subject, COUNT(*), SUM(attempts), SUM(questions), SUM(correct)
+                FROM learner_stats GROUP BY subject
+            """)
+
+        self.writer.call(write)
+        self.flush()
+
+    def close(self):
+        self.writer.close()
+        with self._lock:
+            self._read_db.close()
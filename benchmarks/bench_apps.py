@@ -0,0 +1,371 @@
+"""
+End-to-end benchmarks of the three Tk apps on synthetic data, for
+comparing commits. Each app is built on a real Tk root (a virtual X
+display is started with Xvfb when there is no $DISPLAY) and driven through
+its own methods: startup, switching subjects, the quiz flow, toggling the
+theme, refreshing and filtering the downloads list, and searching.
+
+- Data is generated at multiples of today's: --scales 1 10 100 builds
+  catalogs with 1x, 10x and 100x the records of content/<app>.jsonl (more
+  subjects and more of everything per subject) and a downloads library of
+  --files x scale small documents
+- Every timing includes the Tk work the call caused (events and redraws
+  are drained with update()), and is repeated --repeat times
+- Results are written as JSON (one record per app, metric and scale with
+  median, p95, min and max in ms) together with the commit they ran on;
+  --baseline compares medians with an earlier run and exits with status 1
+  when any metric got slower by more than --threshold
+
+    python benchmarks/bench_apps.py --scales 1 10 100 --out bench-main.json
+    python benchmarks/bench_apps.py --scales 1 10 100 --baseline bench-main.json --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+sys.path.insert(1, os.path.join(REPO, "damasapp3.py"))
+
+from catalog import catalog_path
+
+RESULTS_FORMAT = 1
+APPS = ("damas", "damasapp2", "damasapp3")
+# Differences below this are noise on any machine and never count as a regression
+NOISE_MS = 0.5
+SETTLE_TIMEOUT = 120.0
+
+
+# ---------- Synthetic data ----------
+
+def scaled_catalog(app, scale, path):
+    """Write a catalog with about `scale` times the records of the app's real one; returns record counts."""
+    with open(catalog_path(app), encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip() and not line.startswith("//")]
+    subjects = list(dict.fromkeys(rec["subject"] for rec in records))
+    # Grow both ways: sqrt(scale) times the subjects, each with the rest of the factor in records
+    copies = max(1, round(math.sqrt(scale)))
+    per_subject = max(1, round(scale / copies))
+    counts = {}
+    with open(path, "w", encoding="utf-8") as out:
+        for copy in range(copies):
+            for subject in subjects:
+                name = subject if copy == 0 else f"{subject} {copy + 1}"
+                own = [rec for rec in records if rec["subject"] == subject]
+                for n in range(per_subject):
+                    suffix = "" if n == 0 else f" {n + 1}"
+                    for rec in own:
+                        rec = dict(rec, subject=name)
+                        if rec["type"] == "topic":
+                            rec["topic"] += suffix
+                        elif rec["type"] == "resource":
+                            rec["name"] += suffix
+                            rec["url"] += f"#{n}" if n else ""
+                        else:
+                            rec["question"] += suffix
+                        counts[rec["type"]] = counts.get(rec["type"], 0) + 1
+                        out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    counts["subjects"] = copies * len(subjects)
+    return counts
+
+
+def vocabulary(app):
+    words = set()
+    with open(catalog_path(app), encoding="utf-8") as f:
+        for line in f:
+            words.update(w.strip(".,:;()!?\"'").lower() for w in line.split() if len(w) > 3 and w.isascii())
+    return sorted(w for w in words if w.isalpha())
+
+
+def synthetic_library(directory, count, words, seed=1):
+    # Small .txt and .pdf documents with catalog words in them, so content search has work to do
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(80, 400)))
+        base = f"{rng.choice(words).title()} past paper {2000 + i % 25} {i:06d}"
+        if i % 2:
+            with open(os.path.join(directory, base + ".txt"), "w", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            with open(os.path.join(directory, base + ".pdf"), "wb") as f:
+                f.write(b"%PDF-1.4\n1 0 obj<<>>stream\nBT (" + text.encode("ascii") + b") Tj ET\nendstream\n%%EOF\n")
+
+
+# ---------- Display ----------
+
+@contextlib.contextmanager
+def virtual_display():
+    if os.environ.get("DISPLAY"):
+        yield os.environ["DISPLAY"]
+        return
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise SystemExit("No display: install Xvfb (or run the benchmark under xvfb-run)")
+    read_fd, write_fd = os.pipe()
+    proc = subprocess.Popen([xvfb, "-displayfd", str(write_fd), "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+                            pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        number = f.readline().strip()
+    if not number:
+        proc.kill()
+        raise SystemExit("Xvfb did not start")
+    os.environ["DISPLAY"] = f":{number}"
+    try:
+        yield os.environ["DISPLAY"]
+    finally:
+        del os.environ["DISPLAY"]
+        proc.terminate()
+        proc.wait()
+
+
+# ---------- Timing ----------
+
+class Recorder:
+    def __init__(self, app, scale):
+        self.app = app
+        self.scale = scale
+        self.samples = {}
+
+    def time(self, root, metric, fn, *args):
+        start = time.perf_counter()
+        fn(*args)
+        # Events the call queued (tab changes) and the redraws it caused
+        root.update()
+        self.samples.setdefault(metric, []).append((time.perf_counter() - start) * 1000)
+
+    def results(self):
+        out = []
+        for metric, samples in self.samples.items():
+            ordered = sorted(samples)
+            out.append({"app": self.app, "metric": metric, "scale": self.scale, "unit": "ms", "n": len(samples),
+                        "median": round(statistics.median(ordered), 3),
+                        "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+                        "min": round(ordered[0], 3), "max": round(ordered[-1], 3)})
+        return out
+
+
+def settle(root, done, what):
+    # Let the app's idle stages and background threads finish before the next measurement
+    deadline = time.monotonic() + SETTLE_TIMEOUT
+    while not done():
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"timed out waiting for {what}")
+        root.update()
+        time.sleep(0.01)
+    root.update()
+
+
+# ---------- Scenarios ----------
+
+def bench_damas(rec, catalog, repeat):
+    import tkinter as tk
+    import damas
+    for _ in range(repeat):
+        root = tk.Tk()
+        root.geometry("1000x700")
+        start = time.perf_counter()
+        app = damas.EducationApp(root, catalog=catalog)
+        root.update()
+        rec.samples.setdefault("startup", []).append((time.perf_counter() - start) * 1000)
+        subjects = app.core.subjects(has="topics")
+        for subject in subjects:
+            rec.time(root, "subject_first_open", app.show_subject, subject)
+        for subject in subjects:
+            rec.time(root, "subject_switch", app.show_subject, subject)
+        app.core.close()
+        root.destroy()
+
+
+def bench_damasapp2(rec, catalog, repeat):
+    import tkinter as tk
+    import damasapp2
+    for _ in range(repeat):
+        root = tk.Tk()
+        root.geometry("1000x700")
+        start = time.perf_counter()
+        app = damasapp2.EducationApp(root, catalog=catalog)
+        root.update()
+        rec.samples.setdefault("startup", []).append((time.perf_counter() - start) * 1000)
+        subjects = app.core.subjects(has="topics")
+        for subject in subjects:
+            rec.time(root, "subject_first_open", app.show_subject, subject)
+        for subject in subjects:
+            rec.time(root, "subject_switch", app.show_subject, subject)
+
+        app.show_quiz_selection()
+        for subject in app.core.subjects(has="quizzes")[:3]:
+            # The quiz is picked on a worker thread; the sample runs until its page is up
+            start = time.perf_counter()
+            app.start_quiz(subject)
+            settle(root, lambda: app.quiz_loading is None, "quiz start")
+            rec.samples.setdefault("quiz_start", []).append((time.perf_counter() - start) * 1000)
+            while not app.quiz.finished:
+                app.answer_var.set(app.quiz.question()["options"][0])
+                rec.time(root, "quiz_answer", app.check_answer)
+                rec.time(root, "quiz_results" if app.quiz.finished else "quiz_next_question", app.show_question)
+        app.on_close()
+
+
+def bench_damasapp3(rec, catalog, repeat, words, files):
+    import tkinter as tk
+    import damasapp3
+    rng = random.Random(7)
+    for run in range(repeat):
+        root = tk.Tk()
+        root.geometry("1000x700")
+        start = time.perf_counter()
+        app = damasapp3.EducationalHub(root, catalog=catalog)
+        root.update()
+        rec.samples.setdefault("startup_window", []).append((time.perf_counter() - start) * 1000)
+        settle(root, lambda: app.library_watcher is not None and app.library_watcher.is_alive(), "startup stages")
+        rec.samples.setdefault("startup_ready", []).append((time.perf_counter() - start) * 1000)
+        settle(root, lambda: len(app.downloads_list.items) >= files, "the downloads list")
+        settle(root, lambda: app.fulltext.pending_count() == 0, "content indexing")
+
+        subjects = list(app.tab_frames)
+        for subject in subjects:
+            rec.time(root, "subject_first_open", app.notebook.select, app.tab_frames[subject])
+        for subject in subjects:
+            rec.time(root, "subject_switch", app.notebook.select, app.tab_frames[subject])
+        for _ in range(2):
+            rec.time(root, "theme_toggle", app.toggle_theme)
+
+        queries = [rng.choice(words) for _ in range(10)] + [rng.choice(words)[:-1] + "x" for _ in range(5)]
+        for n, query in enumerate(queries):
+            app.search_var.set(query)
+            # Typing schedules a debounced search; run it now instead
+            if app.search_after_id is not None:
+                root.after_cancel(app.search_after_id)
+            rec.time(root, "search_first" if n == 0 and run == 0 else "search", app.search_resources)
+        app.clear_search()
+
+        app.notebook.select(app.downloads_tab)
+        root.update()
+        for _ in range(3):
+            rec.time(root, "downloads_refresh", app.refresh_downloads)
+        for query in queries[:5]:
+            rec.time(root, "downloads_filter", app.downloads_list.set_filter, query)
+            app.download_search_var.set(query)
+            rec.time(root, "downloads_content_search", app.search_downloads)
+        app.clear_download_search()
+        app.on_close()
+
+
+def run_app(app, scale, args, work):
+    rec = Recorder(app, scale)
+    catalog_file = os.path.join(work, f"{app}-x{scale}.jsonl")
+    counts = scaled_catalog(app, scale, catalog_file)
+    cwd = os.getcwd()
+    # The apps keep downloads/ and progress/ in the working directory
+    app_dir = os.path.join(work, f"{app}-x{scale}")
+    os.makedirs(app_dir)
+    os.chdir(app_dir)
+    try:
+        if app == "damas":
+            bench_damas(rec, catalog_file, args.repeat)
+        elif app == "damasapp2":
+            bench_damasapp2(rec, catalog_file, args.repeat)
+        else:
+            words = vocabulary(app) + vocabulary("damasapp2")
+            synthetic_library(os.path.join(app_dir, "downloads"), args.files * scale, words)
+            counts["files"] = args.files * scale
+            bench_damasapp3(rec, catalog_file, args.repeat, words, counts["files"])
+    finally:
+        os.chdir(cwd)
+    return rec.results(), counts
+
+
+# ---------- Results ----------
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def compare(results, baseline, threshold):
+    # [(record, baseline median, ratio, regressed)] for metrics present in both runs
+    old = {(r["app"], r["metric"], r["scale"]): r["median"] for r in baseline["results"]}
+    rows = []
+    for r in results:
+        before = old.get((r["app"], r["metric"], r["scale"]))
+        if before is None:
+            continue
+        ratio = r["median"] / before if before else float("inf")
+        regressed = r["median"] > before * (1 + threshold) and r["median"] - before > NOISE_MS
+        rows.append((r, before, ratio, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Tk apps on synthetic data")
+    parser.add_argument("--apps", nargs="+", choices=APPS, default=list(APPS))
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="data size as a multiple of today's catalogs")
+    parser.add_argument("--files", type=int, default=200, help="downloaded files at scale 1")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh app instances per app and scale")
+    parser.add_argument("--out", help="write results as JSON here")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed slowdown of a median before it counts as a regression (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    commit, dirty = git_commit()
+    report = {"format": RESULTS_FORMAT, "commit": commit, "dirty": dirty,
+              "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+              "python": platform.python_version(), "platform": platform.platform(),
+              "repeat": args.repeat, "data": {}, "results": []}
+    with virtual_display(), tempfile.TemporaryDirectory() as work:
+        import tkinter
+        report["tk"] = str(tkinter.TkVersion)
+        for scale in args.scales:
+            for app in args.apps:
+                started = time.perf_counter()
+                results, counts = run_app(app, scale, args, work)
+                report["results"].extend(results)
+                report["data"][f"{app} x{scale}"] = counts
+                print(f"{app} x{scale}: {len(results)} metrics in {time.perf_counter() - started:.1f} s "
+                      f"({', '.join(f'{v} {k}' for k, v in counts.items())})", file=sys.stderr)
+
+    print(f"{'app':<10} {'scale':>5}  {'metric':<26} {'n':>4} {'median':>9} {'p95':>9} {'max':>9}")
+    for r in report["results"]:
+        print(f"{r['app']:<10} {r['scale']:>5}  {r['metric']:<26} {r['n']:>4} {r['median']:>9.2f} "
+              f"{r['p95']:>9.2f} {r['max']:>9.2f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report["results"], baseline, args.threshold)
+        print(f"\nagainst {baseline.get('commit') or args.baseline} (threshold +{args.threshold:.0%}):")
+        for r, before, ratio, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{r['app']:<10} {r['scale']:>5}  {r['metric']:<26} {before:>9.2f} -> {r['median']:>9.2f} ms "
+                  f"({ratio:.2f}x){flag}")
+        if any(regressed for *_, regressed in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Cost of keeping the downloads list current as the library grows.
+Creates N empty files in a temp directory and times the Treeview-backed
+DownloadsList: first fill, a no-change refresh, and single-row add /
+rename / remove / filter. Needs a display (use xvfb-run on a headless box).
+
+    xvfb-run python benchmarks/bench_downloads_view.py --sizes 100 1000 10000 50000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "damasapp3.py"))
+
+from downloads_view import DownloadsList
+
+
+def timed(root, fn):
+    start = time.perf_counter()
+    fn()
+    # Include Tk's own redraw work, not just the Python side
+    root.update_idletasks()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(root, count):
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(count):
+            open(os.path.join(directory, f"past_paper_{i:06d}.pdf"), "wb").close()
+        frame = tk.Frame(root)
+        frame.pack(fill=tk.BOTH, expand=True)
+        view = DownloadsList(frame, directory)
+        view.pack(fill=tk.BOTH, expand=True)
+
+        def refresh():
+            view.sync(os.listdir(directory))
+
+        results = {"files": count, "initial_fill_ms": timed(root, refresh), "refresh_ms": timed(root, refresh)}
+
+        open(os.path.join(directory, "zz_new.pdf"), "wb").close()
+        results["add_ms"] = timed(root, lambda: view.add("zz_new.pdf"))
+        os.rename(os.path.join(directory, "zz_new.pdf"), os.path.join(directory, "aa_new.pdf"))
+        results["rename_ms"] = timed(root, lambda: view.rename("zz_new.pdf", "aa_new.pdf"))
+        results["remove_ms"] = timed(root, lambda: view.remove("aa_new.pdf"))
+        results["filter_ms"] = timed(root, lambda: view.set_filter("0001"))
+        results["clear_filter_ms"] = timed(root, lambda: view.set_filter(""))
+        frame.destroy()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the downloads list")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.geometry("1000x700")
+    columns = ["files", "initial_fill_ms", "refresh_ms", "add_ms", "rename_ms", "remove_ms",
+               "filter_ms", "clear_filter_ms"]
+    print("".join(f"{c:>16}" for c in columns))
+    for count in args.sizes:
+        results = bench(root, count)
+        print("".join(f"{results[c]:>16.2f}" if c != "files" else f"{results[c]:>16}" for c in columns))
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
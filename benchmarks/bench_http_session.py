@@ -0,0 +1,70 @@
+"""
+Throughput of many small downloads: a bare requests.get per file (a new
+connection each time) versus the shared pooled session.
+
+    python benchmarks/bench_http_session.py --files 200 --size 20000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "damasapp3.py"))
+
+import requests
+
+from http_session import PooledSession
+from testserver import serve
+
+
+def fetch_bare(url):
+    resp = requests.get(url, timeout=30)
+    resp.raise_for_status()
+    return len(resp.content)
+
+
+def run(label, fetch, urls, workers):
+    start = time.perf_counter()
+    if workers == 1:
+        total = sum(fetch(url) for url in urls)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            total = sum(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(urls) / elapsed:8.1f} files/s {total / elapsed / 1e6:8.2f} MB/s  ({elapsed:.2f} s)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size", type=int, default=20000, help="bytes per file")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(args.files):
+            with open(os.path.join(directory, f"paper{i}.pdf"), "wb") as f:
+                f.write(os.urandom(args.size))
+        with serve(directory) as base_url:
+            urls = [f"{base_url}/paper{i}.pdf" for i in range(args.files)]
+            session = PooledSession(pool_per_host=args.workers)
+
+            def fetch_pooled(url):
+                resp = session.get(url)
+                resp.raise_for_status()
+                return len(resp.content)
+
+            print(f"{args.files} files x {args.size} bytes from {base_url}")
+            for workers in (1, args.workers):
+                bare = run(f"bare requests.get  x{workers}", fetch_bare, urls, workers)
+                pooled = run(f"pooled session     x{workers}", fetch_pooled, urls, workers)
+                print(f"{'speed-up':<28} {bare / pooled:8.2f}x")
+            session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Load test for the classroom server (hub_server.py) on localhost: many
+keep-alive clients browsing subjects and topics, searching, revalidating
+with ETags and taking quizzes, all at once.
+
+    python benchmarks/bench_hub_server.py --clients 300 --requests 50
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import Catalog
+from hub_server import serve
+
+SEARCHES = ["hisabati", "math", "physics", "past papers", "vitabu", "chemistry", "biolgy", "english"]
+
+
+class Client:
+    """One keep-alive connection speaking just enough HTTP/1.1 for the benchmark."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+        self.etags = {}
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b""
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", "Accept-Encoding: gzip",
+                f"Content-Length: {len(data)}"]
+        if method == "GET" and path in self.etags:
+            head.append(f"If-None-Match: {self.etags[path]}")
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+        status_line, headers = await self._read_head()
+        payload = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        status = int(status_line.split()[1])
+        if "etag" in headers:
+            self.etags[path] = headers["etag"]
+        if headers.get("content-encoding") == "gzip":
+            payload = gzip.decompress(payload)
+        return status, json.loads(payload) if payload and headers.get("content-type", "").startswith(
+            "application/json") else payload
+
+    async def _read_head(self):
+        lines = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        return lines[0], headers
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def browse(client, rng, subjects, topics, quiz_subjects, requests, latencies, statuses):
+    # A learner session: mostly reading, some searching, now and then a quiz answer
+    quiz = None
+    for _ in range(requests):
+        roll = rng.random()
+        if quiz is not None and roll < 0.2:
+            method, path = "POST", f"/quizzes/{quiz['id']}/answer"
+            body = {"choice": rng.choice(quiz["options"])}
+        elif quiz_subjects and roll < 0.25:
+            method, path, body = "POST", "/quizzes", {"subject": rng.choice(quiz_subjects),
+                                                      "learner": f"bench{id(client) % 1000}"}
+        elif roll < 0.45:
+            method, path, body = "GET", f"/search?q={quote(rng.choice(SEARCHES))}", None
+        elif roll < 0.75 and topics:
+            subject, topic = rng.choice(topics)
+            method, path, body = "GET", f"/subjects/{quote(subject)}/topics/{quote(topic)}", None
+        else:
+            method, path, body = "GET", f"/subjects/{quote(rng.choice(subjects))}/resources", None
+        start = time.perf_counter()
+        status, payload = await client.request(method, path, body)
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if method == "POST" and status == 200:
+            quiz = None if payload.get("finished") else payload
+
+
+async def load(base_url, catalog_name, clients, requests, seed):
+    url = urlsplit(base_url)
+    catalog = Catalog(catalog_name)
+    subjects = catalog.subjects()
+    topics = [(s, t) for s in catalog.subjects(has="topics") for t in catalog.topic_names(s)]
+    quiz_subjects = catalog.subjects(has="quizzes")
+    catalog.close()
+    rng = random.Random(seed)
+    pool = [Client(url.hostname, url.port) for _ in range(clients)]
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(browse(c, random.Random(rng.random()), subjects, topics, quiz_subjects,
+                                      requests, latencies, statuses) for c in pool))
+    finally:
+        for c in pool:
+            c.close()
+    return time.perf_counter() - start, latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--catalog", default="damasapp2")
+    parser.add_argument("--clients", type=int, default=300, help="concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        with serve(args.catalog, progress_path=os.path.join(directory, "quiz.sqlite")) as base_url:
+            elapsed, latencies, statuses = asyncio.run(
+                load(base_url, args.catalog, args.clients, args.requests, args.seed))
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:.0f} req/s)")
+    print(f"latency ms: median {statistics.median(latencies) * 1000:.2f}  p95 {pct(0.95):.2f}  "
+          f"p99 {pct(0.99):.2f}  max {latencies[-1] * 1000:.2f}")
+    print("status counts:", dict(sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
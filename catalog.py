@@ -0,0 +1,260 @@
+"""
+On-disk content catalog shared by the Education Hub apps.
+
+The source of truth is a JSON Lines file under content/ (one record per
+line, easy to edit and diff):
+
+    {"type": "topic", "subject": "Mathematics", "topic": "Algebra",
+     "description": "...", "examples": ["..."]}
+    {"type": "resource", "subject": "Mathematics", "name": "...", "url": "..."}
+    {"type": "quiz", "subject": "Mathematics", "question": "...",
+     "options": ["..."], "answer": "..."}
+
+On first use (and whenever the JSONL changes) it is compiled into an SQLite
+file next to it. After that, startup only reads the subject index; topic
+bodies, resource lists and quiz banks are fetched the first time they are
+asked for and then kept in memory.
+
+Every quiz question also gets a stable id, a hash of its text, options and
+answer, so that state kept about a question (a learner's review schedule)
+follows it when the bank is edited or reordered; positions only say where
+it is now. Ids are unique within a subject: a question repeated word for
+word is told apart by which repeat it is.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content")
+SCHEMA_VERSION = 4
+
+SCHEMA = """
+    CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+    CREATE TABLE subjects (name TEXT PRIMARY KEY, position INTEGER,
+                           topics INTEGER DEFAULT 0, resources INTEGER DEFAULT 0, quizzes INTEGER DEFAULT 0);
+    CREATE TABLE topics (subject TEXT, name TEXT, position INTEGER, description TEXT, examples TEXT,
+                         PRIMARY KEY (subject, name));
+    CREATE TABLE resources (subject TEXT, position INTEGER, name TEXT, url TEXT);
+    CREATE TABLE quizzes (id INTEGER PRIMARY KEY, subject TEXT, position INTEGER, question TEXT, options TEXT,
+                          answer TEXT, qid TEXT);
+    CREATE INDEX topics_by_subject ON topics (subject, position);
+    CREATE INDEX resources_by_subject ON resources (subject, position);
+    CREATE UNIQUE INDEX quizzes_by_subject ON quizzes (subject, position);
+    CREATE UNIQUE INDEX quizzes_by_qid ON quizzes (subject, qid);
+"""
+
+
+def question_id(question, options=(), answer="", repeat=0):
+    # Stable across edits elsewhere in the bank and reordering; a reworded question (or changed options or
+    # answer) is a new question. repeat numbers identical questions within a subject, from 0
+    def normal(text):
+        return " ".join(str(text).split())
+    key = "\x1f".join([normal(question), normal(answer), *map(normal, options)])
+    if repeat:
+        key += f"\x1e{repeat}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def catalog_path(name):
+    return os.path.join(CONTENT_DIR, f"{name}.jsonl")
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return f"{SCHEMA_VERSION}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def compile_catalog(source, target):
+    # JSONL -> SQLite, written to a temp file and swapped in so readers never see half a catalog
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+    os.close(fd)
+    db = sqlite3.connect(tmp)
+    try:
+        db.executescript(SCHEMA)
+        _load_records(db, source)
+        db.execute("INSERT INTO meta VALUES ('source', ?)", (_source_stamp(source),))
+        db.commit()
+    finally:
+        db.close()
+    os.replace(tmp, target)
+
+
+def _load_records(db, source):
+    subjects = {}
+    counts = {}
+    repeats = {}        # (subject, question id) -> times seen, for identical questions
+    with open(source, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("//"):
+                continue
+            try:
+                rec = json.loads(line)
+                kind = rec["type"]
+                subject = rec["subject"]
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"{source}:{line_no}: bad catalog record ({e})") from None
+            if subject not in subjects:
+                subjects[subject] = {"topics": 0, "resources": 0, "quizzes": 0}
+            position = counts.get((kind, subject), 0)
+            counts[(kind, subject)] = position + 1
+            if kind == "topic":
+                db.execute("INSERT OR REPLACE INTO topics VALUES (?, ?, ?, ?, ?)",
+                           (subject, rec["topic"], position, rec.get("description", ""),
+                            json.dumps(rec.get("examples", []), ensure_ascii=False)))
+                subjects[subject]["topics"] += 1
+            elif kind == "resource":
+                db.execute("INSERT INTO resources VALUES (?, ?, ?, ?)",
+                           (subject, position, rec["name"], rec["url"]))
+                subjects[subject]["resources"] += 1
+            elif kind == "quiz":
+                qid = question_id(rec["question"], rec["options"], rec["answer"])
+                repeat = repeats.get((subject, qid), 0)
+                repeats[(subject, qid)] = repeat + 1
+                if repeat:
+                    qid = question_id(rec["question"], rec["options"], rec["answer"], repeat)
+                db.execute("INSERT INTO quizzes (subject, position, question, options, answer, qid)"
+                           " VALUES (?, ?, ?, ?, ?, ?)",
+                           (subject, position, rec["question"], json.dumps(rec["options"], ensure_ascii=False),
+                            rec["answer"], qid))
+                subjects[subject]["quizzes"] += 1
+            else:
+                raise ValueError(f"{source}:{line_no}: unknown record type {kind!r}")
+    db.executemany("INSERT INTO subjects VALUES (?, ?, ?, ?, ?)",
+                   [(name, i, c["topics"], c["resources"], c["quizzes"])
+                    for i, (name, c) in enumerate(subjects.items())])
+
+
+class Catalog:
+    def __init__(self, name_or_path):
+        source = name_or_path if name_or_path.endswith(".jsonl") else catalog_path(name_or_path)
+        self.source = source
+        self.db_path = source[:-len(".jsonl")] + ".sqlite"
+        # One connection shared by every thread that reads (the server runs queries on worker threads)
+        self._lock = threading.Lock()
+        self._db = self._open()
+        self._topics = {}
+        self._resources = {}
+        self._quizzes = {}
+
+    def _open(self):
+        try:
+            if not self._is_current():
+                compile_catalog(self.source, self.db_path)
+            return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        except OSError:
+            # Read-only install: build the index in memory instead
+            db = sqlite3.connect(":memory:", check_same_thread=False)
+            db.executescript(SCHEMA)
+            _load_records(db, self.source)
+            return db
+
+    def _is_current(self):
+        if not os.path.exists(self.db_path):
+            return False
+        try:
+            db = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            try:
+                row = db.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+            finally:
+                db.close()
+        except sqlite3.Error:
+            return False
+        return row is not None and row[0] == _source_stamp(self.source)
+
+    # ---------- Subject index (cheap, read at startup) ----------
+
+    def subjects(self, has=None):
+        # has: "topics", "resources" or "quizzes" to list only subjects with that kind of content
+        if has not in (None, "topics", "resources", "quizzes"):
+            raise ValueError(f"unknown content kind: {has!r}")
+        where = f" WHERE {has} > 0" if has else ""
+        with self._lock:
+            return [row[0] for row in self._db.execute(f"SELECT name FROM subjects{where} ORDER BY position")]
+
+    def topic_names(self, subject):
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                "SELECT name FROM topics WHERE subject = ? ORDER BY position", (subject,))]
+
+    def quiz_count(self, subject):
+        with self._lock:
+            row = self._db.execute("SELECT quizzes FROM subjects WHERE name = ?", (subject,)).fetchone()
+        return row[0] if row else 0
+
+    # ---------- Lazily fetched bodies ----------
+
+    def topic(self, subject, topic):
+        key = (subject, topic)
+        if key not in self._topics:
+            with self._lock:
+                row = self._db.execute("SELECT description, examples FROM topics WHERE subject = ? AND name = ?",
+                                       key).fetchone()
+            if row is None:
+                raise KeyError(key)
+            self._topics[key] = {"description": row[0], "examples": json.loads(row[1])}
+        return self._topics[key]
+
+    def resources(self, subject):
+        if subject not in self._resources:
+            with self._lock:
+                rows = self._db.execute("SELECT name, url FROM resources WHERE subject = ? ORDER BY position",
+                                        (subject,)).fetchall()
+            self._resources[subject] = [{"name": name, "url": url} for name, url in rows]
+        return self._resources[subject]
+
+    def iter_resources(self):
+        # (subject, {"name", "url"}) for the whole catalog, for index builders
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.subject, r.name, r.url FROM resources r JOIN subjects s ON s.name = r.subject"
+                " ORDER BY s.position, r.position").fetchall()
+        for subject, name, url in rows:
+            yield subject, {"name": name, "url": url}
+
+    def quiz_question(self, subject, position):
+        # One question by its index in the subject's bank (0 .. quiz_count - 1), without loading the bank
+        with self._lock:
+            row = self._db.execute("SELECT question, options, answer, qid FROM quizzes"
+                                   " WHERE subject = ? AND position = ?", (subject, position)).fetchone()
+        if row is None:
+            raise KeyError((subject, position))
+        return {"question": row[0], "options": json.loads(row[1]), "answer": row[2], "id": row[3]}
+
+    def quiz_id(self, subject, position):
+        with self._lock:
+            row = self._db.execute("SELECT qid FROM quizzes WHERE subject = ? AND position = ?",
+                                   (subject, position)).fetchone()
+        if row is None:
+            raise KeyError((subject, position))
+        return row[0]
+
+    def quiz_positions(self, subject, ids):
+        # {question id: current position} for the ids still in the subject's bank
+        ids = list(ids)
+        found = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            with self._lock:
+                found.update(self._db.execute(
+                    f"SELECT qid, position FROM quizzes WHERE subject = ? AND qid IN ({','.join('?' * len(chunk))})",
+                    [subject, *chunk]).fetchall())
+        return found
+
+    def quiz_bank(self, subject):
+        if subject not in self._quizzes:
+            with self._lock:
+                rows = self._db.execute("SELECT question, options, answer, qid FROM quizzes WHERE subject = ?"
+                                        " ORDER BY position", (subject,)).fetchall()
+            self._quizzes[subject] = [{"question": question, "options": json.loads(options), "answer": answer,
+                                       "id": qid}
+                                      for question, options, answer, qid in rows]
+        return self._quizzes[subject]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -1,138 +1,47 @@
+# First, so that --profile-startup can time every import below
+import sys
+from startup import profile as startup, profile_from_command_line
+if __name__ == "__main__":
+    profile_from_command_line(sys.argv)
+
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import json
-import webbrowser
+from tkinter import ttk
 import random
-import textwrap
+
+from hub_core import HubCore
+from view_cache import ViewCache
+from perf import timed, trace_from_command_line
+from perf_overlay import PerfOverlay
+from stall_watchdog import StallWatchdog, wanted as watchdog_wanted
+from quiz_engine import DEFAULT_LEARNER
 
 class EducationApp:
-    def __init__(self, root):
+    def __init__(self, root, catalog="damasapp2", watchdog=True):
         self.root = root
         self.root.title("Python Education Hub")
         self.root.geometry("1000x700")
         self.root.configure(bg='#f0f8ff')
-        
-        # Educational content
-        self.content = {
-            "Mathematics": {
-                "Algebra": {
-                    "description": "Algebra is the study of mathematical symbols and rules for manipulating these symbols. It's a unifying thread of almost all of mathematics.",
-                    "examples": [
-                        "Solve for x: 2x + 5 = 11 → x = 3",
-                        "Quadratic formula: x = [-b ± √(b² - 4ac)] / 2a",
-                        "Linear equation: y = mx + b"
-                    ]
-                },
-                "Geometry": {
-                    "description": "Geometry is a branch of mathematics concerned with questions of shape, size, relative position of figures, and properties of space.",
-                    "examples": [
-                        "Area of a circle = πr²",
-                        "Pythagorean theorem: a² + b² = c²",
-                        "Volume of a sphere = (4/3)πr³"
-                    ]
-                },
-                "Calculus": {
-                    "description": "Calculus is the mathematical study of continuous change, in the same way that geometry is the study of shape and algebra is the study of generalizations of arithmetic operations.",
-                    "examples": [
-                        "Derivative of x² is 2x",
-                        "Integral of 2x is x² + C",
-                        "Fundamental Theorem of Calculus"
-                    ]
-                }
-            },
-            "Science": {
-                "Physics": {
-                    "description": "Physics is the natural science that studies matter, its motion and behavior through space and time, and the related entities of energy and force.",
-                    "examples": [
-                        "Newton's Second Law: F = ma",
-                        "Law of Gravitation: F = G(m₁m₂)/r²",
-                        "Einstein's E = mc²"
-                    ]
-                },
-                "Chemistry": {
-                    "description": "Chemistry is the scientific discipline involved with elements and compounds composed of atoms, molecules and ions: their composition, structure, properties, behavior and the changes they undergo during a reaction with other substances.",
-                    "examples": [
-                        "Water chemical formula: H₂O",
-                        "Periodic Table of Elements",
-                        "Chemical reaction: 2H₂ + O₂ → 2H₂O"
-                    ]
-                },
-                "Biology": {
-                    "description": "Biology is the natural science that studies life and living organisms, including their physical structure, chemical processes, molecular interactions, physiological mechanisms, development and evolution.",
-                    "examples": [
-                        "Mitosis: Process of cell division",
-                        "DNA structure: Double helix",
-                        "Photosynthesis: 6CO₂ + 6H₂O → C₆H₁₂O₆ + 6O₂"
-                    ]
-                }
-            },
-            "Programming": {
-                "Python": {
-                    "description": "Python is an interpreted, high-level, general-purpose programming language. Created by Guido van Rossum and first released in 1991, Python's design philosophy emphasizes code readability with its notable use of significant whitespace.",
-                    "examples": [
-                        "for i in range(5):\n    print('Hello, World!')",
-                        "def factorial(n):\n    return 1 if n == 0 else n * factorial(n-1)",
-                        "numbers = [1, 2, 3, 4, 5]\nsquares = [x**2 for x in numbers]"
-                    ]
-                },
-                "Data Structures": {
-                    "description": "Data structures are specialized formats for organizing, processing, retrieving and storing data. There are several basic and advanced types of data structures, all designed to arrange data to suit a specific purpose.",
-                    "examples": [
-                        "Stack follows LIFO (Last-In-First-Out) principle",
-                        "Queue follows FIFO (First-In-First-Out) principle",
-                        "Binary Search Tree: left child < parent < right child"
-                    ]
-                },
-                "Algorithms": {
-                    "description": "An algorithm is a step-by-step procedure to solve a problem or accomplish some end. There are many types of algorithms including sorting, searching, graph algorithms, and more.",
-                    "examples": [
-                        "Binary Search algorithm has O(log n) time complexity",
-                        "Bubble Sort: repeatedly swapping adjacent elements",
-                        "Dijkstra's algorithm for shortest path finding"
-                    ]
-                }
-            }
-        }
-        
-        # Resources links
-        self.resources = {
-            "Mathematics": [
-                {"name": "Khan Academy Math", "url": "https://www.khanacademy.org/math"},
-                {"name": "Math is Fun", "url": "https://www.mathsisfun.com/"},
-                {"name": "Wolfram MathWorld", "url": "https://mathworld.wolfram.com/"}
-            ],
-            "Science": [
-                {"name": "Khan Academy Science", "url": "https://www.khanacademy.org/science"},
-                {"name": "PhET Simulations", "url": "https://phet.colorado.edu/"},
-                {"name": "NASA STEM Engagement", "url": "https://www.nasa.gov/stem"}
-            ],
-            "Programming": [
-                {"name": "Codecademy", "url": "https://www.codecademy.com/"},
-                {"name": "freeCodeCamp", "url": "https://www.freecodecamp.org/"},
-                {"name": "W3Schools Python", "url": "https://www.w3schools.com/python/"}
-            ]
-        }
-        
-        # Quiz questions
-        self.quizzes = {
-            "Mathematics": [
-                {"question": "What is the value of π (pi) approximately?", "options": ["3.14", "2.71", "1.62", "4.13"], "answer": "3.14"},
-                {"question": "What is the derivative of x²?", "options": ["2x", "x²", "2", "x"], "answer": "2x"},
-                {"question": "What is the Pythagorean theorem?", "options": ["a² + b² = c²", "E = mc²", "F = ma", "V = IR"], "answer": "a² + b² = c²"}
-            ],
-            "Science": [
-                {"question": "What is the chemical formula for water?", "options": ["H₂O", "CO₂", "NaCl", "O₂"], "answer": "H₂O"},
-                {"question": "What is Newton's Second Law?", "options": ["F = ma", "E = mc²", "PV = nRT", "V = IR"], "answer": "F = ma"},
-                {"question": "What is the powerhouse of the cell?", "options": ["Mitochondria", "Nucleus", "Ribosome", "Golgi Apparatus"], "answer": "Mitochondria"}
-            ],
-            "Programming": [
-                {"question": "Which keyword is used to define a function in Python?", "options": ["def", "function", "define", "func"], "answer": "def"},
-                {"question": "Which data structure uses LIFO?", "options": ["Stack", "Queue", "Array", "Linked List"], "answer": "Stack"},
-                {"question": "What does OOP stand for?", "options": ["Object-Oriented Programming", "Object-Option Programming", "Objective-Oriented Protocol", "Object-Ordered Programming"], "answer": "Object-Oriented Programming"}
-            ]
-        }
+        # Anything that blocks the event loop for more than 250 ms is logged with its stack
+        self.watchdog = StallWatchdog(self.root, enabled=watchdog).start()
+        
+        # Topics, examples, links and quiz banks live in content/damasapp2.jsonl behind the
+        # headless core (hub_core); only the subject index is read here, the rest on first open.
+        # Quizzes are drawn per learner from the bank (spaced repetition, see quiz_engine);
+        # attempts, answers and scores are saved in the background to progress/quiz.sqlite
+        self.core = HubCore(catalog)
+        self.learner_var = tk.StringVar(value=DEFAULT_LEARNER)
+        self.quiz_loading = None    # queue receiving the quiz being started on a worker thread
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        startup.mark("catalog opened")
         
         self.setup_ui()
+        # F12: frame rate, widget count, page and question times and answers waiting to be saved
+        self.perf_overlay = PerfOverlay(self.root, spans=["show_subject", "show_question", "check_answer"],
+                                        queues={"answers to save": self.core.pending_writes})
+        startup.mark("window built")
+        self.root.after_idle(startup.ready)
         
     def setup_ui(self):
         # Header
@@ -156,7 +65,7 @@ class EducationApp:
                 fg='white', bg='#34495e').pack(pady=20)
         
         # Subject buttons
-        for subject in self.content.keys():
+        for subject in self.core.subjects(has="topics"):
             btn = tk.Button(left_frame, text=subject, font=('Arial', 12), 
                            command=lambda s=subject: self.show_subject(s),
                            bg='#3498db', fg='white', relief=tk.FLAT, width=15)
@@ -174,15 +83,18 @@ class EducationApp:
         # Right content area
         self.right_frame = tk.Frame(main_frame, bg='white')
         self.right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        # Pages are built once and swapped in and out afterwards
+        self.views = ViewCache(self.right_frame)
         
         # Initial content
         self.show_welcome()
         
     def show_welcome(self):
-        # Clear right frame
-        for widget in self.right_frame.winfo_children():
-            widget.destroy()
+        self.views.show("welcome", self.build_welcome)
+        # A new quote each visit; the page itself is reused
+        self.quote_label.configure(text=random.choice(self.quotes))
         
+    def build_welcome(self, page):
         # Welcome message
         welcome_text = """
         Welcome to the Python Education Hub!
@@ -203,189 +115,229 @@ class EducationApp:
         Click on any topic to learn more about it.
         """
         
-        welcome_label = tk.Label(self.right_frame, text=welcome_text, font=('Arial', 14), 
+        welcome_label = tk.Label(page, text=welcome_text, font=('Arial', 14), 
                                 bg='white', justify=tk.LEFT)
         welcome_label.pack(pady=50, padx=30)
         
         # Add some decorative elements
-        quote_frame = tk.Frame(self.right_frame, bg='#e8f4f8', relief=tk.RIDGE, bd=1)
+        quote_frame = tk.Frame(page, bg='#e8f4f8', relief=tk.RIDGE, bd=1)
         quote_frame.pack(fill=tk.X, padx=30, pady=10)
         
-        quotes = [
+        self.quotes = [
             "Education is the most powerful weapon which you can use to change the world. - Nelson Mandela",
             "The beautiful thing about learning is that no one can take it away from you. - B.B. King",
             "Live as if you were to die tomorrow. Learn as if you were to live forever. - Mahatma Gandhi"
         ]
         
-        quote_label = tk.Label(quote_frame, text=random.choice(quotes), 
-                              font=('Arial', 12, 'italic'), bg='#e8f4f8', 
-                              wraplength=600, justify=tk.CENTER)
-        quote_label.pack(pady=15)
+        self.quote_label = tk.Label(quote_frame, font=('Arial', 12, 'italic'), bg='#e8f4f8', 
+                                   wraplength=600, justify=tk.CENTER)
+        self.quote_label.pack(pady=15)
         
+    @timed("show_subject")
     def show_subject(self, subject):
-        # Clear right frame
-        for widget in self.right_frame.winfo_children():
-            widget.destroy()
+        self.views.show(("subject", subject), lambda page: self.build_subject(page, subject))
+        
+    def build_subject(self, page, subject):
+        # Only needed once a subject page exists, so it stays out of startup
+        import webbrowser
         
         # Subject title
-        title = tk.Label(self.right_frame, text=subject, font=('Arial', 20, 'bold'), 
+        title = tk.Label(page, text=subject, font=('Arial', 20, 'bold'), 
                         bg='white', fg='#2c3e50')
         title.pack(pady=20)
         
         # Topics notebook
-        notebook = ttk.Notebook(self.right_frame)
+        notebook = ttk.Notebook(page)
         notebook.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
         
-        # Add tabs for each topic
-        for topic, info in self.content[subject].items():
+        # One empty tab per topic; a tab is filled the first time it is selected
+        placeholders = {}
+        for topic in self.core.topic_names(subject):
             topic_frame = tk.Frame(notebook, bg='white')
             notebook.add(topic_frame, text=topic)
-            
-            # Topic content with scrollbar
-            canvas = tk.Canvas(topic_frame, bg='white')
-            scrollbar = ttk.Scrollbar(topic_frame, orient="vertical", command=canvas.yview)
-            scrollable_frame = tk.Frame(canvas, bg='white')
-            
-            scrollable_frame.bind(
-                "<Configure>",
-                lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-            )
-            
-            canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-            canvas.configure(yscrollcommand=scrollbar.set)
-            
-            # Topic description
-            desc_label = tk.Label(scrollable_frame, text=info["description"], font=('Arial', 12), 
-                                 bg='white', wraplength=600, justify=tk.LEFT)
-            desc_label.pack(pady=20, padx=20, anchor="w")
-            
-            # Examples
-            tk.Label(scrollable_frame, text="Examples:", font=('Arial', 14, 'bold'), 
-                    bg='white').pack(pady=(20, 10), padx=20, anchor="w")
-            
-            for example in info["examples"]:
-                example_frame = tk.Frame(scrollable_frame, bg='#f9f9f9', relief=tk.SUNKEN, bd=1)
-                example_frame.pack(fill=tk.X, padx=20, pady=5)
-                
-                example_label = tk.Label(example_frame, text=example, font=('Courier', 11), 
-                                        bg='#f9f9f9', justify=tk.LEFT, wraplength=600)
-                example_label.pack(pady=10, padx=10, anchor="w")
-            
-            canvas.pack(side="left", fill="both", expand=True)
-            scrollbar.pack(side="right", fill="y")
+            placeholders[str(topic_frame)] = (topic_frame, topic)
+        
+        def on_tab_changed(event):
+            selected = placeholders.pop(notebook.select(), None)
+            if selected is not None:
+                self.fill_topic_tab(selected[0], subject, selected[1])
+        
+        notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+        if placeholders:
+            on_tab_changed(None)
         
         # Resources section
-        resources_frame = tk.Frame(self.right_frame, bg='white')
+        resources_frame = tk.Frame(page, bg='white')
         resources_frame.pack(fill=tk.X, pady=20)
         
         tk.Label(resources_frame, text="Additional Resources:", font=('Arial', 14, 'bold'), 
                 bg='white').pack(pady=(20, 10))
         
-        for resource in self.resources[subject]:
+        for resource in self.core.resources(subject):
             btn = tk.Button(resources_frame, text=resource["name"], font=('Arial', 12),
                            command=lambda r=resource: webbrowser.open(r["url"]),
                            bg='#2ecc71', fg='white', relief=tk.FLAT, width=20)
             btn.pack(pady=5)
             
-    def show_quiz_selection(self):
-        # Clear right frame
-        for widget in self.right_frame.winfo_children():
-            widget.destroy()
+    def fill_topic_tab(self, topic_frame, subject, topic):
+        from topic_view import TopicBody
+        
+        info = self.core.topic(subject, topic)
+        
+        # Topic content, drawn as canvas items for the visible part only
+        blocks = [("body", info["description"]), ("heading", "Examples:")]
+        blocks.extend(("example", example) for example in info["examples"])
+        TopicBody(topic_frame, blocks).pack()
             
-        title = tk.Label(self.right_frame, text="Select a Quiz", font=('Arial', 20, 'bold'), 
+    def show_quiz_selection(self):
+        self.views.show("quiz_selection", self.build_quiz_selection)
+        
+    def build_quiz_selection(self, page):
+        title = tk.Label(page, text="Select a Quiz", font=('Arial', 20, 'bold'), 
                         bg='white', fg='#2c3e50')
         title.pack(pady=20)
         
-        instruction = tk.Label(self.right_frame, 
+        instruction = tk.Label(page, 
                               text="Choose a subject to test your knowledge:", 
                               font=('Arial', 14), bg='white')
         instruction.pack(pady=10)
         
-        for subject in self.quizzes.keys():
-            btn = tk.Button(self.right_frame, text=subject, font=('Arial', 14),
+        # Scores and review schedules are kept per learner
+        name_frame = tk.Frame(page, bg='white')
+        name_frame.pack(pady=5)
+        tk.Label(name_frame, text="Your name:", font=('Arial', 12), bg='white').pack(side=tk.LEFT, padx=5)
+        tk.Entry(name_frame, textvariable=self.learner_var, font=('Arial', 12), width=20).pack(side=tk.LEFT)
+        
+        for subject in self.core.subjects(has="quizzes"):
+            btn = tk.Button(page, text=subject, font=('Arial', 14),
                            command=lambda s=subject: self.start_quiz(s),
                            bg='#9b59b6', fg='white', relief=tk.RAISED, width=20)
             btn.pack(pady=10)
             
     def start_quiz(self, subject):
-        # Clear right frame
-        for widget in self.right_frame.winfo_children():
-            widget.destroy()
-            
+        if self.quiz_loading is not None:
+            return
+        learner = self.learner_var.get().strip() or DEFAULT_LEARNER
+        # The last quiz's results may still be queued for the background writer, and picking waits for
+        # them too, so the wait and the reads run on a worker thread; the quiz opens once they are done
+        loading = self.quiz_loading = queue.Queue(maxsize=1)
+        
+        def load():
+            try:
+                self.core.store.flush()
+                # Totals before this attempt (precomputed, one row); the results page adds this attempt to them
+                previous = self.core.learner_summary(learner).get(subject)
+                loading.put((previous, self.core.start_quiz(subject, learner=learner), None))
+            except Exception as e:
+                loading.put((None, None, e))
+                
+        threading.Thread(target=load, name="quiz-start", daemon=True).start()
+        self.root.after(20, self.open_quiz, subject)
+        
+    def open_quiz(self, subject):
+        try:
+            previous, quiz, error = self.quiz_loading.get_nowait()
+        except queue.Empty:
+            self.root.after(20, self.open_quiz, subject)
+            return
+        self.quiz_loading = None
+        if error is not None:
+            raise error
         self.quiz_subject = subject
-        self.quiz_questions = self.quizzes[subject].copy()
-        random.shuffle(self.quiz_questions)
-        self.current_question = 0
-        self.score = 0
+        self.previous_stats = previous
+        self.quiz = quiz
         
+        # The quiz page is built once; each question only swaps its texts and options
+        self.views.show("quiz", self.build_quiz_page)
         self.show_question()
         
-    def show_question(self):
-        # Clear right frame
-        for widget in self.right_frame.winfo_children():
-            widget.destroy()
-            
-        if self.current_question >= len(self.quiz_questions):
-            self.show_quiz_results()
-            return
-            
-        question_data = self.quiz_questions[self.current_question]
-        
+    def build_quiz_page(self, page):
         # Question number
-        title = tk.Label(self.right_frame, 
-                        text=f"Question {self.current_question + 1} of {len(self.quiz_questions)}",
-                        font=('Arial', 16), bg='white')
-        title.pack(pady=10)
+        self.quiz_title = tk.Label(page, font=('Arial', 16), bg='white')
+        self.quiz_title.pack(pady=10)
         
         # Question text
-        question_label = tk.Label(self.right_frame, text=question_data["question"], 
-                                 font=('Arial', 14), bg='white', wraplength=600)
-        question_label.pack(pady=20)
+        self.question_label = tk.Label(page, font=('Arial', 14), bg='white', wraplength=600)
+        self.question_label.pack(pady=20)
         
-        # Options
+        # Options (radio buttons are reused; extra ones are hidden for shorter option lists)
         self.answer_var = tk.StringVar(value="")
-        for option in question_data["options"]:
-            rb = tk.Radiobutton(self.right_frame, text=option, variable=self.answer_var,
-                               value=option, font=('Arial', 12), bg='white')
-            rb.pack(pady=5, anchor="w", padx=50)
-            
-        # Submit button
-        submit_btn = tk.Button(self.right_frame, text="Submit Answer", 
-                              font=('Arial', 12), command=self.check_answer,
-                              bg='#3498db', fg='white')
-        submit_btn.pack(pady=20)
+        self.options_frame = tk.Frame(page, bg='white')
+        self.options_frame.pack(fill=tk.X)
+        self.option_buttons = []
+        
+        # Feedback for the last answer, shown in place of a dialog
+        self.feedback_label = tk.Label(page, font=('Arial', 13, 'bold'), bg='white', wraplength=600)
+        self.feedback_label.pack(pady=(15, 0))
+        
+        # Submit / next button
+        self.quiz_button = tk.Button(page, text="Submit Answer", 
+                                    font=('Arial', 12), command=self.check_answer,
+                                    bg='#3498db', fg='white')
+        self.quiz_button.pack(pady=20)
         
+    @timed("show_question")
+    def show_question(self):
+        if self.quiz.finished:
+            self.show_quiz_results()
+            return
+            
+        question_data = self.quiz.question()
+        
+        self.quiz_title.configure(text=f"Question {self.quiz.index + 1} of {self.quiz.total}")
+        self.question_label.configure(text=question_data["question"])
+        
+        options = question_data["options"]
+        while len(self.option_buttons) < len(options):
+            rb = tk.Radiobutton(self.options_frame, variable=self.answer_var,
+                               font=('Arial', 12), bg='white')
+            self.option_buttons.append(rb)
+        self.answer_var.set("")
+        for i, rb in enumerate(self.option_buttons):
+            if i < len(options):
+                rb.configure(text=options[i], value=options[i], state=tk.NORMAL)
+                rb.pack(pady=5, anchor="w", padx=50)
+            else:
+                rb.pack_forget()
+        
+        self.feedback_label.configure(text="")
+        self.quiz_button.configure(text="Submit Answer", command=self.check_answer)
+        
+    @timed("check_answer")
     def check_answer(self):
         if not self.answer_var.get():
-            messagebox.showwarning("No Answer", "Please select an answer.")
+            self.feedback_label.configure(text="Please select an answer.", fg='#f39c12')
             return
             
-        question_data = self.quiz_questions[self.current_question]
-        if self.answer_var.get() == question_data["answer"]:
-            self.score += 1
-            messagebox.showinfo("Correct!", "Your answer is correct!")
+        # Grading also reschedules the question for this learner
+        correct, answer = self.quiz.answer(self.answer_var.get())
+        if correct:
+            self.feedback_label.configure(text="Correct!", fg='#2ecc71')
         else:
-            messagebox.showerror("Incorrect", 
-                                f"Sorry, the correct answer is: {question_data['answer']}")
-            
-        self.current_question += 1
-        self.show_question()
+            self.feedback_label.configure(text=f"Incorrect. The correct answer is: {answer}", fg='#e74c3c')
+        for rb in self.option_buttons:
+            rb.configure(state=tk.DISABLED)
+        
+        last = self.quiz.finished
+        self.quiz_button.configure(text="See Results" if last else "Next Question", command=self.show_question)
+        if not last:
+            # Fetch the next question while the learner reads the feedback
+            self.root.after_idle(self.quiz.question)
         
     def show_quiz_results(self):
-        # Clear right frame
-        for widget in self.right_frame.winfo_children():
-            widget.destroy()
+        # Quiz pages change every time, so they are not cached
+        page = self.views.show_transient()
             
-        title = tk.Label(self.right_frame, text="Quiz Results", 
+        title = tk.Label(page, text="Quiz Results", 
                         font=('Arial', 20, 'bold'), bg='white', fg='#2c3e50')
         title.pack(pady=20)
         
-        result_text = f"You scored {self.score} out of {len(self.quiz_questions)} in {self.quiz_subject}!"
-        result_label = tk.Label(self.right_frame, text=result_text, 
+        result_text = f"You scored {self.quiz.score} out of {self.quiz.total} in {self.quiz_subject}!"
+        result_label = tk.Label(page, text=result_text, 
                                font=('Arial', 16), bg='white')
         result_label.pack(pady=20)
         
-        percentage = (self.score / len(self.quiz_questions)) * 100
+        percentage = (self.quiz.score / self.quiz.total) * 100
         if percentage >= 80:
             feedback = "Excellent job! You really know your stuff!"
             color = "#2ecc71"
@@ -396,22 +348,31 @@ class EducationApp:
             feedback = "Keep studying! You'll get better with practice."
             color = "#e74c3c"
             
-        feedback_label = tk.Label(self.right_frame, text=feedback, 
+        feedback_label = tk.Label(page, text=feedback, 
                                  font=('Arial', 14), bg='white', fg=color)
         feedback_label.pack(pady=10)
         
+        # Running record for this learner and subject
+        prev = self.previous_stats or {"attempts": 0, "questions": 0, "correct": 0, "best": 0.0}
+        attempts = prev["attempts"] + 1
+        average = 100.0 * (prev["correct"] + self.quiz.score) / (prev["questions"] + self.quiz.total)
+        best = max(prev["best"], percentage)
+        history_label = tk.Label(page, text=f"{self.quiz.learner}: {attempts} attempt(s) in {self.quiz_subject}, "
+                                            f"average {average:.0f}%, best {best:.0f}%",
+                                 font=('Arial', 12), bg='white', fg='#7f8c8d')
+        history_label.pack(pady=5)
+        
         # Retry button
-        retry_btn = tk.Button(self.right_frame, text="Take Another Quiz", 
+        retry_btn = tk.Button(page, text="Take Another Quiz", 
                              font=('Arial', 12), command=self.show_quiz_selection,
                              bg='#3498db', fg='white')
         retry_btn.pack(pady=20)
         
     def show_about(self):
-        # Clear right frame
-        for widget in self.right_frame.winfo_children():
-            widget.destroy()
-            
-        title = tk.Label(self.right_frame, text="About Python Education Hub", 
+        self.views.show("about", self.build_about)
+        
+    def build_about(self, page):
+        title = tk.Label(page, text="About Python Education Hub", 
                         font=('Arial', 20, 'bold'), bg='white', fg='#2c3e50')
         title.pack(pady=20)
         
@@ -431,18 +392,27 @@ class EducationApp:
         Developed with Python and Tkinter
         """
         
-        about_label = tk.Label(self.right_frame, text=about_text, 
+        about_label = tk.Label(page, text=about_text, 
                               font=('Arial', 12), bg='white', justify=tk.LEFT)
         about_label.pack(pady=20, padx=30)
         
         # Close button
-        close_btn = tk.Button(self.right_frame, text="Back to Home", 
+        close_btn = tk.Button(page, text="Back to Home", 
                              font=('Arial', 12), command=self.show_welcome,
                              bg='#3498db', fg='white')
         close_btn.pack(pady=20)
 
+    def on_close(self):
+        # Commit any answers still queued for the background writer
+        self.core.close()
+        self.root.destroy()
+
 # Run the application
 if __name__ == "__main__":
+    trace_from_command_line(sys.argv)
+    startup.mark("imports")
     root = tk.Tk()
-    app = EducationApp(root)
+    startup.watch_first_paint(root)
+    startup.mark("Tk started")
+    app = EducationApp(root, watchdog=watchdog_wanted(sys.argv))
     root.mainloop()
\ No newline at end of file
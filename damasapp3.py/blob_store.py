@@ -0,0 +1,208 @@
+"""
+Content-addressed download cache for the Resource Hub.
+- Every downloaded or imported file is stored once as .store/blobs/<sha256>
+  and hardlinked into downloads/, so the same textbook saved under two
+  names takes the space of one
+- URLs are remembered with their ETag / Last-Modified, so a repeat download
+  becomes a conditional request and a 304 is served from the local blob
+- The store has a size budget; blobs no longer linked from the library go
+  first, then the least recently used ones
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+HASH_CHUNK = 1024 * 1024
+STORE_DIR = ".store"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CachedUrl:
+    def __init__(self, url, digest, etag, last_modified):
+        self.url = url
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class BlobStore:
+    def __init__(self, library_dir, budget_bytes=2 * 1024 ** 3):
+        self.root = os.path.join(library_dir, STORE_DIR)
+        self.blobs_dir = os.path.join(self.root, "blobs")
+        self.budget_bytes = budget_bytes
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        # Download workers and the Tk thread share one connection
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.root, "index.sqlite"), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, last_used REAL);
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY, digest TEXT, etag TEXT, last_modified TEXT);
+            CREATE INDEX IF NOT EXISTS blobs_lru ON blobs (last_used);
+        """)
+        self._db.commit()
+
+    def blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    # ---------- URL cache ----------
+
+    def lookup(self, url):
+        with self._lock:
+            row = self._db.execute("SELECT digest, etag, last_modified FROM urls WHERE url = ?", (url,)).fetchone()
+        if row is None or not (row[1] or row[2]) or not self._blob_intact(row[0]):
+            return None
+        return CachedUrl(url, *row)
+
+    def materialize(self, digest, dest):
+        # Put a blob at dest: hardlink where the filesystem allows it, else a copy
+        tmp = dest + ".link"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        try:
+            os.link(self.blob_path(digest), tmp)
+        except OSError:
+            shutil.copy2(self.blob_path(digest), tmp)
+        os.replace(tmp, dest)
+        self._touch(digest)
+
+    # ---------- Ingest ----------
+
+    def ingest(self, path, url=None, etag=None, last_modified=None, digest=None):
+        # Take a file that is already in the library into the store; returns its digest
+        digest = digest or file_sha256(path)
+        if self._blob_intact(digest):
+            if not self._same_file(path, self.blob_path(digest)):
+                # Duplicate content under another name: share the existing blob
+                self.materialize(digest, path)
+        else:
+            self._add_blob(path, digest)
+        with self._lock:
+            if url:
+                self._db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?)",
+                                 (url, digest, etag, last_modified))
+            self._db.execute("UPDATE blobs SET last_used = ? WHERE digest = ?", (time.time(), digest))
+            self._db.commit()
+        self.evict()
+        return digest
+
+    def import_file(self, src, dest, digest=None):
+        # Copy an outside file into the library, skipping the copy when its content is already stored
+        digest = digest or file_sha256(src)
+        if self._blob_intact(digest):
+            self.materialize(digest, dest)
+        else:
+            # Never write through dest: it may be a hardlink into the store
+            tmp = dest + ".import"
+            shutil.copy2(src, tmp)
+            os.replace(tmp, dest)
+            self._add_blob(dest, digest)
+        self.evict()
+        return digest
+
+    def _add_blob(self, path, digest):
+        blob = self.blob_path(digest)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if os.path.exists(blob):
+            os.remove(blob)
+        try:
+            os.link(path, blob)
+        except OSError:
+            shutil.copy2(path, blob)
+        st = os.stat(blob)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?)",
+                             (digest, st.st_size, st.st_mtime_ns, time.time()))
+            self._db.commit()
+
+    # ---------- Eviction ----------
+
+    def used_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def evict(self):
+        used = self.used_bytes()
+        if used <= self.budget_bytes:
+            return 0
+        with self._lock:
+            rows = self._db.execute("SELECT digest, size FROM blobs ORDER BY last_used").fetchall()
+        # Blobs only the store still references free real space; linked ones just stop being cached
+        rows.sort(key=lambda row: self._link_count(row[0]) > 1)
+        freed = 0
+        for digest, size in rows:
+            if used - freed <= self.budget_bytes:
+                break
+            self._drop(digest)
+            freed += size
+        return freed
+
+    def _drop(self, digest):
+        try:
+            os.remove(self.blob_path(digest))
+        except OSError:
+            pass
+        with self._lock:
+            self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self._db.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+            self._db.commit()
+
+    # ---------- Helpers ----------
+
+    def _blob_intact(self, digest):
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            return False
+        try:
+            st = os.stat(self.blob_path(digest))
+        except OSError:
+            self._drop(digest)
+            return False
+        if (st.st_size, st.st_mtime_ns) != tuple(row):
+            # Edited in place through a library hardlink: the content no longer matches its name
+            self._drop(digest)
+            return False
+        return True
+
+    def _touch(self, digest):
+        with self._lock:
+            self._db.execute("UPDATE blobs SET last_used = ? WHERE digest = ?", (time.time(), digest))
+            self._db.commit()
+
+    def _link_count(self, digest):
+        try:
+            return os.stat(self.blob_path(digest)).st_nlink
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _same_file(a, b):
+        try:
+            return os.path.samefile(a, b)
+        except OSError:
+            return False
+
+    def close(self):
+        with self._lock:
+            self._db.close()
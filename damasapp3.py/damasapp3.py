@@ -3,27 +3,72 @@ Educational Resource Hub - Tanzania Curriculum
 Full-featured Tkinter app with:
 - Subject tabs with resources (open / download)
 - Dark / Light mode
-- Downloads manager (open / rename / delete / add file)
-- Search (global resources + downloads)
+- Downloads manager (open / rename / delete; add files or whole folders,
+  copied in the background with duplicates resolved automatically)
+- Background downloads with live progress, pause / resume and cancel
+- Download cache: repeat downloads revalidated, duplicate files stored once
+- Library index kept live by a directory watcher (files dropped in by other tools show up)
+- Full-text search inside downloaded PDF / DOCX / PPTX / TXT files
+- Search (global resources + downloads): ranked, typo-tolerant, updates as you type
+- Staged startup: the header, search bar and subject tabs paint first; the
+  library, the downloads tab and the first tab's rows follow from idle
+  callbacks, the resource search index is built on a worker thread (a
+  search typed before it is ready waits for it), and the network stack (requests), content indexing and sync
+  are imported on first use (--profile-startup reports the timings)
+- Performance overlay on F12 (loop frame rate, hot-path latency, queue
+  depths, download throughput); Shift+F12 saves a Chrome trace, --perf
+  traces from startup (see perf.py)
 """
 
+import os
+import sys
+
+# Shared modules (headless core, content catalog) live next to damas.py, one level up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Before tkinter and the app's modules, so that --profile-startup can time their imports
+from startup import profile as startup, profile_from_command_line
+if __name__ == "__main__":
+    profile_from_command_line(sys.argv)
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import webbrowser
-import requests
-import os
-import shutil
+import queue
 import subprocess
-import sys
+import threading
+import time
+
+from hub_core import HubCore
+from theme_registry import ThemeRegistry
+from perf import timed, trace_from_command_line, tracer
+from perf_overlay import PerfOverlay
+from stall_watchdog import StallWatchdog, wanted as watchdog_wanted
 
 class EducationalHub:
-    def __init__(self, root):
+    def __init__(self, root, catalog="damasapp3", watchdog=True):
         self.root = root
         self.root.title("Educational Resource Hub - Tanzania Curriculum")
         self.root.geometry("1000x700")
+        # Anything that blocks the event loop for more than 250 ms is logged with its stack
+        self.watchdog = StallWatchdog(self.root, enabled=watchdog).start()
         # Downloads folder
         self.downloads_dir = os.path.join(os.getcwd(), "downloads")
         os.makedirs(self.downloads_dir, exist_ok=True)
+        # The network session and download manager are made on the first download; the library
+        # (blob store, index, watcher, content search) is opened by a startup stage, see open_library
+        self._session = None
+        self._download_manager = None
+        self.blob_store = None
+        self.library_index = None
+        self.library_watcher = None
+        self.fulltext = None
+        self.search_index_thread = None
+        # Actions clicked before the startup stages finish (the subject tabs paint first), run after them
+        self.deferred_actions = []
+        self.transfer_rows = {}
+        self.transfer_traces = {}   # job_id -> [start, bytes at start, bytes last seen], while tracing
+        self.finished_pack_rows = set()
 
         # Themes
         self.light_theme = {
@@ -38,77 +83,179 @@ class EducationalHub:
         }
         self.theme = self.light_theme.copy()
         self.is_dark = False
+        # Widgets register a color role once; toggling recolors roles, not widget trees
+        self.themes = ThemeRegistry(self.root, self.theme)
+        self.root.configure(bg=self.theme["bg"])
+        self.themes.register(self.root, "surface")
 
-        # Resources (Tanzania curriculum focused links)
-        self.resources = {
-            "Mathematics": [
-                {"name": "Khan Academy Math", "url": "https://www.khanacademy.org/math"},
-                {"name": "NECTA Past Papers (Math)", "url": "https://www.necta.go.tz"},
-                {"name": "TIE Math Textbooks", "url": "https://ol.tie.go.tz/subjects/mathematics"}
-            ],
-            "Science": [
-                {"name": "PhET Simulations", "url": "https://phet.colorado.edu/"},
-                {"name": "NECTA Past Papers (Science)", "url": "https://www.necta.go.tz"},
-                {"name": "TIE Science Books", "url": "https://ol.tie.go.tz/subjects/science"}
-            ],
-            "Geography": [
-                {"name": "TIE Geography Books", "url": "https://ol.tie.go.tz/subjects/geography"},
-                {"name": "NECTA Geography Past Papers", "url": "https://www.necta.go.tz"},
-                {"name": "YouTube: Tanzania Geography Lessons", "url": "https://www.youtube.com/results?search_query=tanzania+geography+lessons"}
-            ],
-            "Kiswahili": [
-                {"name": "TIE Kiswahili Books", "url": "https://ol.tie.go.tz/subjects/kiswahili"},
-                {"name": "NECTA Kiswahili Papers", "url": "https://www.necta.go.tz"},
-                {"name": "YouTube: Mashairi ya Kiswahili", "url": "https://www.youtube.com/results?search_query=shairi+za+kiswahili"}
-            ],
-            "Civics": [
-                {"name": "TIE Civics Books", "url": "https://ol.tie.go.tz/subjects/civics"},
-                {"name": "NECTA Civics Past Papers", "url": "https://www.necta.go.tz"},
-                {"name": "YouTube Civics Lessons", "url": "https://www.youtube.com/results?search_query=civics+tanzania+lessons"}
-            ],
-            "History": [
-                {"name": "TIE History Books", "url": "https://ol.tie.go.tz/subjects/history"},
-                {"name": "NECTA History Past Papers", "url": "https://www.necta.go.tz"},
-                {"name": "YouTube: Tanzania History Lessons", "url": "https://www.youtube.com/results?search_query=history+tanzania+lessons"}
-            ],
-            "English": [
-                {"name": "British Council Learn English", "url": "https://learnenglish.britishcouncil.org/"},
-                {"name": "NECTA English Past Papers", "url": "https://www.necta.go.tz"},
-                {"name": "YouTube English Lessons", "url": "https://www.youtube.com/results?search_query=english+tanzania+lessons"}
-            ]
-        }
+        # Resources (Tanzania curriculum focused links) live in content/damasapp3.jsonl behind the
+        # headless core; startup reads the subject list, each tab's links are fetched when first
+        # shown and the search index is built on the first search
+        self.core = HubCore(catalog)
+        self.search_after_id = None
+        startup.mark("catalog opened")
 
-        # Build UI
+        # Build UI: what paints first here, the rest one stage per idle callback
         self.build_header()
         self.build_search()
         self.build_notebook()
         self.populate_resource_tabs()
-        self.build_downloads_tab()
-        self.apply_theme_to_widgets()
+        # F12: frame rate, widget count, latency of the hot paths, queue depths, download throughput
+        self.perf_overlay = PerfOverlay(
+            self.root, spans=["show_subject", "search_resources", "refresh_downloads", "apply_theme_to_widgets",
+                              "poll_library", "download_file"],
+            queues={"downloads": self.active_download_count, "indexing": self.indexing_count})
+        startup.mark("window built")
+
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after_idle(self.run_startup_stages, [
+            ("first tab filled", self.show_first_tab),
+            ("search index started", self.start_search_index),
+            ("library opened", self.open_library),
+            ("downloads tab built", self.build_downloads_tab),
+            ("downloads listed", self.start_library),
+            ("interrupted transfers", self.adopt_interrupted_downloads),
+        ])
+
+    def run_startup_stages(self, stages):
+        # Each stage gets its own idle callback, so the window repaints and takes input in between
+        label, stage = stages[0]
+        stage()
+        startup.mark(label)
+        if len(stages) > 1:
+            self.root.after_idle(self.run_startup_stages, stages[1:])
+            return
+        startup.ready()
+        actions, self.deferred_actions = self.deferred_actions, None
+        for action, args in actions:
+            action(*args)
+
+    def defer_until_ready(self, action, *args):
+        # True if the library and transfers list are not there yet; the action then runs once they are
+        if self.deferred_actions is None:
+            return False
+        self.deferred_actions.append((action, args))
+        return True
+
+    @property
+    def session(self):
+        # One pooled session for all network I/O (keep-alive, per-host limits, retries)
+        if self._session is None:
+            from http_session import shared_session
+            self._session = shared_session(pool_per_host=6)
+        return self._session
+
+    @property
+    def download_manager(self):
+        if self._download_manager is None:
+            from download_manager import DownloadManager
+            self._download_manager = DownloadManager(max_workers=4, session=self.session, store=self.blob_store)
+            self.poll_downloads()
+        return self._download_manager
+
+    def open_library(self):
+        from blob_store import BlobStore
+        from library_index import LibraryIndex, LibraryWatcher
+        from fulltext import FullTextIndex
+        # Content-addressed cache under downloads/.store (2 GB budget, least recently used evicted)
+        self.blob_store = BlobStore(self.downloads_dir, budget_bytes=2 * 1024 ** 3)
+        # Metadata index of downloads/ (SQLite), kept current by a watcher thread
+        self.library_index = LibraryIndex(self.downloads_dir)
+        self.library_watcher = LibraryWatcher(self.library_index)
+        # Inverted index over document contents, filled by a background process pool
+        self.fulltext = FullTextIndex(self.downloads_dir)
+
+    def start_search_index(self):
+        # Most of a second for a large catalog; search_resources waits for it instead of building it
+        self.search_index_thread = threading.Thread(target=self.core.resource_index, name="resource-index",
+                                                    daemon=True)
+        self.search_index_thread.start()
+
+    def start_library(self):
+        self.refresh_downloads()
+        self.library_watcher.start()
+        self.poll_library()
+        self.fulltext.sync(self.library_index.names())
+
+    def active_download_count(self):
+        return self._download_manager.active_count() if self._download_manager is not None else 0
+
+    def indexing_count(self):
+        return self.fulltext.pending_count() if self.fulltext is not None else 0
+
+    def adopt_interrupted_downloads(self):
+        # Transfers interrupted last session (app closed, uplink dropped) can be resumed. Only a
+        # leftover part manifest (download_manager.MANIFEST_SUFFIX) loads the download machinery
+        if not any(name.endswith(".part.json") for name in os.listdir(self.downloads_dir)):
+            return
+        from download_manager import DownloadManager
+        for url, save_path in DownloadManager.find_interrupted(self.downloads_dir):
+            job = self.download_manager.adopt(url, save_path)
+            self.transfer_rows[job.job_id] = self.transfers_tree.insert(
+                "", tk.END, values=(job.name, self.format_progress(job), "Paused"))
 
     # ---------- UI build ----------
 
     def build_header(self):
         self.header = tk.Frame(self.root, bg=self.theme["title_bg"], height=70)
         self.header.pack(fill=tk.X)
+        self.themes.register(self.header, "title_surface")
         self.title_label = tk.Label(self.header, text="📚 Tanzanian Educational Resource Hub",
                                     font=("Arial", 20, "bold"),
                                     bg=self.theme["title_bg"], fg=self.theme["title_fg"])
         self.title_label.pack(side=tk.LEFT, padx=15, pady=12)
+        self.themes.register(self.title_label, "title")
         self.theme_btn = tk.Button(self.header, text="🌙 Dark Mode", command=self.toggle_theme,
                                    bg=self.theme["button_bg"], fg=self.theme["button_fg"], font=("Arial", 11))
         self.theme_btn.pack(side=tk.RIGHT, padx=12)
+        self.themes.register(self.theme_btn, "button")
 
     def build_search(self):
         search_frame = tk.Frame(self.root, bg=self.theme["bg"])
         search_frame.pack(fill=tk.X, padx=12, pady=(12, 6))
-        tk.Label(search_frame, text="🔍 Search resources:", bg=self.theme["bg"], fg=self.theme["fg"],
-                 font=("Arial", 11)).pack(side=tk.LEFT)
+        self.themes.register(search_frame, "surface")
+        search_label = tk.Label(search_frame, text="🔍 Search resources:", bg=self.theme["bg"], fg=self.theme["fg"],
+                                font=("Arial", 11))
+        search_label.pack(side=tk.LEFT)
+        self.themes.register(search_label, "text")
         self.search_var = tk.StringVar()
         self.search_entry = tk.Entry(search_frame, textvariable=self.search_var, font=("Arial", 11), width=40)
         self.search_entry.pack(side=tk.LEFT, padx=8)
         tk.Button(search_frame, text="Go", command=self.search_resources, bg="#27ae60", fg="white").pack(side=tk.LEFT)
         tk.Button(search_frame, text="Clear", command=self.clear_search).pack(side=tk.LEFT, padx=6)
+        self.search_status_var = tk.StringVar()
+        search_status = tk.Label(search_frame, textvariable=self.search_status_var, bg=self.theme["bg"], fg="#7f8c8d",
+                                 font=("Arial", 9))
+        search_status.pack(side=tk.LEFT, padx=6)
+        self.themes.register(search_status, "surface")
+        # Search as you type, debounced so fast typing runs one query
+        self.search_var.trace_add("write", lambda *args: self.schedule_search())
+        self.search_entry.bind("<Return>", lambda e: self.search_resources())
+        self.search_entry.bind("<Down>", lambda e: self.focus_search_results())
+
+        # Results list (hidden until there is a query)
+        self.search_results_frame = tk.Frame(self.root, bg=self.theme["bg"])
+        self.themes.register(self.search_results_frame, "surface")
+        self.search_results = ttk.Treeview(self.search_results_frame, columns=("name", "subject", "url"),
+                                           show="headings", height=6)
+        self.search_results.heading("name", text="Resource")
+        self.search_results.heading("subject", text="Subject")
+        self.search_results.heading("url", text="Link")
+        self.search_results.column("name", width=320)
+        self.search_results.column("subject", width=120)
+        self.search_results.column("url", width=420)
+        self.search_results.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        result_btns = tk.Frame(self.search_results_frame, bg=self.theme["bg"])
+        result_btns.pack(side=tk.LEFT, padx=(6, 0))
+        self.themes.register(result_btns, "surface")
+        open_btn = tk.Button(result_btns, text="🌐 Open", command=self.open_search_results,
+                             bg=self.theme["button_bg"], fg=self.theme["button_fg"], width=12)
+        open_btn.pack(pady=2)
+        self.themes.register(open_btn, "button")
+        tk.Button(result_btns, text="⬇ Download", command=self.download_search_result,
+                  bg="#16a085", fg="white", width=12).pack(pady=2)
+        self.search_results.bind("<Double-1>", lambda e: self.open_search_results())
+        self.search_results.bind("<Return>", lambda e: self.open_search_results())
 
     def build_notebook(self):
         self.notebook = ttk.Notebook(self.root)
@@ -116,79 +263,171 @@ class EducationalHub:
         self.tab_frames = {}
 
     def populate_resource_tabs(self):
-        # Make a tab per subject and add resource rows
-        for subject, links in self.resources.items():
+        # Make an empty tab per subject; rows are added the first time a tab is shown
+        self.filled_tabs = set()
+        for subject in self.core.subjects(has="resources"):
             frame = tk.Frame(self.notebook, bg=self.theme["bg"])
             self.notebook.add(frame, text=subject)
             self.tab_frames[subject] = frame
+            self.themes.register(frame, "surface", scope=subject)
+
+    def show_first_tab(self):
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.fill_current_tab())
+        if self.tab_frames:
+            self.fill_current_tab()
+
+    def current_subject(self):
+        selected = self.notebook.select()
+        return self.notebook.tab(selected, "text") if selected else None
+
+    # Switching subjects; the same span name as the other apps' show_subject
+    @timed("show_subject")
+    def fill_current_tab(self):
+        subject = self.current_subject()
+        if subject in self.tab_frames and subject not in self.filled_tabs:
+            self.filled_tabs.add(subject)
+            self.fill_resource_tab(subject, self.tab_frames[subject])
+        # A tab that was hidden during a theme change is recolored as it comes into view
+        self.themes.refresh(subject)
+
+    def fill_resource_tab(self, subject, frame):
+        header_row = tk.Frame(frame, bg=self.theme["bg"])
+        header_row.pack(fill=tk.X, padx=12, pady=(10, 6))
+        self.themes.register(header_row, "surface", scope=subject)
+        header = tk.Label(header_row, text=f"{subject} resources", font=("Arial", 14, "bold"),
+                          bg=self.theme["bg"], fg=self.theme["fg"])
+        header.pack(side=tk.LEFT)
+        self.themes.register(header, "text", scope=subject)
+        tk.Button(header_row, text="📦 Save offline pack", command=lambda: self.save_subject_pack(subject),
+                  bg="#16a085", fg="white").pack(side=tk.RIGHT)
+
+        for res in self.core.resources(subject):
+            row = tk.Frame(frame, bg=self.theme["bg"])
+            row.pack(anchor="w", fill=tk.X, padx=12, pady=6)
+            self.themes.register(row, "surface", scope=subject)
+
+            name_lbl = tk.Label(row, text=res["name"], font=("Arial", 11),
+                                bg=self.theme["bg"], fg=self.theme["fg"], anchor="w")
+            name_lbl.pack(side=tk.LEFT, padx=(0, 8), fill=tk.X, expand=True)
+            self.themes.register(name_lbl, "text", scope=subject)
+
+            open_btn = tk.Button(row, text="🌐 Open", command=lambda url=res["url"]: self.open_link(url),
+                                 bg=self.theme["button_bg"], fg=self.theme["button_fg"], width=12)
+            open_btn.pack(side=tk.RIGHT, padx=4)
+            self.themes.register(open_btn, "button", scope=subject)
 
-            header = tk.Label(frame, text=f"{subject} resources", font=("Arial", 14, "bold"),
-                              bg=self.theme["bg"], fg=self.theme["fg"])
-            header.pack(anchor="w", padx=12, pady=(10, 6))
-
-            for res in links:
-                row = tk.Frame(frame, bg=self.theme["bg"])
-                row.pack(anchor="w", fill=tk.X, padx=12, pady=6)
-
-                name_lbl = tk.Label(row, text=res["name"], font=("Arial", 11),
-                                    bg=self.theme["bg"], fg=self.theme["fg"], anchor="w")
-                name_lbl.pack(side=tk.LEFT, padx=(0, 8), fill=tk.X, expand=True)
-
-                open_btn = tk.Button(row, text="🌐 Open", command=lambda url=res["url"]: self.open_link(url),
-                                     bg=self.theme["button_bg"], fg=self.theme["button_fg"], width=12)
-                open_btn.pack(side=tk.RIGHT, padx=4)
-
-                dl_btn = tk.Button(row, text="⬇ Download", command=lambda url=res["url"]: self.download_file(url),
-                                   bg="#16a085", fg="white", width=12)
-                dl_btn.pack(side=tk.RIGHT, padx=4)
+            dl_btn = tk.Button(row, text="⬇ Download", command=lambda url=res["url"]: self.download_file(url),
+                               bg="#16a085", fg="white", width=12)
+            dl_btn.pack(side=tk.RIGHT, padx=4)
 
     def build_downloads_tab(self):
+        from downloads_view import DownloadsList
         # Add the Downloads tab at the end
         self.downloads_tab = tk.Frame(self.notebook, bg=self.theme["bg"])
         self.notebook.add(self.downloads_tab, text="📂 My Downloads")
+        self.themes.register(self.downloads_tab, "surface")
 
         top_frame = tk.Frame(self.downloads_tab, bg=self.theme["bg"])
         top_frame.pack(fill=tk.X, padx=10, pady=8)
+        self.themes.register(top_frame, "surface")
 
-        add_btn = tk.Button(top_frame, text="➕ Add File", command=self.add_file,
+        add_btn = tk.Button(top_frame, text="➕ Add Files", command=self.add_file,
                             bg="#2980b9", fg="white", width=12)
         add_btn.pack(side=tk.LEFT, padx=(0, 6))
+        tk.Button(top_frame, text="📁 Add Folder", command=self.add_folder,
+                  bg="#2980b9", fg="white", width=12).pack(side=tk.LEFT, padx=(0, 6))
+        tk.Button(top_frame, text="📦 Import Pack", command=self.import_subject_pack,
+                  bg="#2980b9", fg="white", width=12).pack(side=tk.LEFT, padx=(0, 6))
+        tk.Button(top_frame, text="🔄 Sync Library", command=self.sync_from_library,
+                  bg="#2980b9", fg="white", width=12).pack(side=tk.LEFT, padx=(0, 6))
 
         # Search inside downloads
-        tk.Label(top_frame, text="🔎 Search my files:", bg=self.theme["bg"], fg=self.theme["fg"]).pack(side=tk.LEFT, padx=(10,4))
+        search_label = tk.Label(top_frame, text="🔎 Search my files:", bg=self.theme["bg"], fg=self.theme["fg"])
+        search_label.pack(side=tk.LEFT, padx=(10,4))
+        self.themes.register(search_label, "text")
         self.download_search_var = tk.StringVar()
         self.download_search_entry = tk.Entry(top_frame, textvariable=self.download_search_var, width=30)
         self.download_search_entry.pack(side=tk.LEFT, padx=6)
         tk.Button(top_frame, text="Find", command=self.search_downloads).pack(side=tk.LEFT, padx=4)
         tk.Button(top_frame, text="Clear", command=self.clear_download_search).pack(side=tk.LEFT, padx=4)
-
-        # Frame for list of files
-        self.files_list_frame = tk.Frame(self.downloads_tab, bg=self.theme["bg"])
-        self.files_list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(6,10))
-        self.refresh_downloads()
+        self.download_search_entry.bind("<Return>", lambda e: self.search_downloads())
+        self.index_status_var = tk.StringVar()
+        index_status = tk.Label(top_frame, textvariable=self.index_status_var, bg=self.theme["bg"], fg="#7f8c8d",
+                                font=("Arial", 9))
+        index_status.pack(side=tk.LEFT, padx=6)
+        self.themes.register(index_status, "surface")
+
+        # Actions on the selected file(s) in the list below
+        tk.Button(top_frame, text="🗑 Delete", command=self.delete_selected_files,
+                  bg="#c0392b", fg="white", width=10).pack(side=tk.RIGHT, padx=4)
+        tk.Button(top_frame, text="✏ Rename", command=self.rename_selected_file,
+                  bg="#2980b9", fg="white", width=10).pack(side=tk.RIGHT, padx=4)
+        open_btn = tk.Button(top_frame, text="📖 Open", command=self.open_selected_files,
+                             bg=self.theme["button_bg"], fg=self.theme["button_fg"], width=10)
+        open_btn.pack(side=tk.RIGHT, padx=4)
+        self.themes.register(open_btn, "button")
+
+        # Ranked matches inside documents (shown only while a search has content hits)
+        self.content_results_frame = tk.Frame(self.downloads_tab, bg=self.theme["bg"])
+        self.themes.register(self.content_results_frame, "surface")
+        self.content_results = ttk.Treeview(self.content_results_frame, columns=("file", "match"),
+                                             show="headings", height=6)
+        self.content_results.heading("file", text="Found inside file")
+        self.content_results.heading("match", text="Match")
+        self.content_results.column("file", width=260)
+        self.content_results.column("match", width=620)
+        self.content_results.pack(fill=tk.X)
+        self.content_results.bind("<Double-1>", lambda e: self.open_content_result())
+        self.content_results.bind("<Return>", lambda e: self.open_content_result())
+
+        # Active transfers (filled from the download manager's event queue)
+        transfers_frame = tk.Frame(self.downloads_tab, bg=self.theme["bg"])
+        transfers_frame.pack(fill=tk.X, padx=10, pady=(0, 6))
+        self.transfers_frame = transfers_frame
+        self.themes.register(transfers_frame, "surface")
+        self.transfers_tree = ttk.Treeview(transfers_frame, columns=("file", "progress", "status"),
+                                           show="headings", height=4)
+        self.transfers_tree.heading("file", text="Transfer")
+        self.transfers_tree.heading("progress", text="Progress")
+        self.transfers_tree.heading("status", text="Status")
+        self.transfers_tree.column("file", width=420)
+        self.transfers_tree.column("progress", width=160, anchor="e")
+        self.transfers_tree.column("status", width=220)
+        self.transfers_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        transfer_btns = tk.Frame(transfers_frame, bg=self.theme["bg"])
+        transfer_btns.pack(side=tk.LEFT, padx=(6, 0))
+        self.themes.register(transfer_btns, "surface")
+        tk.Button(transfer_btns, text="⏸ Pause", command=self.pause_selected_download,
+                  width=10).pack(pady=2)
+        tk.Button(transfer_btns, text="⟳ Resume", command=self.resume_selected_download,
+                  bg="#16a085", fg="white", width=10).pack(pady=2)
+        tk.Button(transfer_btns, text="✖ Cancel", command=self.cancel_selected_download,
+                  bg="#c0392b", fg="white", width=10).pack(pady=2)
+        tk.Button(transfer_btns, text="🧹 Clear done", command=self.clear_finished_downloads,
+                  width=10).pack(pady=2)
+
+        # List of files (one Treeview row per file, updated incrementally)
+        self.downloads_list = DownloadsList(self.downloads_tab, self.downloads_dir, on_open=self.open_offline)
+        self.downloads_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=(6,10))
+        self.downloads_list.tree.bind("<Delete>", lambda e: self.delete_selected_files())
+        self.themes.register(self.downloads_list.frame, "surface")
+        self.themes.register(self.downloads_list.empty_label, "text")
+        # The file list is a Treeview: it is recolored through its style, no rows are touched
+        self.themes.add_style(self.style_downloads_list)
 
     # ---------- Theme handling ----------
 
+    @timed("apply_theme_to_widgets")
     def apply_theme_to_widgets(self):
-        # Apply colors to main widgets (some widgets are recreated when refresh_downloads is called)
-        self.root.configure(bg=self.theme["bg"])
-        self.header.configure(bg=self.theme["title_bg"])
-        self.title_label.configure(bg=self.theme["title_bg"], fg=self.theme["title_fg"])
-        self.theme_btn.configure(bg=self.theme["button_bg"], fg=self.theme["button_fg"])
-        # Notebook's tab background is managed by ttk, but inner frames will use theme colors
-        for subject, frame in self.tab_frames.items():
-            frame.configure(bg=self.theme["bg"])
-            for child in frame.winfo_children():
-                try:
-                    child.configure(bg=self.theme["bg"], fg=self.theme["fg"])
-                except Exception:
-                    pass
-        # Downloads tab
-        try:
-            self.downloads_tab.configure(bg=self.theme["bg"])
-            self.files_list_frame.configure(bg=self.theme["bg"])
-        except Exception:
-            pass
+        # Registered widgets are recolored per role; subject tabs not on screen catch up when shown
+        self.themes.apply(self.theme, visible=[self.current_subject()])
+
+    @staticmethod
+    def style_downloads_list(theme, style):
+        style.configure("Downloads.Treeview", background=theme["bg"], fieldbackground=theme["bg"],
+                        foreground=theme["fg"], rowheight=24, font=("Arial", 11))
+        style.map("Downloads.Treeview", background=[("selected", theme["accent"])],
+                  foreground=[("selected", "white")])
 
     def toggle_theme(self):
         if not self.is_dark:
@@ -201,8 +440,6 @@ class EducationalHub:
             self.theme_btn.configure(text="🌙 Dark Mode")
         # Reapply colors
         self.apply_theme_to_widgets()
-        # Rebuild dynamic parts (downloads list) so colors apply
-        self.refresh_downloads()
 
     # ---------- Resource actions ----------
 
@@ -213,6 +450,8 @@ class EducationalHub:
             messagebox.showerror("Error", f"Could not open link:\n{e}")
 
     def download_file(self, url):
+        if self.defer_until_ready(self.download_file, url):
+            return
         # Ask user where to save (default into downloads_dir)
         suggested_name = os.path.basename(url) or "resource.pdf"
         initial = os.path.join(self.downloads_dir, suggested_name)
@@ -224,60 +463,180 @@ class EducationalHub:
         if not save_path:
             return  # cancelled
 
-        try:
-            # Support common simple HTTP downloads
-            resp = requests.get(url, stream=True, timeout=30)
-            resp.raise_for_status()
-            with open(save_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            messagebox.showinfo("Download Complete", f"Saved to:\n{save_path}")
-            self.refresh_downloads()
-        except Exception as e:
-            messagebox.showerror("Download Failed", f"Could not download:\n{e}")
+        # The transfer runs on the download manager's worker threads; poll_downloads reports progress
+        job = self.download_manager.submit(url, save_path)
+        self.transfer_rows[job.job_id] = self.transfers_tree.insert("", tk.END, values=(job.name, "", "Queued"))
+
+    def poll_downloads(self):
+        # Runs from the moment the download manager exists
+        from download_manager import RUNNING, PAUSED, DONE, FAILED, CANCELLED
+        for kind, job in self.download_manager.poll():
+            if tracer.enabled:
+                self.trace_transfer(kind, job)
+            row = self.transfer_rows.get(job.job_id)
+            if row is None:
+                continue
+            if kind == RUNNING:
+                status = "Downloading"
+            elif kind == DONE:
+                status = "✔ Up to date (from cache)" if job.from_cache else "✔ Complete"
+                # A file saved elsewhere is not part of the library, its list or its content search
+                if os.path.dirname(os.path.realpath(job.save_path)) == os.path.realpath(self.downloads_dir):
+                    self.apply_library_change("added", job.name)
+            elif kind == FAILED:
+                status = f"✖ Failed (resumable): {job.error}"
+            elif kind == PAUSED:
+                status = "Paused"
+            elif kind == CANCELLED:
+                status = "Cancelled"
+            else:
+                status = "Queued"
+            self.transfers_tree.item(row, values=(job.name, self.format_progress(job), status))
+        self.root.after(100, self.poll_downloads)
+
+    def trace_transfer(self, kind, job):
+        # download_file only queues the job; its real cost is the transfer, one span per run of the job
+        from download_manager import QUEUED, RUNNING
+        now = time.perf_counter()
+        seen = self.transfer_traces.get(job.job_id)
+        if seen is None:
+            if kind != RUNNING:
+                return
+            seen = self.transfer_traces[job.job_id] = [now, job.done_bytes, job.done_bytes]
+        tracer.add_bytes("download", job.done_bytes - seen[2])
+        seen[2] = job.done_bytes
+        if kind not in (QUEUED, RUNNING):
+            del self.transfer_traces[job.job_id]
+            tracer.record("download_file", seen[0], now, url=job.url, state=kind,
+                          bytes=job.done_bytes - seen[1], from_cache=job.from_cache)
+
+    @staticmethod
+    def format_progress(job):
+        done_mb = job.done_bytes / (1024 * 1024)
+        if job.total_bytes:
+            text = f"{done_mb:.1f} / {job.total_bytes / (1024 * 1024):.1f} MB ({job.fraction:.0%})"
+            return text + (f" ×{job.segments}" if job.segments > 1 else "")
+        return f"{done_mb:.1f} MB"
+
+    def selected_download_ids(self):
+        selected = set(self.transfers_tree.selection())
+        return [job_id for job_id, row in self.transfer_rows.items() if row in selected]
+
+    def pause_selected_download(self):
+        for job_id in self.selected_download_ids():
+            self.download_manager.pause(job_id)
+
+    def resume_selected_download(self):
+        for job_id in self.selected_download_ids():
+            self.download_manager.resume(job_id)
+
+    def cancel_selected_download(self):
+        for job_id in self.selected_download_ids():
+            self.download_manager.cancel(job_id)
+
+    def clear_finished_downloads(self):
+        from download_manager import DONE, FAILED, CANCELLED
+        for job_id, row in list(self.transfer_rows.items()):
+            job = self.download_manager.jobs.get(job_id)
+            if job is None or job.state in (DONE, FAILED, CANCELLED):
+                self.transfers_tree.delete(row)
+                del self.transfer_rows[job_id]
+                self.download_manager.forget(job_id)
+        for row in self.finished_pack_rows:
+            if self.transfers_tree.exists(row):
+                self.transfers_tree.delete(row)
+        self.finished_pack_rows.clear()
+
+    def on_close(self):
+        # Parts that startup or first use have not made yet have nothing to stop
+        if self._download_manager is not None:
+            if self._download_manager.active_count():
+                if not messagebox.askyesno("Downloads running",
+                                           "Downloads are still in progress. Pause them and quit?\n"
+                                           "They can be resumed next time the app starts."):
+                    return
+            self._download_manager.shutdown()
+        if self.library_watcher is not None:
+            self.library_watcher.stop()
+        if self.fulltext is not None:
+            self.fulltext.close()
+        self.core.close()
+        self.root.destroy()
 
     # ---------- Downloads manager ----------
 
+    @timed("refresh_downloads")
     def refresh_downloads(self, filter_text: str = ""):
-        # Clear the frame
-        for w in self.files_list_frame.winfo_children():
-            w.destroy()
-
-        files = sorted(os.listdir(self.downloads_dir))
-        if filter_text:
-            files = [f for f in files if filter_text.lower() in f.lower()]
-
-        if not files:
-            tk.Label(self.files_list_frame, text="No downloads or uploaded files yet.",
-                     font=("Arial", 12), bg=self.theme["bg"], fg=self.theme["fg"]).pack(pady=20)
+        # Diff the index (not the disk) against the list; only rows that changed are touched
+        entries = self.library_index.entries()
+        self.downloads_list.sync(entries, entries)
+        self.downloads_list.set_filter(filter_text)
+
+    @timed("poll_library")
+    def poll_library(self):
+        # Rescheduled whatever happens, so one bad event cannot stop live updates for the session
+        try:
+            events = self.library_index.poll_events(max_events=5000)
+            if len(events) > 200:
+                # A big batch (first scan, bulk copy): one diff against the index beats row-by-row
+                entries = self.library_index.entries()
+                self.downloads_list.sync(entries, entries)
+                self.fulltext.sync(entries)
+            else:
+                for event in events:
+                    self.apply_library_change(*event)
+            pending = self.fulltext.pending_count()
+            self.index_status_var.set(f"Indexing {pending} file(s)…" if pending else "")
+        finally:
+            self.root.after(250, self.poll_library)
+
+    def apply_library_change(self, kind, name, new_name=None):
+        # Keeps the index, the list and content search in step; safe to repeat for the watcher's echo
+        if kind == "removed":
+            self.library_index.remove(name)
+            self.downloads_list.remove(name)
+            self.fulltext.remove(name)
+        elif kind == "renamed":
+            self.library_index.rename(name, new_name)
+            self.downloads_list.rename(name, new_name)
+            self.fulltext.rename(name, new_name)
+        else:
+            self.library_index.update(name)
+            self.downloads_list.add(name)
+            self.fulltext.schedule(name)
+
+    def open_selected_files(self):
+        for path in self.downloads_list.selected_paths():
+            self.open_offline(path)
+
+    def rename_selected_file(self):
+        paths = self.downloads_list.selected_paths()
+        if len(paths) != 1:
+            messagebox.showinfo("Rename", "Select one file to rename.")
             return
+        self.rename_file(paths[0])
 
-        for filename in files:
-            filepath = os.path.join(self.downloads_dir, filename)
-            row = tk.Frame(self.files_list_frame, bg=self.theme["bg"])
-            row.pack(fill=tk.X, pady=4)
-
-            lbl = tk.Label(row, text=filename, font=("Arial", 11), anchor="w",
-                           bg=self.theme["bg"], fg=self.theme["fg"], width=60)
-            lbl.pack(side=tk.LEFT, padx=6)
-
-            open_btn = tk.Button(row, text="📖 Open", command=lambda f=filepath: self.open_offline(f),
-                                 bg=self.theme["button_bg"], fg=self.theme["button_fg"], width=10)
-            open_btn.pack(side=tk.RIGHT, padx=4)
-
-            del_btn = tk.Button(row, text="🗑 Delete", command=lambda f=filepath: self.delete_file(f),
-                                bg="#c0392b", fg="white", width=10)
-            del_btn.pack(side=tk.RIGHT, padx=4)
-
-            rename_btn = tk.Button(row, text="✏ Rename", command=lambda f=filepath: self.rename_file(f),
-                                   bg="#2980b9", fg="white", width=10)
-            rename_btn.pack(side=tk.RIGHT, padx=4)
+    def delete_selected_files(self):
+        paths = self.downloads_list.selected_paths()
+        if not paths:
+            messagebox.showinfo("Delete", "Select the file(s) to delete.")
+            return
+        if len(paths) == 1:
+            self.delete_file(paths[0])
+            return
+        if not messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {len(paths)} files?"):
+            return
+        for path in paths:
+            try:
+                os.remove(path)
+                self.apply_library_change("removed", os.path.basename(path))
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not delete {os.path.basename(path)}:\n{e}")
 
     def open_offline(self, filepath):
         if not os.path.exists(filepath):
             messagebox.showerror("File not found", "The selected file does not exist.")
-            self.refresh_downloads()
+            self.apply_library_change("removed", os.path.basename(filepath))
             return
         try:
             if sys.platform.startswith("win"):
@@ -296,22 +655,22 @@ class EducationalHub:
     def delete_file(self, filepath):
         if not os.path.exists(filepath):
             messagebox.showerror("File not found", "The selected file does not exist.")
-            self.refresh_downloads()
+            self.apply_library_change("removed", os.path.basename(filepath))
             return
         confirm = messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete:\n{os.path.basename(filepath)} ?")
         if not confirm:
             return
         try:
             os.remove(filepath)
+            self.apply_library_change("removed", os.path.basename(filepath))
             messagebox.showinfo("Deleted", f"Removed: {os.path.basename(filepath)}")
-            self.refresh_downloads()
         except Exception as e:
             messagebox.showerror("Error", f"Could not delete file:\n{e}")
 
     def rename_file(self, filepath):
         if not os.path.exists(filepath):
             messagebox.showerror("File not found", "The selected file does not exist.")
-            self.refresh_downloads()
+            self.apply_library_change("removed", os.path.basename(filepath))
             return
 
         rename_win = tk.Toplevel(self.root)
@@ -338,69 +697,246 @@ class EducationalHub:
                 return
             try:
                 os.rename(filepath, new_path)
+                self.apply_library_change("renamed", os.path.basename(filepath), new_name)
                 messagebox.showinfo("Renamed", f"Renamed to:\n{new_name}")
                 rename_win.destroy()
-                self.refresh_downloads()
             except Exception as e:
                 messagebox.showerror("Error", f"Could not rename file:\n{e}")
 
         tk.Button(rename_win, text="Apply", command=apply_rename, bg="#27ae60", fg="white").pack(pady=6)
 
     def add_file(self):
-        file_path = filedialog.askopenfilename(title="Select a file to add",
-                                               filetypes=[("Documents", "*.pdf *.docx *.txt *.pptx"), ("All files", "*.*")])
-        if not file_path:
+        paths = filedialog.askopenfilenames(title="Select files to add",
+                                            filetypes=[("Documents", "*.pdf *.docx *.txt *.pptx"), ("All files", "*.*")])
+        if paths:
+            label = os.path.basename(paths[0]) if len(paths) == 1 else f"{len(paths)} files"
+            self.import_into_library(list(paths), label)
+
+    def add_folder(self):
+        directory = filedialog.askdirectory(title="Add every document in a folder")
+        if not directory:
             return
-        try:
-            dest = os.path.join(self.downloads_dir, os.path.basename(file_path))
-            # If same name exists, ask to overwrite or rename
-            if os.path.exists(dest):
-                overwrite = messagebox.askyesno("File exists", "A file with that name already exists. Overwrite?")
-                if not overwrite:
-                    return
-            shutil.copy2(file_path, dest)
-            messagebox.showinfo("Added", f"Copied to library:\n{dest}")
-            self.refresh_downloads()
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not add file:\n{e}")
+        if os.path.abspath(directory) == os.path.abspath(self.downloads_dir):
+            messagebox.showinfo("Add Folder", "That folder is the library itself.")
+            return
+        self.import_into_library([directory], os.path.basename(os.path.normpath(directory)))
+
+    def import_into_library(self, paths, label):
+        # Copies on a worker thread; duplicates are skipped or renamed, and the list is updated once at the end
+
+        def run_import(report):
+            from library_import import collect_files, import_files
+            files = collect_files(paths)
+            report(f"0/{len(files)}")
+            result = import_files(files, self.downloads_dir, self.blob_store, self.library_index,
+                                  progress=lambda done, total, name: report(f"{done}/{total}"))
+
+            def show_imported():
+                if len(result.imported) > 200:
+                    # Same as a big watcher batch: one diff against the index beats row-by-row
+                    entries = self.library_index.entries()
+                    self.downloads_list.sync(entries, entries)
+                    self.fulltext.sync(entries)
+                else:
+                    for name in result.imported:
+                        self.apply_library_change("added", name)
+                if len(result.imported) == 1:
+                    self.downloads_list.select(result.imported[0])
+
+            return f"✔ {result.summary()}", show_imported
+
+        self.run_pack_task(label, "Adding", run_import)
+
+    # ---------- Offline subject packs ----------
+
+    def save_subject_pack(self, subject):
+        if self.defer_until_ready(self.save_subject_pack, subject):
+            return
+        pack_path = filedialog.asksaveasfilename(title=f"Save {subject} pack as", initialfile=f"{subject}.pack",
+                                                 defaultextension=".pack",
+                                                 filetypes=[("Subject packs", "*.pack"), ("All files", "*.*")])
+        if not pack_path:
+            return
+        items = [(subject, res) for res in self.core.resources(subject)]
+        session = self.session
+
+        def build(report):
+            from subject_pack import PackBuilder
+            manifest = PackBuilder(pack_path, session=session,
+                                   progress=lambda done, total, res, error: report(f"{done}/{total}")).build(items)
+            failed = len(manifest["failed"])
+            return f"✔ {len(manifest['resources'])} packed" + (f", {failed} failed (save again to retry)"
+                                                              if failed else ""), None
+
+        self.run_pack_task(os.path.basename(pack_path), "Downloading", build)
+
+    def import_subject_pack(self):
+        pack_path = filedialog.askopenfilename(title="Import a subject pack",
+                                               filetypes=[("Subject packs", "*.pack"), ("All files", "*.*")])
+        if not pack_path:
+            return
+
+        def run_import(report):
+            from subject_pack import import_pack
+            result = import_pack(pack_path, self.downloads_dir, self.blob_store,
+                                 progress=lambda done, total, entry: report(f"{done}/{total}"))
+            damaged = f", {len(result['corrupt'])} damaged" if result["corrupt"] else ""
+            damaged += f", {len(result['failed'])} refused (bad file name)" if result["failed"] else ""
+
+            def show_imported():
+                # The watcher would find these too; telling the list now saves a poll interval
+                for name in result["imported"]:
+                    self.apply_library_change("added", name)
+
+            return f"✔ {len(result['imported'])} imported, {len(result['present'])} already here{damaged}", show_imported
+
+        self.run_pack_task(os.path.basename(pack_path), "Importing", run_import)
+
+    def sync_from_library(self):
+        # A shared folder holding another machine's library (published with library_sync.py publish)
+        directory = filedialog.askdirectory(title="Sync from a shared library folder")
+        if not directory:
+            return
+        if os.path.abspath(directory) == os.path.abspath(self.downloads_dir):
+            messagebox.showinfo("Sync", "Choose another machine's library, not this one.")
+            return
+
+        def run_sync(report):
+            from library_sync import open_source, sync_library
+            result = sync_library(open_source(directory), self.downloads_dir,
+                                  progress=lambda done, total, name: report(f"{done}/{total}"))
+
+            def show_synced():
+                for old, new in result.renamed:
+                    self.apply_library_change("renamed", old, new)
+                for name in result.added + result.linked + result.updated:
+                    self.apply_library_change("added", name)
+
+            return f"✔ {result.summary()}", show_synced
+
+        self.run_pack_task(os.path.basename(os.path.normpath(directory)), "Syncing", run_sync)
+
+    def run_pack_task(self, label, status, work):
+        # work(report) runs on a background thread and returns (final status, Tk-thread follow-up or None);
+        # report(text) updates the row's progress column
+        row = self.transfers_tree.insert("", tk.END, values=(label, "", status))
+        events = queue.Queue()
+
+        def run():
+            try:
+                events.put((True, work(lambda text: events.put((False, text)))))
+            except Exception as e:
+                events.put((True, (f"✖ Failed: {e}", None)))
+
+        threading.Thread(target=run, name="subject-pack", daemon=True).start()
+        self.poll_pack_task(row, label, status, events)
+
+    def poll_pack_task(self, row, label, status, events):
+        progress, finished = None, None
+        while True:
+            try:
+                done, text = events.get_nowait()
+            except queue.Empty:
+                break
+            if done:
+                finished = text
+            else:
+                progress = text
+        if not self.transfers_tree.exists(row):
+            return
+        if finished is not None:
+            text, follow_up = finished
+            self.transfers_tree.item(row, values=(label, progress or self.transfers_tree.set(row, "progress"), text))
+            self.finished_pack_rows.add(row)
+            if follow_up is not None:
+                follow_up()
+            return
+        if progress is not None:
+            self.transfers_tree.item(row, values=(label, progress, status))
+        self.root.after(200, self.poll_pack_task, row, label, status, events)
 
     # ---------- Search ----------
 
+    def schedule_search(self, delay=150):
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(delay, self.search_resources)
+
+    @timed("search_resources")
     def search_resources(self):
-        q = self.search_var.get().strip().lower()
+        self.search_after_id = None
+        q = self.search_var.get().strip()
+        self.search_results.delete(*self.search_results.get_children())
         if not q:
-            messagebox.showinfo("Search", "Enter a search term.")
+            self.search_status_var.set("")
+            self.search_results_frame.pack_forget()
             return
-        matches = []
-        for subject, links in self.resources.items():
-            for res in links:
-                if q in res["name"].lower() or q in subject.lower():
-                    matches.append((res["name"], res["url"], subject))
-        if not matches:
-            messagebox.showinfo("Search Results", "No matching resources found.")
+        building = self.search_index_thread is None or self.search_index_thread.is_alive()
+        if building and not self.core.resource_index_ready():
+            self.search_status_var.set("Preparing search…")
+            self.search_after_id = self.root.after(100, self.search_resources)
             return
-        # show simple choice list and open all matches (or just present)
-        # We'll present the list and open the ones the user confirms
-        msg = "Found:\n\n" + "\n".join([f"{name} ({subj})" for name, _, subj in matches])
-        open_all = messagebox.askyesno("Search Results", msg + "\n\nOpen all results in browser?")
-        if open_all:
-            for _, url, _ in matches:
-                webbrowser.open(url)
+        matches = self.core.search_resources(q, limit=100)
+        for score, name, subject, url in matches:
+            self.search_results.insert("", tk.END, values=(name, subject, url))
+        self.search_status_var.set(f"{len(matches)} result(s)" if matches else "No matching resources found.")
+        if matches:
+            self.search_results_frame.pack(fill=tk.X, padx=12, pady=(0, 6), before=self.notebook)
+        else:
+            self.search_results_frame.pack_forget()
+
+    def focus_search_results(self):
+        children = self.search_results.get_children()
+        if children:
+            self.search_results.focus_set()
+            self.search_results.selection_set(children[0])
+            self.search_results.focus(children[0])
+
+    def selected_search_urls(self):
+        return [self.search_results.item(item, "values")[2] for item in self.search_results.selection()]
+
+    def open_search_results(self):
+        for url in self.selected_search_urls():
+            self.open_link(url)
+
+    def download_search_result(self):
+        for url in self.selected_search_urls():
+            self.download_file(url)
 
     def clear_search(self):
         self.search_var.set("")
 
     # Downloads search
+    @timed("search_downloads")
     def search_downloads(self):
         q = self.download_search_var.get().strip()
-        self.refresh_downloads(filter_text=q)
+        self.downloads_list.set_filter(q)
+        # Contents too: ranked BM25 hits from the full-text index
+        self.content_results.delete(*self.content_results.get_children())
+        hits = self.fulltext.search(q) if q else []
+        for name, score, snippet in hits:
+            self.content_results.insert("", tk.END, values=(name, snippet))
+        if hits:
+            self.content_results_frame.pack(fill=tk.X, padx=10, pady=(0, 6), before=self.transfers_frame)
+        else:
+            self.content_results_frame.pack_forget()
+
+    def open_content_result(self):
+        for item in self.content_results.selection():
+            self.open_offline(os.path.join(self.downloads_dir, self.content_results.item(item, "values")[0]))
 
     def clear_download_search(self):
         self.download_search_var.set("")
-        self.refresh_downloads()
+        self.downloads_list.set_filter("")
+        self.content_results.delete(*self.content_results.get_children())
+        self.content_results_frame.pack_forget()
 
 # Run the app
 if __name__ == "__main__":
+    trace_from_command_line(sys.argv)
+    startup.mark("imports")
     root = tk.Tk()
-    app = EducationalHub(root)
+    startup.watch_first_paint(root)
+    startup.mark("Tk started")
+    app = EducationalHub(root, watchdog=watchdog_wanted(sys.argv))
     root.mainloop()
@@ -0,0 +1,453 @@
+"""
+Background download engine for the Educational Resource Hub.
+- Transfers run concurrently on a thread pool, never on the Tk thread
+- Progress is reported through a queue that the UI drains with root.after
+- Every job can be cancelled while queued or mid-transfer
+- Data lands in a .part file with a small JSON sidecar manifest, so an
+  interrupted transfer resumes with an HTTP Range request instead of
+  starting over
+- Large files on servers that accept ranges are split into byte ranges that
+  are fetched in parallel straight into their offsets of the .part file
+- All requests go through the shared pooled session (see http_session.py);
+  a body that breaks mid-stream is retried with backoff from the last byte
+  written
+- With a BlobStore attached, a URL fetched before is revalidated with a
+  conditional request and a 304 is served from the local copy; finished
+  files are handed to the store for deduplication
+"""
+
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from http_session import STREAM_ERRORS, shared_session
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+PART_SUFFIX = ".part"
+MANIFEST_SUFFIX = ".part.json"
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+class RangeNotSupported(Exception):
+    pass
+
+
+class PartManifest:
+    """Sidecar describing a .part file: where it came from and how much of each byte range is on disk."""
+
+    def __init__(self, url, total=0, etag=None, last_modified=None, segments=None):
+        self.url = url
+        self.total = total
+        self.etag = etag
+        self.last_modified = last_modified
+        # Each segment is [start, end (inclusive, or None if unknown), bytes done]
+        self.segments = segments or [[0, total - 1 if total else None, 0]]
+
+    @property
+    def done(self):
+        return sum(seg[2] for seg in self.segments)
+
+    @property
+    def validator(self):
+        return self.etag or self.last_modified
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(data["url"], data.get("total", 0), data.get("etag"),
+                       data.get("last_modified"), data["segments"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path):
+        data = {"url": self.url, "total": self.total, "etag": self.etag,
+                "last_modified": self.last_modified, "segments": self.segments}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+
+class DownloadJob:
+    def __init__(self, job_id, url, save_path):
+        self.job_id = job_id
+        self.url = url
+        self.save_path = save_path
+        self.state = QUEUED
+        self.done_bytes = 0
+        self.total_bytes = 0
+        self.segments = 1
+        self.from_cache = False
+        self.error = None
+        self.keep_partial = False
+        self.last_checkpoint = 0.0
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    @property
+    def name(self):
+        return os.path.basename(self.save_path)
+
+    @property
+    def part_path(self):
+        return self.save_path + PART_SUFFIX
+
+    @property
+    def manifest_path(self):
+        return self.save_path + MANIFEST_SUFFIX
+
+    @property
+    def fraction(self):
+        if not self.total_bytes:
+            return 0.0
+        return min(1.0, self.done_bytes / self.total_bytes)
+
+    def cancel(self, keep_partial=False):
+        self.keep_partial = keep_partial
+        self.cancel_event.set()
+
+
+class DownloadManager:
+    """Runs downloads on worker threads and posts (kind, job) events to self.events."""
+
+    def __init__(self, max_workers=4, chunk_size=None, progress_interval=0.1,
+                 segments=4, segment_min_size=8 * 1024 * 1024, checkpoint_interval=1.0,
+                 session=None, store=None):
+        self.session = session or shared_session()
+        self.store = store
+        self.chunk_size = chunk_size or self.session.chunk_size
+        self.progress_interval = progress_interval
+        self.segments = segments
+        self.segment_min_size = segment_min_size
+        self.checkpoint_interval = checkpoint_interval
+        self.events = queue.Queue()
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="download")
+
+    # ---------- Public API (call from the Tk thread) ----------
+
+    def submit(self, url, save_path):
+        job = DownloadJob(next(self._ids), url, save_path)
+        self.jobs[job.job_id] = job
+        self._start(job)
+        return job
+
+    def adopt(self, url, save_path):
+        # Register an interrupted transfer found on disk without starting it
+        job = DownloadJob(next(self._ids), url, save_path)
+        manifest = PartManifest.load(job.manifest_path)
+        if manifest is not None:
+            job.total_bytes = manifest.total
+            job.done_bytes = manifest.done
+            job.segments = len(manifest.segments)
+        job.state = PAUSED
+        self.jobs[job.job_id] = job
+        self.events.put((PAUSED, job))
+        return job
+
+    def resume(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None or job.state not in (PAUSED, FAILED, CANCELLED):
+            return
+        job.cancel_event = threading.Event()
+        job.keep_partial = False
+        job.error = None
+        self._start(job)
+
+    def pause(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None or job.state not in (QUEUED, RUNNING):
+            return
+        job.cancel(keep_partial=True)
+        if job.future is not None and job.future.cancel():
+            job.state = PAUSED
+            self.events.put((PAUSED, job))
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None or job.state in (DONE, CANCELLED):
+            return
+        job.cancel()
+        # A job that is not on a worker never reaches _run's cancel check
+        if job.state in (PAUSED, FAILED) or (job.future is not None and job.future.cancel()):
+            self._discard(job.part_path, job.manifest_path)
+            job.state = CANCELLED
+            self.events.put((CANCELLED, job))
+
+    def cancel_all(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def active_count(self):
+        return sum(1 for job in self.jobs.values() if job.state in (QUEUED, RUNNING))
+
+    def poll(self, max_events=500):
+        # Drain pending events without blocking; bounded so one tick never stalls the UI
+        events = []
+        for _ in range(max_events):
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def forget(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is not None and job.state in (DONE, FAILED, CANCELLED):
+            del self.jobs[job_id]
+
+    def shutdown(self):
+        # Running transfers stop at their next chunk; their .part files stay resumable
+        for job in self.jobs.values():
+            if job.state in (QUEUED, RUNNING):
+                job.cancel(keep_partial=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def find_interrupted(directory):
+        # (url, save_path) for every manifest left behind by an unfinished transfer
+        found = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(MANIFEST_SUFFIX):
+                continue
+            save_path = os.path.join(directory, name[:-len(MANIFEST_SUFFIX)])
+            manifest = PartManifest.load(os.path.join(directory, name))
+            if manifest is not None and os.path.exists(save_path + PART_SUFFIX):
+                found.append((manifest.url, save_path))
+        return found
+
+    # ---------- Worker side ----------
+
+    def _start(self, job):
+        job.state = QUEUED
+        self.events.put((QUEUED, job))
+        job.future = self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        if job.cancel_event.is_set():
+            job.state = PAUSED if job.keep_partial else CANCELLED
+            self.events.put((job.state, job))
+            return
+        job.state = RUNNING
+        self.events.put((RUNNING, job))
+        try:
+            self._transfer(job)
+            job.state = DONE
+            self.events.put((DONE, job))
+        except DownloadCancelled:
+            if job.keep_partial:
+                # Paused (or the app is closing): keep the .part file for next time
+                job.state = PAUSED
+                self.events.put((PAUSED, job))
+                return
+            self._discard(job.part_path, job.manifest_path)
+            job.state = CANCELLED
+            self.events.put((CANCELLED, job))
+        except Exception as e:
+            # .part and manifest are kept so that Resume continues from where this stopped
+            job.error = str(e)
+            job.state = FAILED
+            self.events.put((FAILED, job))
+
+    def _transfer(self, job):
+        manifest = PartManifest.load(job.manifest_path)
+        if manifest is None or manifest.url != job.url or not os.path.exists(job.part_path):
+            cached = self.store.lookup(job.url) if self.store is not None else None
+            manifest = self._probe(job, cached)
+            if manifest is None:
+                # Not modified since we last fetched it: link the stored copy instead of downloading
+                self.store.materialize(cached.digest, job.save_path)
+                job.from_cache = True
+                job.total_bytes = job.done_bytes = os.path.getsize(job.save_path)
+                return
+        job.total_bytes = manifest.total
+        job.done_bytes = manifest.done
+        job.segments = len(manifest.segments)
+
+        if len(manifest.segments) > 1:
+            try:
+                self._fetch_parallel(job, manifest)
+            except RangeNotSupported:
+                # The server stopped honouring ranges (or the file changed): fall back to one stream
+                manifest = self._new_manifest(job, manifest.total, None, None, split=False)
+                job.done_bytes = 0
+                job.segments = 1
+                self._fetch_segment(job, manifest, manifest.segments[0], threading.Event())
+        else:
+            self._fetch_segment(job, manifest, manifest.segments[0], threading.Event())
+
+        if manifest.total and os.path.getsize(job.part_path) != manifest.total:
+            raise IOError(f"Incomplete download: {os.path.getsize(job.part_path)} of {manifest.total} bytes")
+
+        os.replace(job.part_path, job.save_path)
+        self._discard(job.manifest_path)
+        if self.store is not None:
+            self.store.ingest(job.save_path, job.url, manifest.etag, manifest.last_modified)
+
+    def _probe(self, job, cached=None):
+        # Returns None when the cached copy is still current
+        total, etag, last_modified, ranges = 0, None, None, False
+        headers = cached.conditional_headers() if cached is not None else {}
+        try:
+            resp = self.session.head(job.url, headers=headers, allow_redirects=True)
+            if cached is not None and (resp.status_code == 304
+                                       or (cached.etag and resp.headers.get("ETag") == cached.etag)):
+                return None
+            if resp.ok:
+                total = int(resp.headers.get("Content-Length") or 0)
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+                ranges = resp.headers.get("Accept-Ranges", "").lower() == "bytes"
+                if resp.headers.get("Content-Encoding", "identity") != "identity":
+                    # Encoded bodies are decoded while streaming, so neither the length nor ranges line up
+                    total, ranges = 0, False
+        except requests.RequestException:
+            pass
+        split = ranges and self.segments > 1 and total >= self.segment_min_size
+        return self._new_manifest(job, total, etag, last_modified, split)
+
+    def _new_manifest(self, job, total, etag, last_modified, split):
+        if split:
+            size = -(-total // self.segments)
+            segments = [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)]
+        else:
+            segments = None
+        manifest = PartManifest(job.url, total, etag, last_modified, segments)
+        with open(job.part_path, "wb") as f:
+            if split:
+                # Preallocate so every range can be written at its own offset
+                f.truncate(total)
+        manifest.save(job.manifest_path)
+        return manifest
+
+    def _fetch_parallel(self, job, manifest):
+        stop = threading.Event()
+        pending = [seg for seg in manifest.segments if seg[1] is None or seg[0] + seg[2] <= seg[1]]
+        with ThreadPoolExecutor(max_workers=len(pending) or 1, thread_name_prefix="segment") as pool:
+            futures = [pool.submit(self._fetch_segment, job, manifest, seg, stop) for seg in pending]
+            error = None
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    # Stop sibling ranges; cancellation wins over any other error
+                    stop.set()
+                    if error is None or isinstance(e, DownloadCancelled):
+                        error = e
+        self._checkpoint(job, manifest, force=True)
+        if error is not None:
+            raise error
+
+    def _fetch_segment(self, job, manifest, seg, stop):
+        # The retry budget is for failures in a row: a drop after fresh progress starts it again,
+        # so a flaky uplink only fails a big file if it stops delivering at all
+        attempt = 0
+        while True:
+            done_before = seg[2]
+            try:
+                return self._fetch_segment_once(job, manifest, seg, stop)
+            except STREAM_ERRORS:
+                # The connection broke mid-body; seg already records what reached the disk
+                if seg[2] > done_before:
+                    attempt = 0
+                attempt += 1
+                if attempt > self.session.retries:
+                    raise
+                if not self.session.sleep_before_retry(attempt, job.cancel_event):
+                    raise DownloadCancelled()
+
+    def _fetch_segment_once(self, job, manifest, seg, stop):
+        start, end, done = seg
+        if end is not None and start + done > end:
+            return
+        headers = {}
+        if done or len(manifest.segments) > 1:
+            headers["Range"] = f"bytes={start + done}-{'' if end is None else end}"
+            if manifest.validator:
+                headers["If-Range"] = manifest.validator
+
+        with self.session.get(job.url, headers=headers, stream=True) as resp:
+            resp.raise_for_status()
+            if "Range" in headers and resp.status_code != 206:
+                if len(manifest.segments) > 1:
+                    raise RangeNotSupported()
+                # Full body instead of the tail: the server ignored the range or the file changed
+                with self._lock:
+                    job.done_bytes -= done
+                done = seg[2] = 0
+                manifest.etag = resp.headers.get("ETag")
+                manifest.last_modified = resp.headers.get("Last-Modified")
+            if done == 0 and len(manifest.segments) == 1:
+                manifest.total = int(resp.headers.get("Content-Length") or 0)
+                if resp.headers.get("Content-Encoding", "identity") != "identity":
+                    manifest.total = 0
+                seg[1] = manifest.total - 1 if manifest.total else None
+                job.total_bytes = manifest.total
+                open(job.part_path, "wb").close()
+
+            last_report = 0.0
+            # Unbuffered, so every byte counted in the manifest has already reached the OS
+            with open(job.part_path, "r+b", buffering=0) as f:
+                f.seek(start + done)
+                for chunk in resp.iter_content(chunk_size=self.chunk_size):
+                    if job.cancel_event.is_set():
+                        raise DownloadCancelled()
+                    if stop.is_set():
+                        return
+                    if not chunk:
+                        continue
+                    if end is not None:
+                        chunk = chunk[:end - (start + done) + 1]
+                    view = memoryview(chunk)
+                    while view:
+                        written = f.write(view)
+                        view = view[written:]
+                    done += len(chunk)
+                    seg[2] = done
+                    with self._lock:
+                        job.done_bytes += len(chunk)
+                    self._checkpoint(job, manifest)
+                    # Throttle progress events so a large file cannot flood the queue
+                    now = time.monotonic()
+                    if now - last_report >= self.progress_interval:
+                        last_report = now
+                        self.events.put((RUNNING, job))
+                    if end is not None and start + done > end:
+                        break
+        self._checkpoint(job, manifest, force=True)
+
+    def _checkpoint(self, job, manifest, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - job.last_checkpoint < self.checkpoint_interval:
+                return
+            job.last_checkpoint = now
+            manifest.save(job.manifest_path)
+
+    @staticmethod
+    def _discard(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,175 @@
+"""
+Virtualized downloads list for the Resource Hub.
+- One ttk.Treeview item per file instead of a Frame + Label + 3 Buttons;
+  Tk only draws the rows that are scrolled into view
+- Changes are applied as diffs: a single row is inserted, removed or
+  renamed in place, and the list is never rebuilt
+- Filtering re-parents the matching items with one set_children call
+"""
+
+import bisect
+import os
+import time
+import tkinter as tk
+from tkinter import ttk
+
+EMPTY_TEXT = "No downloads or uploaded files yet."
+NO_MATCH_TEXT = "No files match your search."
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class DownloadsList:
+    def __init__(self, parent, directory, on_open=None, style="Downloads.Treeview"):
+        self.directory = directory
+        self.on_open = on_open
+        self.frame = tk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=("size", "modified"), show="tree headings",
+                                 selectmode="extended", style=style)
+        self.tree.heading("#0", text="File", anchor="w")
+        self.tree.heading("size", text="Size", anchor="e")
+        self.tree.heading("modified", text="Modified", anchor="w")
+        self.tree.column("#0", width=520, stretch=True)
+        self.tree.column("size", width=100, anchor="e", stretch=False)
+        self.tree.column("modified", width=150, stretch=False)
+        scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.empty_label = tk.Label(self.frame, text=EMPTY_TEXT, font=("Arial", 12))
+        self.tree.bind("<Double-1>", self._open_selected)
+        self.tree.bind("<Return>", self._open_selected)
+
+        self.items = {}     # name -> item id, attached or detached
+        self.visible = []   # sorted names currently shown
+        self.filter_text = ""
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # ---------- Diffs ----------
+
+    def sync(self, names, details=None):
+        # Bring the list in line with a full listing, touching only rows that changed.
+        # details maps name -> (size, mtime) when the caller already has them (e.g. from the index)
+        names = set(names)
+        gone = set(self.items) - names
+        new = names - set(self.items)
+        if not gone and not new:
+            self._update_empty()
+            return
+        if gone:
+            self.tree.delete(*[self.items.pop(name) for name in gone])
+        for name in new:
+            self.items[name] = self.tree.insert("", tk.END, text=name, values=self._describe(name, details))
+        self.visible = sorted(name for name in self.items if self._matches(name))
+        self.tree.set_children("", *[self.items[name] for name in self.visible])
+        self._update_empty()
+
+    def add(self, name):
+        if name in self.items:
+            self.tree.item(self.items[name], values=self._describe(name))
+            return
+        if self._matches(name):
+            index = bisect.bisect_left(self.visible, name)
+            self.items[name] = self.tree.insert("", index, text=name, values=self._describe(name))
+            self.visible.insert(index, name)
+        else:
+            item = self.tree.insert("", tk.END, text=name, values=self._describe(name))
+            self.tree.detach(item)
+            self.items[name] = item
+        self._update_empty()
+
+    def remove(self, name):
+        item = self.items.pop(name, None)
+        if item is None:
+            return
+        self.tree.delete(item)
+        self._drop_visible(name)
+        self._update_empty()
+
+    def rename(self, old, new):
+        item = self.items.pop(old, None)
+        if item is None:
+            self.add(new)
+            return
+        self._drop_visible(old)
+        replaced = self.items.pop(new, None)
+        if replaced is not None:
+            # Renamed over a listed file: its row goes, the renamed one takes its place
+            self.tree.delete(replaced)
+            self._drop_visible(new)
+        self.items[new] = item
+        self.tree.item(item, text=new, values=self._describe(new))
+        if self._matches(new):
+            index = bisect.bisect_left(self.visible, new)
+            self.tree.move(item, "", index)
+            self.visible.insert(index, new)
+        else:
+            self.tree.detach(item)
+        self._update_empty()
+
+    def set_filter(self, text):
+        text = text.strip().lower()
+        if text == self.filter_text:
+            return
+        self.filter_text = text
+        self.visible = sorted(name for name in self.items if self._matches(name))
+        # One Tk call: matching items become the root's children, the rest are detached
+        self.tree.set_children("", *[self.items[name] for name in self.visible])
+        self._update_empty()
+
+    # ---------- Selection ----------
+
+    def selected_names(self):
+        names = []
+        for item in self.tree.selection():
+            names.append(self.tree.item(item, "text"))
+        return names
+
+    def selected_paths(self):
+        return [os.path.join(self.directory, name) for name in self.selected_names()]
+
+    def select(self, name):
+        item = self.items.get(name)
+        if item is not None and name in self.visible:
+            self.tree.selection_set(item)
+            self.tree.see(item)
+
+    # ---------- Helpers ----------
+
+    def _matches(self, name):
+        return not self.filter_text or self.filter_text in name.lower()
+
+    def _drop_visible(self, name):
+        index = bisect.bisect_left(self.visible, name)
+        if index < len(self.visible) and self.visible[index] == name:
+            del self.visible[index]
+
+    def _describe(self, name, details=None):
+        if details is not None and name in details:
+            size, mtime = details[name]
+        else:
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                return ("", "")
+            size, mtime = st.st_size, st.st_mtime
+        return (format_size(size), time.strftime("%Y-%m-%d %H:%M", time.localtime(mtime)))
+
+    def _update_empty(self):
+        if self.visible:
+            self.empty_label.place_forget()
+        else:
+            self.empty_label.configure(text=NO_MATCH_TEXT if self.filter_text and self.items else EMPTY_TEXT)
+            self.empty_label.place(relx=0.5, y=60, anchor="n")
+
+    def _open_selected(self, event=None):
+        if self.on_open is not None:
+            for path in self.selected_paths():
+                self.on_open(path)
@@ -0,0 +1,287 @@
+"""
+Full-text search over the documents in the downloads library.
+- Text is extracted from PDF, DOCX, PPTX and TXT files in a background
+  process pool as files arrive, one file per task, so the Tk thread never
+  parses a document
+- An SQLite FTS5 table is the inverted index; queries are ranked with
+  BM25 (file names weigh more than body text) and return a snippet
+- PDF text comes from pypdf when it is installed, otherwise from a small
+  built-in reader for the text operators in (Flate-compressed) content
+  streams, which covers most generated past papers
+"""
+
+import html
+import os
+import re
+import sqlite3
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+# pypdf is imported by the worker processes on their first PDF; the app never needs it
+_pypdf = None
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".pptx", ".txt")
+INDEX_NAME = "fulltext.sqlite"
+MAX_PDF_BYTES = 200 * 1024 * 1024
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_indexable(name):
+    return name.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+# ---------- Text extraction (runs in worker processes) ----------
+
+def extract_text(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".txt":
+        return _extract_txt(path)
+    if ext == ".docx":
+        return _extract_office(path, re.compile(r"word/document\.xml$"), "w:t", "w:p")
+    if ext == ".pptx":
+        return _extract_office(path, re.compile(r"ppt/slides/slide\d+\.xml$"), "a:t", "a:p")
+    if ext == ".pdf":
+        return _extract_pdf(path)
+    return ""
+
+
+def _extract_txt(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def _extract_office(path, part_re, text_tag, para_tag):
+    text_re = re.compile(rf"<{text_tag}(?:\s[^>]*)?>(.*?)</{text_tag}>", re.DOTALL)
+    parts = []
+    with zipfile.ZipFile(path) as zf:
+        names = sorted((n for n in zf.namelist() if part_re.search(n)),
+                       key=lambda n: [int(d) if d.isdigit() else d for d in re.split(r"(\d+)", n)])
+        for name in names:
+            xml = zf.read(name).decode("utf-8", errors="replace")
+            for para in xml.split(f"</{para_tag}>"):
+                words = "".join(text_re.findall(para))
+                if words:
+                    parts.append(html.unescape(words))
+    return "\n".join(parts)
+
+
+def _load_pypdf():
+    global _pypdf
+    if _pypdf is None:
+        try:
+            import pypdf
+        except ImportError:
+            pypdf = False
+        _pypdf = pypdf
+    return _pypdf
+
+
+def _extract_pdf(path):
+    pypdf = _load_pypdf()
+    if pypdf:
+        try:
+            reader = pypdf.PdfReader(path)
+            return "\n".join((page.extract_text() or "") for page in reader.pages)
+        except Exception:
+            pass
+    return _extract_pdf_streams(path)
+
+
+PDF_STREAM_RE = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.DOTALL)
+PDF_TEXT_RE = re.compile(rb"\[(.*?)\]\s*TJ|\((.*?)(?<!\\)\)\s*(?:Tj|'|\")", re.DOTALL)
+PDF_STRING_RE = re.compile(rb"\((.*?)(?<!\\)\)|(-?\d+(?:\.\d+)?)", re.DOTALL)
+PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"", b"f": b"", b"(": b"(", b")": b")", b"\\": b"\\"}
+
+
+def _extract_pdf_streams(path):
+    if os.path.getsize(path) > MAX_PDF_BYTES:
+        return ""
+    with open(path, "rb") as f:
+        data = f.read()
+    out = []
+    for raw in PDF_STREAM_RE.findall(data):
+        try:
+            content = zlib.decompress(raw)
+        except zlib.error:
+            content = raw
+        if b"BT" not in content:
+            continue
+        for array, single in PDF_TEXT_RE.findall(content):
+            if not array:
+                out.append(_pdf_unescape(single).decode("latin-1"))
+                continue
+            # TJ arrays mix strings with kerning offsets; a large negative offset is a word gap
+            text = b""
+            for string, offset in PDF_STRING_RE.findall(array):
+                if offset:
+                    if float(offset) <= -200:
+                        text += b" "
+                else:
+                    text += _pdf_unescape(string)
+            out.append(text.decode("latin-1"))
+    return "\n".join(out)
+
+
+def _pdf_unescape(s):
+    return re.sub(rb"\\([nrtbf()\\]|[0-7]{1,3})",
+                  lambda m: PDF_ESCAPES.get(m.group(1)) or bytes([int(m.group(1), 8) & 0xFF]), s)
+
+
+# ---------- Index ----------
+
+class FullTextIndex:
+    def __init__(self, directory, db_path=None, workers=2):
+        self.directory = directory
+        if db_path is None:
+            store_dir = os.path.join(directory, ".store")
+            os.makedirs(store_dir, exist_ok=True)
+            db_path = os.path.join(store_dir, INDEX_NAME)
+        self.workers = workers
+        self._pool = None
+        self._pending = {}
+        self._closed = False
+        # Extraction results are written from the pool's callback thread
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY, name TEXT UNIQUE, size INTEGER, mtime_ns INTEGER);
+            CREATE VIRTUAL TABLE IF NOT EXISTS doc_text USING fts5(
+                name, body, tokenize = 'unicode61 remove_diacritics 2');
+        """)
+        self._db.commit()
+
+    # ---------- Scheduling (Tk thread) ----------
+
+    def schedule(self, name):
+        # Queue one file for (re)extraction if it is new or changed since it was indexed
+        if not is_indexable(name) or name in self._pending:
+            return
+        path = os.path.join(self.directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.remove(name)
+            return
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns FROM docs WHERE name = ?", (name,)).fetchone()
+        if row is not None and tuple(row) == (st.st_size, st.st_mtime_ns):
+            return
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        future = self._pool.submit(extract_text, path)
+        with self._lock:
+            self._pending[name] = future
+        future.add_done_callback(lambda f: self._store(name, st.st_size, st.st_mtime_ns, f))
+
+    def sync(self, names):
+        names = set(names)
+        with self._lock:
+            indexed = [row[0] for row in self._db.execute("SELECT name FROM docs")]
+        for name in indexed:
+            if name not in names:
+                self.remove(name)
+        for name in sorted(names):
+            self.schedule(name)
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def remove(self, name):
+        # A running extraction cannot be cancelled; dropping it from _pending makes _store discard its result
+        with self._lock:
+            future = self._pending.pop(name, None)
+        if future is not None:
+            future.cancel()
+        with self._lock:
+            row = self._db.execute("SELECT id FROM docs WHERE name = ?", (name,)).fetchone()
+            if row is not None:
+                self._db.execute("DELETE FROM doc_text WHERE rowid = ?", row)
+                self._db.execute("DELETE FROM docs WHERE id = ?", row)
+                self._db.commit()
+
+    def rename(self, old, new):
+        with self._lock:
+            future = self._pending.pop(old, None)
+            replaced = self._pending.pop(new, None)
+        for pending in (future, replaced):
+            if pending is not None:
+                pending.cancel()
+        with self._lock:
+            # Renamed over another file (mv a.pdf b.pdf): the target's entry goes first
+            target = self._db.execute("SELECT id FROM docs WHERE name = ?", (new,)).fetchone()
+            if target is not None:
+                self._db.execute("DELETE FROM doc_text WHERE rowid = ?", target)
+                self._db.execute("DELETE FROM docs WHERE id = ?", target)
+            row = self._db.execute("SELECT id FROM docs WHERE name = ?", (old,)).fetchone()
+            if row is not None:
+                body = self._db.execute("SELECT body FROM doc_text WHERE rowid = ?", row).fetchone()
+                self._db.execute("UPDATE docs SET name = ? WHERE id = ?", (new, row[0]))
+                self._db.execute("DELETE FROM doc_text WHERE rowid = ?", row)
+                self._db.execute("INSERT INTO doc_text (rowid, name, body) VALUES (?, ?, ?)",
+                                 (row[0], new, body[0] if body else ""))
+            self._db.commit()
+        if future is not None or row is None:
+            # Extracted under the old name, or not indexed under it: index the file under the new one
+            self.schedule(new)
+
+    # ---------- Queries ----------
+
+    def search(self, query, limit=50):
+        # [(name, score, snippet)] best first; every word must match, the last one as a prefix
+        terms = TOKEN_RE.findall(query.lower())
+        if not terms:
+            return []
+        match = " ".join(f'"{t}"' for t in terms[:-1]) + f' "{terms[-1]}"*'
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, bm25(doc_text, 4.0, 1.0) AS score,"
+                " snippet(doc_text, 1, '[', ']', '…', 12)"
+                " FROM doc_text WHERE doc_text MATCH ? ORDER BY score LIMIT ?",
+                (match.strip(), limit)).fetchall()
+        # FTS5 reports BM25 as a negative number (lower is better); flip it for display
+        return [(name, -score, snippet.replace("\n", " ")) for name, score, snippet in rows]
+
+    # ---------- Worker results ----------
+
+    def _store(self, name, size, mtime_ns, future):
+        if future.cancelled() or self._closed:
+            with self._lock:
+                if self._pending.get(name) is future:
+                    self._pending.pop(name, None)
+            return
+        try:
+            body = future.result()
+        except Exception:
+            # Unreadable or corrupt document: index the name only, so it is not retried until it changes
+            body = ""
+        with self._lock:
+            if self._closed or self._pending.get(name) is not future:
+                # Removed, renamed or scheduled again while this one ran: its result is stale
+                return
+            self._pending.pop(name, None)
+            row = self._db.execute("SELECT id FROM docs WHERE name = ?", (name,)).fetchone()
+            if row is not None:
+                self._db.execute("DELETE FROM doc_text WHERE rowid = ?", row)
+                self._db.execute("UPDATE docs SET size = ?, mtime_ns = ? WHERE id = ?", (size, mtime_ns, row[0]))
+                doc_id = row[0]
+            else:
+                doc_id = self._db.execute("INSERT INTO docs (name, size, mtime_ns) VALUES (?, ?, ?)",
+                                          (name, size, mtime_ns)).lastrowid
+            self._db.execute("INSERT INTO doc_text (rowid, name, body) VALUES (?, ?, ?)", (doc_id, name, body))
+            self._db.commit()
+
+    def close(self):
+        self._closed = True
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,80 @@
+"""
+Shared, pooled HTTP session for every network operation in the Resource Hub.
+- One requests.Session per process, so repeat requests to the same host
+  (ol.tie.go.tz, www.necta.go.tz) reuse kept-alive TCP/TLS connections
+- Per-host connection limit: callers block for a free pooled connection
+  instead of opening more sockets to one server
+- Default (connect, read) timeouts and retries with exponential backoff
+- One configurable chunk size for streamed bodies
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (10, 30)
+DEFAULT_CHUNK_SIZE = 64 * 1024
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Raised while a streamed body is being read; urllib3's Retry only covers the request itself
+STREAM_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class PooledSession(requests.Session):
+    def __init__(self, pool_per_host=6, max_hosts=16, retries=3, backoff=0.5,
+                 timeout=DEFAULT_TIMEOUT, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__()
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.backoff = backoff
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries,
+                      backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset({"GET", "HEAD"}),
+                      respect_retry_after_header=True, raise_on_status=False)
+        # pool_block makes pool_maxsize a hard per-host cap rather than a cache size
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=pool_per_host,
+                              pool_block=True, max_retries=retry)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.headers["User-Agent"] = "EducationalResourceHub/1.0"
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+    def backoff_delay(self, attempt):
+        # Same schedule urllib3 uses between request retries: backoff * 2 ** (attempt - 1)
+        return self.backoff * (2 ** max(0, attempt - 1))
+
+    def sleep_before_retry(self, attempt, cancel_event=None):
+        delay = self.backoff_delay(attempt)
+        if cancel_event is not None:
+            # Wake early if the caller cancels while we wait
+            return not cancel_event.wait(delay)
+        time.sleep(delay)
+        return True
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_session(**options):
+    # Options only apply to the first call; later callers get the same pooled session
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PooledSession(**options)
+        return _shared
+
+
+def close_shared_session():
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
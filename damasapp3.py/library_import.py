@@ -0,0 +1,267 @@
+"""
+Batch import of outside files (a flash drive, a shared folder) into the
+downloads library, for Add Files / Add Folder.
+- Folders are walked for documents; the library stays flat, so files from
+  subfolders land next to each other
+- Each file is copied once, into <name>.import next to its final name, and
+  renamed into place, so files hard-linked into the blob store are never
+  written through. The bytes move inside the kernel (copy_file_range, or
+  sendfile where that cannot cross filesystems) and the SHA-256 is taken
+  from the pages just written, through mmap, while they are still cached:
+  the source, often a slow USB stick, is read only once. Without either
+  call the copy goes through one reused buffer and is hashed on the way
+- Duplicates are resolved without asking: a file whose content the library
+  already has, under any name, is skipped; a different file whose name is
+  taken is imported as "name (2).pdf", as pack imports do. Only files as
+  large as something already in the library are hashed before copying
+- Content the blob store already holds is linked instead of copied, and
+  new content is added to the store
+- With the library index, digests come from it and imported files are
+  recorded with theirs, so the watcher does not hash them again
+
+    python library_import.py /media/usb/Physics notes.pdf --downloads ./downloads
+"""
+
+import argparse
+import errno
+import hashlib
+import mmap
+import os
+import shutil
+
+from blob_store import BlobStore, file_sha256
+from library_index import is_library_name
+
+CHUNK = 8 * 1024 * 1024
+DOCUMENT_EXTENSIONS = (".pdf", ".docx", ".txt", ".pptx")
+# Errors meaning the call cannot copy between these two files, rather than a failed copy
+UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF,
+               getattr(errno, "ENOTSOCK", errno.EINVAL)}
+
+
+def collect_files(paths, extensions=DOCUMENT_EXTENSIONS):
+    # Chosen files are taken as they are; folders are walked for documents, skipping hidden entries
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            files.extend(os.path.join(dirpath, name) for name in sorted(filenames)
+                         if not name.startswith(".") and name.lower().endswith(extensions))
+    return files
+
+
+# ---------- Copying ----------
+
+def _copy_file_range(in_fd, out_fd, offset, count):
+    return os.copy_file_range(in_fd, out_fd, count, offset, offset)
+
+
+def _sendfile(in_fd, out_fd, offset, count):
+    # Writes at out_fd's position, which follows offset as long as nothing else writes to it
+    return os.sendfile(out_fd, in_fd, offset, count)
+
+
+KERNEL_COPIES = [call for name, call in (("copy_file_range", _copy_file_range), ("sendfile", _sendfile))
+                 if hasattr(os, name)]
+
+
+def copy_file(src, dst):
+    """Copy src to a new file dst, keeping its times; returns the SHA-256 of what was written."""
+    digest = hashlib.sha256()
+    with open(src, "rb", buffering=0) as fin, open(dst, "w+b") as fout:
+        size = os.fstat(fin.fileno()).st_size
+        copied = _kernel_copy(fin.fileno(), fout.fileno(), size, digest)
+        # The rest (everything, without a kernel copy; or a file that grew meanwhile) goes through a buffer
+        fin.seek(copied)
+        fout.seek(copied)
+        buf = bytearray(min(CHUNK, max(size - copied, 64 * 1024)))
+        view = memoryview(buf)
+        while True:
+            n = fin.readinto(buf)
+            if not n:
+                break
+            digest.update(view[:n])
+            fout.write(view[:n])
+    shutil.copystat(src, dst)
+    return digest.hexdigest()
+
+
+def _kernel_copy(in_fd, out_fd, size, digest):
+    # Returns how many bytes were copied (and hashed) without passing through Python
+    offset = 0
+    for call in KERNEL_COPIES:
+        try:
+            while offset < size:
+                n = call(in_fd, out_fd, offset, min(CHUNK, size - offset))
+                if not n:
+                    break
+                _hash_written(out_fd, offset, n, digest)
+                offset += n
+        except OSError as e:
+            if e.errno not in UNSUPPORTED:
+                raise
+            if not offset:
+                continue        # this call cannot do it at all; try the next one
+        return offset
+    return offset
+
+
+def _hash_written(fd, offset, length, digest):
+    # mmap offsets must be aligned, so map from the granule holding offset
+    start = offset - offset % mmap.ALLOCATIONGRANULARITY
+    with mmap.mmap(fd, offset + length - start, offset=start, access=mmap.ACCESS_READ) as m:
+        with memoryview(m) as view:
+            digest.update(view[offset - start:])
+
+
+# ---------- Importing ----------
+
+class ImportReport:
+    def __init__(self):
+        self.imported = []      # library names of new files
+        self.renamed = []       # (source name, library name) for files imported under another name
+        self.present = []       # (source path, library name already holding that content)
+        self.failed = []        # (source path, reason)
+        self.bytes = 0
+
+    def summary(self):
+        renamed = f" ({len(self.renamed)} renamed)" if self.renamed else ""
+        failed = f", {len(self.failed)} failed" if self.failed else ""
+        return (f"{len(self.imported)} imported{renamed}, {len(self.present)} already here{failed}; "
+                f"{self.bytes / 1e6:.1f} MB")
+
+
+class _Library:
+    # What the library holds, for spotting duplicates: sizes up front, digests only when needed
+    def __init__(self, directory, index):
+        self.directory = directory
+        self.index = index
+        self.by_size = {}
+        self.digests = {}
+        if index is not None:
+            listing = ((name, size) for name, (size, _) in index.entries().items())
+        else:
+            listing = self._scan()
+        for name, size in listing:
+            self.by_size.setdefault(size, []).append(name)
+
+    def _scan(self):
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if is_library_name(entry.name) and entry.is_file():
+                    yield entry.name, entry.stat().st_size
+
+    def has_size(self, size):
+        return size in self.by_size
+
+    def holding(self, size, digest):
+        for name in self.by_size.get(size, ()):
+            if self.digest(name) == digest:
+                return name
+        return None
+
+    def digest(self, name):
+        if name not in self.digests:
+            entry = self.index.get(name) if self.index is not None else None
+            try:
+                self.digests[name] = (entry and entry["digest"]) or file_sha256(os.path.join(self.directory, name))
+            except OSError:
+                self.digests[name] = None       # gone since the listing
+        return self.digests[name]
+
+    def add(self, name, size, digest):
+        self.by_size.setdefault(size, []).append(name)
+        self.digests[name] = digest
+
+    def free_name(self, name):
+        base, ext = os.path.splitext(name)
+        copy = 1
+        while os.path.exists(os.path.join(self.directory, name)):
+            copy += 1
+            name = f"{base} ({copy}){ext}"
+        return name
+
+
+def import_files(sources, directory, blob_store=None, index=None, progress=None):
+    """Copy outside files into the library directory; returns an ImportReport.
+
+    progress(done, total, name) is called after each file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    report = ImportReport()
+    library = _Library(directory, index)
+    for done, src in enumerate(sources, 1):
+        try:
+            _import_one(src, directory, library, blob_store, index, report)
+        except OSError as e:
+            report.failed.append((src, str(e)))
+        if progress is not None:
+            progress(done, len(sources), os.path.basename(src))
+    return report
+
+
+def _import_one(src, directory, library, blob_store, index, report):
+    name = os.path.basename(src)
+    if not is_library_name(name):
+        report.failed.append((src, "hidden or temporary file name"))
+        return
+    size = os.path.getsize(src)
+    digest = None
+    if library.has_size(size):
+        digest = file_sha256(src)
+        same = library.holding(size, digest)
+        if same is not None:
+            report.present.append((src, same))
+            return
+    final = library.free_name(name)
+    dest = os.path.join(directory, final)
+    if digest is not None and blob_store is not None:
+        # Already hashed: the store links known content and copies the rest
+        blob_store.import_file(src, dest, digest=digest)
+    else:
+        tmp = dest + ".import"
+        try:
+            digest = copy_file(src, tmp)
+        except BaseException:
+            _discard(tmp)
+            raise
+        os.replace(tmp, dest)
+        if blob_store is not None:
+            blob_store.ingest(dest, digest=digest)
+    if index is not None:
+        index.update(final, digest=digest)
+    library.add(final, size, digest)
+    report.imported.append(final)
+    if final != name:
+        report.renamed.append((name, final))
+    report.bytes += size
+
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import files and folders into the downloads library.")
+    parser.add_argument("paths", nargs="+", help="files, or folders to import documents from")
+    parser.add_argument("--downloads", default=os.path.join(os.getcwd(), "downloads"))
+    args = parser.parse_args(argv)
+    store = BlobStore(args.downloads)
+    try:
+        report = import_files(collect_files(args.paths), args.downloads, store,
+                              progress=lambda done, total, name: print(f"[{done}/{total}] {name}"))
+    finally:
+        store.close()
+    for src, reason in report.failed:
+        print(f"FAILED {src}: {reason}")
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
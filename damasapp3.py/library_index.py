@@ -0,0 +1,328 @@
+"""
+Persistent metadata index of the downloads library.
+- SQLite table of name, size, mtime, type and SHA-256 for every file in
+  downloads/, so startup and refresh read the index instead of the disk
+- A watcher thread keeps it current: inotify on Linux, otherwise (or when
+  inotify is unavailable) an os.scandir poll comparing sizes and mtimes
+- Every change is also posted to self.events as ("added", name),
+  ("removed", name), ("changed", name) or ("renamed", old, new) for the UI
+  to drain with root.after
+"""
+
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import sqlite3
+import stat
+import struct
+import sys
+import threading
+
+from blob_store import file_sha256
+
+INDEX_NAME = "library.sqlite"
+HIDDEN_SUFFIXES = (".part", ".part.json", ".tmp", ".link", ".import")
+
+# inotify(7) event bits
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_library_name(name):
+    # Hidden store files and in-flight temporaries are not part of the library
+    return not name.startswith(".") and not name.endswith(HIDDEN_SUFFIXES)
+
+
+def file_kind(name):
+    return os.path.splitext(name)[1].lower().lstrip(".") or "file"
+
+
+class LibraryIndex:
+    def __init__(self, directory, db_path=None):
+        self.directory = directory
+        if db_path is None:
+            store_dir = os.path.join(directory, ".store")
+            os.makedirs(store_dir, exist_ok=True)
+            db_path = os.path.join(store_dir, INDEX_NAME)
+        self.events = queue.Queue()
+        # The watcher thread writes while the Tk thread reads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                name TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, kind TEXT, digest TEXT)
+        """)
+        self._db.commit()
+
+    # ---------- Reads (Tk thread) ----------
+
+    def entries(self):
+        # name -> (size, mtime in seconds)
+        with self._lock:
+            rows = self._db.execute("SELECT name, size, mtime_ns FROM files").fetchall()
+        return {name: (size, mtime_ns / 1e9) for name, size, mtime_ns in rows}
+
+    def names(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT name FROM files")]
+
+    def get(self, name):
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns, kind, digest FROM files WHERE name = ?",
+                                   (name,)).fetchone()
+        if row is None:
+            return None
+        return {"name": name, "size": row[0], "mtime": row[1] / 1e9, "kind": row[2], "digest": row[3]}
+
+    def find_digest(self, digest):
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT name FROM files WHERE digest = ?", (digest,))]
+
+    # ---------- Writes ----------
+
+    def update(self, name, digest=None):
+        # Record (or refresh) one file from its current stat; returns False if it is gone
+        try:
+            st = os.stat(os.path.join(self.directory, name))
+        except OSError:
+            self.remove(name)
+            return False
+        if not stat.S_ISREG(st.st_mode):
+            return False
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns, digest FROM files WHERE name = ?", (name,)).fetchone()
+            if digest is None and row is not None and (row[0], row[1]) == (st.st_size, st.st_mtime_ns):
+                digest = row[2]
+            self._db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                             (name, st.st_size, st.st_mtime_ns, file_kind(name), digest))
+            self._db.commit()
+        return True
+
+    def remove(self, name):
+        with self._lock:
+            self._db.execute("DELETE FROM files WHERE name = ?", (name,))
+            self._db.commit()
+
+    def rename(self, old, new):
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM files WHERE name = ?", (old,)).fetchone() is None:
+                return
+            self._db.execute("DELETE FROM files WHERE name = ?", (new,))
+            self._db.execute("UPDATE files SET name = ?, kind = ? WHERE name = ?", (new, file_kind(new), old))
+            self._db.commit()
+
+    def fill_missing_digests(self, stop=None):
+        # Hash files indexed without a digest (new or changed); runs on the watcher thread
+        with self._lock:
+            names = [row[0] for row in self._db.execute("SELECT name FROM files WHERE digest IS NULL")]
+        for name in names:
+            if stop is not None and stop.is_set():
+                return
+            try:
+                digest = file_sha256(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            with self._lock:
+                self._db.execute("UPDATE files SET digest = ? WHERE name = ?", (digest, name))
+                self._db.commit()
+
+    def rescan(self):
+        # Reconcile the index with the directory using scandir sizes and mtimes
+        seen = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not is_library_name(entry.name):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                seen[entry.name] = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            known = {name: (size, mtime_ns) for name, size, mtime_ns
+                     in self._db.execute("SELECT name, size, mtime_ns FROM files")}
+        added = [name for name in seen if name not in known]
+        removed = [name for name in known if name not in seen]
+        changed = [name for name in seen if name in known and seen[name] != known[name]]
+        # A file that vanished and reappeared with the same size and mtime was renamed
+        vanished = {}
+        for name in removed:
+            vanished.setdefault(known[name], []).append(name)
+        renamed = []
+        for name in list(added):
+            candidates = vanished.get(seen[name])
+            if candidates and len(candidates) == 1:
+                old = candidates.pop()
+                renamed.append((old, name))
+                added.remove(name)
+                removed.remove(old)
+        for old, new in renamed:
+            self.rename(old, new)
+            self.events.put(("renamed", old, new))
+        if added or removed or changed:
+            with self._lock:
+                self._db.executemany("DELETE FROM files WHERE name = ?", [(name,) for name in removed])
+                self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, NULL)",
+                                     [(name, seen[name][0], seen[name][1], file_kind(name))
+                                      for name in added + changed])
+                self._db.commit()
+        for name in added:
+            self.events.put(("added", name))
+        for name in removed:
+            self.events.put(("removed", name))
+        for name in changed:
+            self.events.put(("changed", name))
+        return added, removed, changed
+
+    def poll_events(self, max_events=500):
+        events = []
+        for _ in range(max_events):
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class LibraryWatcher(threading.Thread):
+    """Keeps a LibraryIndex in step with its directory from a background thread."""
+
+    def __init__(self, index, poll_interval=2.0, use_inotify=True):
+        super().__init__(name="library-watcher", daemon=True)
+        self.index = index
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and sys.platform.startswith("linux")
+        self.mode = None
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        # Catch up with whatever changed while the app was closed
+        self.index.rescan()
+        self.index.fill_missing_digests(self._stop_event)
+        fd = self._open_inotify() if self.use_inotify else None
+        if fd is None:
+            self.mode = "polling"
+            self._poll_loop()
+        else:
+            self.mode = "inotify"
+            try:
+                self._inotify_loop(fd)
+            finally:
+                os.close(fd)
+
+    # ---------- Polling fallback ----------
+
+    def _poll_loop(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                added, removed, changed = self.index.rescan()
+            except OSError:
+                continue
+            if added or changed:
+                self.index.fill_missing_digests(self._stop_event)
+
+    # ---------- inotify ----------
+
+    def _open_inotify(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            if libc.inotify_add_watch(fd, os.fsencode(self.index.directory), WATCH_MASK) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def _inotify_loop(self, fd):
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([fd], [], [], 0.5)
+            if not ready:
+                continue
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            if not self._apply(self._parse(data)):
+                # Queue overflow or the directory itself went away: fall back to a full rescan
+                self.index.rescan()
+            self.index.fill_missing_digests(self._stop_event)
+
+    @staticmethod
+    def _parse(data):
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((mask, cookie, name))
+        return events
+
+    def _apply(self, events):
+        index = self.index
+        moved_from = {}
+        touched = []
+        for mask, cookie, name in events:
+            if mask & (IN_Q_OVERFLOW | IN_DELETE_SELF | IN_MOVE_SELF):
+                return False
+            if mask & IN_ISDIR:
+                continue
+            if mask & IN_MOVED_FROM:
+                moved_from[cookie] = name
+            elif mask & IN_MOVED_TO:
+                old = moved_from.pop(cookie, None)
+                if old is not None and is_library_name(old) and is_library_name(name):
+                    index.rename(old, name)
+                    index.update(name)
+                    index.events.put(("renamed", old, name))
+                else:
+                    if old is not None and is_library_name(old):
+                        index.remove(old)
+                        index.events.put(("removed", old))
+                    touched.append(name)
+            elif mask & IN_DELETE:
+                if is_library_name(name):
+                    index.remove(name)
+                    index.events.put(("removed", name))
+            elif mask & (IN_CREATE | IN_CLOSE_WRITE | IN_ATTRIB):
+                touched.append(name)
+        # Moved out of the directory (no matching MOVED_TO)
+        for name in moved_from.values():
+            if is_library_name(name):
+                index.remove(name)
+                index.events.put(("removed", name))
+        for name in dict.fromkeys(touched):
+            if is_library_name(name) and index.get(name) is None:
+                if index.update(name):
+                    index.events.put(("added", name))
+            elif is_library_name(name):
+                if index.update(name):
+                    index.events.put(("changed", name))
+        return True
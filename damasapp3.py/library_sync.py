@@ -0,0 +1,678 @@
+"""
+Delta sync of the downloads library from one machine to others.
+- The source describes its library in a manifest: per file the size, mtime,
+  SHA-256 and a (weak, strong) checksum for each fixed-size block.
+  Signatures are cached in .store/sync.sqlite, so only new or changed files
+  are hashed again; a renamed file keeps its cache entry (same inode, size
+  and mtime)
+- The receiving machine does the matching (as zsync does): it slides a
+  rolling checksum over its own old copy of a changed file, finds every
+  block it already has at any offset, so insertions and deletions do not
+  defeat it, and fetches only the missing byte ranges. The source only
+  serves manifests and ranges, so one source can feed a whole lab
+- A local file that the source has under another name is renamed in place,
+  so a rename done in the app arrives as a rename (the watcher and the
+  content index see a move) instead of a delete and a fresh copy. Content
+  the receiver already has under a name it keeps is linked locally
+- Every rebuilt file is checked against the source's SHA-256 before it
+  replaces anything, and it replaces by rename, so files hard-linked into
+  the blob store are never written through
+- Transports: a TCP socket (LibraryServer / SocketSource) or a shared folder
+  holding the source library and its published manifest (publish /
+  FolderSource)
+- With NumPy the rolling checksum is computed a window at a time; without it
+  a plain rolling loop finds the same blocks, more slowly
+
+    python library_sync.py serve --downloads ./downloads --port 8770
+    python library_sync.py pull teacher-pc:8770 --downloads ./downloads
+    python library_sync.py publish --downloads /mnt/share/downloads
+    python library_sync.py pull /mnt/share/downloads --downloads ./downloads --delete
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import mmap
+import os
+import shutil
+import socket
+import socketserver
+import sqlite3
+import stat
+import struct
+import threading
+import zlib
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from blob_store import file_sha256
+from library_index import is_library_name
+
+BLOCK_MIN = 2 * 1024
+BLOCK_MAX = 64 * 1024
+STRONG_BYTES = 16
+WINDOW = 1024 * 1024
+WEAK_TABLE_BITS = 24
+MAX_READ = 8 * 1024 * 1024
+CACHE_NAME = "sync.sqlite"
+MANIFEST_NAME = "sync-manifest.json"
+DEFAULT_PORT = 8770
+FRAME = struct.Struct(">I")
+
+
+def block_size_for(size):
+    # About 4 * sqrt(size), as a power of two: small files get fine blocks, big ones short manifests
+    target = int(math.sqrt(size)) * 4
+    block = BLOCK_MIN
+    while block < target and block < BLOCK_MAX:
+        block *= 2
+    return block
+
+
+def weak_sum(block):
+    # rsync's checksum: a = sum of the bytes, b = sum of the running sums, both mod 2**16
+    a = sum(block)
+    b = sum(itertools.accumulate(block))
+    return ((b & 0xFFFF) << 16) | (a & 0xFFFF)
+
+
+def strong_sum(block):
+    return hashlib.blake2b(block, digest_size=STRONG_BYTES).digest()
+
+
+def block_weak_sums(data, block):
+    # weak_sum of every block in data; with NumPy one matrix-vector product per call
+    if np is None or len(data) < block:
+        return [weak_sum(data[i:i + block]) for i in range(0, len(data), block)]
+    whole = len(data) // block
+    x = np.frombuffer(data, dtype=np.uint8, count=whole * block).reshape(whole, block).astype(np.uint64)
+    a = x.sum(axis=1)
+    b = x @ np.arange(block, 0, -1, dtype=np.uint64)
+    sums = (((b & np.uint64(0xFFFF)) << np.uint64(16)) | (a & np.uint64(0xFFFF))).tolist()
+    if whole * block < len(data):
+        sums.append(weak_sum(data[whole * block:]))
+    return sums
+
+
+def file_signature(path):
+    st = os.stat(path)
+    block = block_size_for(st.st_size)
+    digest = hashlib.sha256()
+    weak = array("I")
+    strong = bytearray()
+    with open(path, "rb") as f:
+        # Read many blocks at a time so the weak sums are computed in bulk
+        for chunk in iter(lambda: f.read(block * 64), b""):
+            digest.update(chunk)
+            weak.extend(block_weak_sums(chunk, block))
+            view = memoryview(chunk)
+            for i in range(0, len(chunk), block):
+                strong += strong_sum(view[i:i + block])
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest.hexdigest(),
+            "block_size": block, "weak": weak, "strong": bytes(strong)}
+
+
+def encode_signature(sig):
+    return {"size": sig["size"], "mtime_ns": sig["mtime_ns"], "digest": sig["digest"],
+            "block_size": sig["block_size"], "weak": list(sig["weak"]), "strong": sig["strong"].hex()}
+
+
+def decode_signature(data):
+    return dict(data, weak=array("I", data["weak"]), strong=bytes.fromhex(data["strong"]))
+
+
+class SignatureCache:
+    """Block signatures of one library directory, recomputed only for files that changed."""
+
+    def __init__(self, directory, db_path=None):
+        self.directory = directory
+        if db_path is None:
+            db_path = os.path.join(directory, ".store", CACHE_NAME)
+            try:
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            except OSError:
+                db_path = ":memory:"
+        self._lock = threading.Lock()
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS sigs (name TEXT PRIMARY KEY, size INTEGER, "
+                             "mtime_ns INTEGER, ino INTEGER, digest TEXT, block_size INTEGER, weak BLOB, strong BLOB)")
+        except sqlite3.OperationalError:
+            # Read-only share: keep signatures for this run only
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+            self._db.execute("CREATE TABLE sigs (name TEXT PRIMARY KEY, size INTEGER, "
+                             "mtime_ns INTEGER, ino INTEGER, digest TEXT, block_size INTEGER, weak BLOB, strong BLOB)")
+
+    def library(self):
+        """{name: signature} for every library file, hashing only what changed since last time."""
+        current = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not is_library_name(entry.name):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    current[entry.name] = st
+        with self._lock:
+            rows = {row[0]: row for row in self._db.execute("SELECT * FROM sigs")}
+        by_identity = {(row[1], row[2], row[3]): name for name, row in rows.items() if name not in current}
+        signatures, fresh = {}, []
+        for name, st in current.items():
+            row = rows.get(name)
+            if row is None or (row[1], row[2], row[3]) != (st.st_size, st.st_mtime_ns, st.st_ino):
+                # Renamed since the last scan: same inode, size and mtime under another name
+                old = by_identity.pop((st.st_size, st.st_mtime_ns, st.st_ino), None)
+                row = rows.get(old) if old is not None else None
+            if row is not None:
+                signatures[name] = {"size": row[1], "mtime_ns": row[2], "digest": row[4], "block_size": row[5],
+                                    "weak": array("I", row[6]), "strong": row[7]}
+            else:
+                try:
+                    signatures[name] = file_signature(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+            fresh.append((name, signatures[name], st.st_ino))
+        with self._lock:
+            self._db.execute("DELETE FROM sigs")
+            self._db.executemany("INSERT INTO sigs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [(name, sig["size"], sig["mtime_ns"], ino, sig["digest"], sig["block_size"],
+                                   sig["weak"].tobytes(), sig["strong"]) for name, sig, ino in fresh])
+            self._db.commit()
+        return signatures
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ---------- Finding blocks in a local file ----------
+
+def find_blocks(path, sig):
+    """{block index: offset} of the signature's whole blocks found anywhere in the file at path."""
+    block = sig["block_size"]
+    whole = sig["size"] // block
+    wanted = {}
+    for index in range(whole):
+        wanted.setdefault(sig["weak"][index], []).append(index)
+    found = {}
+    if not wanted:
+        return found
+    strong = sig["strong"]
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < block:
+            return found
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+
+            def match(offset, weak):
+                # Unfound block with this weak sum and the same strong hash, or None
+                digest = None
+                for index in wanted.get(weak, ()):
+                    if index in found:
+                        continue
+                    if digest is None:
+                        digest = strong_sum(data[offset:offset + block])
+                    if digest == strong[index * STRONG_BYTES:(index + 1) * STRONG_BYTES]:
+                        return index
+                return None
+
+            scan = _scan_numpy(data, size, block, wanted, match) if np is not None else \
+                _scan_python(data, size, block, match)
+            position, expect = 0, None
+            while position <= size - block and len(found) < whole:
+                # After a match the next block usually follows directly: one strong hash, no rolling
+                if expect is not None and expect < whole and expect not in found and \
+                        strong_sum(data[position:position + block]) == \
+                        strong[expect * STRONG_BYTES:(expect + 1) * STRONG_BYTES]:
+                    found[expect] = position
+                else:
+                    hit = scan(position)
+                    if hit is None:
+                        break
+                    position, expect = hit
+                    found[expect] = position
+                position += block
+                expect += 1
+            del scan    # drops the NumPy view of the map before it is closed
+    return found
+
+
+def _scan_numpy(data, size, block, wanted, match):
+    # Weak sums at every offset of a window from prefix sums:
+    #   a(k) = P[k+B] - P[k],  b(k) = (k+B) * a(k) - (Q[k+B] - Q[k]),  Q = prefix sums of i * x[i]
+    # uint32 arithmetic wraps mod 2**32, which leaves the results mod 2**16 exact
+    view = np.frombuffer(data, dtype=np.uint8)
+    low = np.uint32(0xFFFF)
+    # Membership through a table indexed by the low bits: one gather per offset, exact check on the rare hits
+    table = np.zeros(1 << WEAK_TABLE_BITS, dtype=bool)
+    table[np.fromiter(wanted, dtype=np.uint32) & np.uint32((1 << WEAK_TABLE_BITS) - 1)] = True
+    table_mask = np.uint32((1 << WEAK_TABLE_BITS) - 1)
+
+    def scan(position):
+        # First (offset, block index) at or after position; windows grow while nothing matches
+        window = 4 * block
+        last = size - block + 1
+        while position < last:
+            count = min(window, last - position)
+            x = view[position:position + count + block - 1].astype(np.uint32)
+            prefix = np.zeros(len(x) + 1, dtype=np.uint32)
+            np.cumsum(x, out=prefix[1:])
+            weighted = np.zeros(len(x) + 1, dtype=np.uint32)
+            np.cumsum(x * np.arange(len(x), dtype=np.uint32), out=weighted[1:])
+            a = prefix[block:block + count] - prefix[:count]
+            b = (np.arange(block, block + count, dtype=np.uint32) * a
+                 - (weighted[block:block + count] - weighted[:count]))
+            weak = ((b & low) << np.uint32(16)) | (a & low)
+            for hit in np.flatnonzero(table[weak & table_mask]).tolist():
+                index = match(position + hit, int(weak[hit]))
+                if index is not None:
+                    return position + hit, index
+            position += count
+            window = min(window * 4, WINDOW)
+        return None
+
+    return scan
+
+
+def _scan_python(data, size, block, match):
+    def scan(position):
+        a = sum(data[position:position + block]) & 0xFFFF
+        b = sum(itertools.accumulate(data[position:position + block])) & 0xFFFF
+        for offset in range(position, size - block + 1):
+            index = match(offset, (b << 16) | a)
+            if index is not None:
+                return offset, index
+            if offset + block < size:
+                out, new = data[offset], data[offset + block]
+                a = (a - out + new) & 0xFFFF
+                b = (b - block * out + a) & 0xFFFF
+        return None
+
+    return scan
+
+
+# ---------- Sources ----------
+
+class FolderSource:
+    """A source library reachable as a folder (network share, USB drive) with a published manifest."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def manifest(self):
+        path = os.path.join(self.directory, ".store", MANIFEST_NAME)
+        try:
+            with open(path, encoding="utf-8") as f:
+                files = json.load(f)["files"]
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{self.directory} has no sync manifest; run 'library_sync.py publish' "
+                                    "on the source machine first") from None
+        return {name: decode_signature(sig) for name, sig in files.items()}
+
+    def read(self, name, ranges):
+        # Only the requested ranges cross the share
+        parts = []
+        with open(os.path.join(self.directory, name), "rb") as f:
+            for offset, length in ranges:
+                f.seek(offset)
+                parts.append(f.read(length))
+        return b"".join(parts)
+
+    def close(self):
+        pass
+
+
+def publish(directory):
+    """Write the library's manifest where FolderSource looks for it; returns the number of files."""
+    cache = SignatureCache(directory)
+    try:
+        files = cache.library()
+    finally:
+        cache.close()
+    path = os.path.join(directory, ".store", MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"files": {name: encode_signature(sig) for name, sig in files.items()}}, f)
+    os.replace(tmp, path)
+    return len(files)
+
+
+def _send_frame(sock, header, payload=b""):
+    data = json.dumps(header).encode("utf-8")
+    sock.sendall(FRAME.pack(len(data)) + data + payload)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("connection closed mid-message")
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv_frame(sock):
+    (length,) = FRAME.unpack(_recv_exact(sock, FRAME.size))
+    return json.loads(_recv_exact(sock, length))
+
+
+class _SyncHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                request = _recv_frame(self.request)
+            except (ConnectionError, struct.error):
+                return
+            try:
+                if request.get("op") == "manifest":
+                    files = server.cache.library()
+                    payload = zlib.compress(json.dumps(
+                        {name: encode_signature(sig) for name, sig in files.items()}).encode("utf-8"), 6)
+                elif request.get("op") == "read":
+                    name = request["name"]
+                    if os.sep in name or "/" in name or not is_library_name(name):
+                        raise ValueError(f"not a library file: {name!r}")
+                    if sum(length for _, length in request["ranges"]) > MAX_READ:
+                        raise ValueError("read request too large")
+                    payload = FolderSource(server.directory).read(name, request["ranges"])
+                else:
+                    raise ValueError(f"unknown request: {request.get('op')!r}")
+            except (OSError, ValueError, KeyError) as e:
+                _send_frame(self.request, {"ok": False, "error": str(e)})
+                continue
+            _send_frame(self.request, {"ok": True, "size": len(payload)}, payload)
+
+
+class LibraryServer(socketserver.ThreadingTCPServer):
+    """Serves a library's manifest and byte ranges to SocketSource clients."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, directory, host="0.0.0.0", port=DEFAULT_PORT):
+        self.directory = directory
+        self.cache = SignatureCache(directory)
+        super().__init__((host, port), _SyncHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.cache.close()
+
+
+class SocketSource:
+    def __init__(self, host, port=DEFAULT_PORT, timeout=60):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+
+    def _call(self, request):
+        _send_frame(self.sock, request)
+        header = _recv_frame(self.sock)
+        if not header["ok"]:
+            raise OSError(header["error"])
+        return _recv_exact(self.sock, header["size"])
+
+    def manifest(self):
+        files = json.loads(zlib.decompress(self._call({"op": "manifest"})))
+        return {name: decode_signature(sig) for name, sig in files.items()}
+
+    def read(self, name, ranges):
+        return self._call({"op": "read", "name": name, "ranges": ranges})
+
+    def close(self):
+        self.sock.close()
+
+
+def open_source(spec):
+    # A directory path, or host[:port]
+    if os.path.isdir(spec):
+        return FolderSource(spec)
+    host, _, port = spec.rpartition(":") if ":" in spec else (spec, "", "")
+    return SocketSource(host or spec, int(port) if port else DEFAULT_PORT)
+
+
+# ---------- Receiving ----------
+
+class SyncReport:
+    def __init__(self):
+        self.unchanged = 0
+        self.renamed = []       # (old, new)
+        self.linked = []        # copied from another local file with the same content
+        self.updated = []       # rebuilt from a local basis plus fetched blocks
+        self.added = []         # fetched whole
+        self.deleted = []
+        self.failed = []        # (name, reason)
+        self.fetched_bytes = 0
+        self.reused_bytes = 0
+
+    def summary(self):
+        return (f"{self.unchanged} unchanged, {len(self.renamed)} renamed, {len(self.updated)} updated, "
+                f"{len(self.added) + len(self.linked)} added, {len(self.deleted)} deleted, "
+                f"{len(self.failed)} failed; {self.fetched_bytes / 1e6:.1f} MB fetched, "
+                f"{self.reused_bytes / 1e6:.1f} MB reused")
+
+
+def sync_library(source, directory, delete=False, progress=None):
+    """Make directory match the source library; returns a SyncReport.
+
+    progress(done, total, name) is called after each file that needed work.
+    """
+    os.makedirs(directory, exist_ok=True)
+    report = SyncReport()
+    remote = source.manifest()
+    cache = SignatureCache(directory)
+    try:
+        local = cache.library()
+    finally:
+        cache.close()
+    by_digest = {}
+    for name, sig in local.items():
+        by_digest.setdefault(sig["digest"], []).append(name)
+    vanished = {name for name in local if name not in remote}
+
+    renames, needed = [], []
+    for name, sig in remote.items():
+        if os.sep in name or "/" in name or not is_library_name(name):
+            report.failed.append((name, "not a library file name"))
+            continue
+        mine = local.get(name)
+        if mine is not None and mine["digest"] == sig["digest"]:
+            report.unchanged += 1
+            continue
+        old = next((o for o in by_digest.get(sig["digest"], ()) if o in vanished), None)
+        if old is not None:
+            vanished.discard(old)
+            renames.append((old, name))
+        else:
+            needed.append(name)
+
+    # Build every new file next to its final name first: bases are read while they are still intact
+    staged = []
+    for done, name in enumerate(needed, 1):
+        try:
+            staged.append(_rebuild(source, directory, name, remote[name], local, by_digest, vanished, report))
+        except (OSError, ValueError) as e:
+            report.failed.append((name, str(e)))
+        if progress is not None:
+            progress(done, len(needed), name)
+
+    _apply_renames(directory, renames, report)
+    for name, tmp, replaced in staged:
+        os.replace(tmp, os.path.join(directory, name))
+        if replaced is not None:
+            # Renamed and edited at the source: the old name's content lives on in the new file
+            _remove(os.path.join(directory, replaced))
+            report.renamed.append((replaced, name))
+    if delete:
+        for name in sorted(vanished):
+            if _remove(os.path.join(directory, name)):
+                report.deleted.append(name)
+    return report
+
+
+def _rebuild(source, directory, name, sig, local, by_digest, vanished, report):
+    # Returns (name, staged temp path, old name it replaces or None)
+    tmp = os.path.join(directory, name + ".tmp")
+    same = next((n for n in by_digest.get(sig["digest"], ()) if n in local), None)
+    if same is not None:
+        # Content already here under a name we keep (a copy at the source)
+        _discard(tmp)
+        try:
+            os.link(os.path.join(directory, same), tmp)
+        except OSError:
+            shutil.copy2(os.path.join(directory, same), tmp)
+        report.linked.append(name)
+        report.reused_bytes += sig["size"]
+        return name, tmp, None
+
+    basis, renamed_from = None, None
+    if name in local:
+        basis = name
+    else:
+        # Maybe renamed and edited: the closest-sized vanished file of the same type
+        ext = os.path.splitext(name)[1].lower()
+        candidates = [n for n in vanished if os.path.splitext(n)[1].lower() == ext]
+        if candidates:
+            basis = renamed_from = min(candidates, key=lambda n: abs(local[n]["size"] - sig["size"]))
+    found = find_blocks(os.path.join(directory, basis), sig) if basis is not None else {}
+
+    block, size = sig["block_size"], sig["size"]
+    missing = []
+    for index in range(-(-size // block)):
+        if index not in found:
+            offset = index * block
+            length = min(block, size - offset)
+            if missing and missing[-1][0] + missing[-1][1] == offset:
+                missing[-1][1] += length
+            else:
+                missing.append([offset, length])
+    with open(tmp, "wb") as out:
+        out.truncate(size)
+        if found:
+            with open(os.path.join(directory, basis), "rb") as f:
+                for index, offset in found.items():
+                    f.seek(offset)
+                    out.seek(index * block)
+                    out.write(f.read(block))
+        for batch in _batches(missing):
+            data = source.read(name, batch)
+            view = memoryview(data)
+            for offset, length in batch:
+                out.seek(offset)
+                out.write(view[:length])
+                view = view[length:]
+            report.fetched_bytes += len(data)
+    reused = len(found) * block
+    report.reused_bytes += reused
+
+    if file_sha256(tmp) != sig["digest"]:
+        _discard(tmp)
+        raise ValueError("content does not match the source (changed during sync?)")
+    os.utime(tmp, ns=(sig["mtime_ns"], sig["mtime_ns"]))
+    if renamed_from is not None and reused * 2 >= size:
+        vanished.discard(renamed_from)
+        report.updated.append(name)
+        return name, tmp, renamed_from
+    (report.updated if name in local else report.added).append(name)
+    return name, tmp, None
+
+
+def _batches(ranges):
+    # Split [offset, length] ranges into requests of at most MAX_READ bytes
+    batch, total = [], 0
+    for offset, length in ranges:
+        while length:
+            take = min(length, MAX_READ - total)
+            batch.append((offset, take))
+            total += take
+            offset += take
+            length -= take
+            if total == MAX_READ:
+                yield batch
+                batch, total = [], 0
+    if batch:
+        yield batch
+
+
+def _apply_renames(directory, renames, report):
+    # Direct renames wherever the order allows, so watchers see a move; only cycles (a <-> b) go through
+    # a temporary name
+    pending = dict(renames)                 # current name -> final name
+    original = {old: old for old in pending}
+    parked_names = (f".sync-{n}.tmp" for n in itertools.count())
+    while pending:
+        ready = [current for current, new in pending.items() if new not in pending]
+        if not ready:
+            current = next(iter(pending))
+            parked = next(parked_names)
+            os.rename(os.path.join(directory, current), os.path.join(directory, parked))
+            pending[parked] = pending.pop(current)
+            original[parked] = original.pop(current)
+            continue
+        for current in ready:
+            new = pending.pop(current)
+            os.replace(os.path.join(directory, current), os.path.join(directory, new))
+            report.renamed.append((original.pop(current), new))
+
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync a downloads library between machines.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="share this library over a socket")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    pub = commands.add_parser("publish", help="write the manifest for syncing through a shared folder")
+    pull = commands.add_parser("pull", help="update this library from a source")
+    pull.add_argument("source", help="host[:port] of a 'serve' machine, or a shared library folder")
+    pull.add_argument("--delete", action="store_true", help="also delete files the source no longer has")
+    for command in (serve, pub, pull):
+        command.add_argument("--downloads", default=os.path.join(os.getcwd(), "downloads"))
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        with LibraryServer(args.downloads, args.host, args.port) as server:
+            print(f"Sharing {args.downloads} on port {server.server_address[1]}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    elif args.command == "publish":
+        print(f"Manifest written for {publish(args.downloads)} file(s)")
+    else:
+        source = open_source(args.source)
+        try:
+            report = sync_library(source, args.downloads, delete=args.delete,
+                                  progress=lambda done, total, name: print(f"[{done}/{total}] {name}"))
+        finally:
+            source.close()
+        for name, reason in report.failed:
+            print(f"FAILED {name}: {reason}")
+        print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
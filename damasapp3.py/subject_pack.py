@@ -0,0 +1,335 @@
+"""
+Subject packs: every resource of a subject fetched in one go and carried to
+other machines as a single file (USB stick, shared folder).
+- PackBuilder takes a subject's resources from the catalog and downloads
+  them through an asyncio pipeline: a fixed number of transfers
+  in flight overall, a per-host connection limit and a per-host request
+  rate, so a short connectivity window is used fully without hammering one
+  server
+- Transfers run on the shared pooled session (timeouts, retries) in worker
+  threads. Bodies are hashed while they stream and staged next to the pack;
+  an interrupted run skips what it already fetched next time the school is
+  online
+- A URL listed under several subjects is fetched once
+- The pack is a zip. Each distinct file is stored once as blobs/<sha256>,
+  deflated unless the format is already compressed. manifest.json lists
+  every distinct URL once (name, file name, validators, digest) and, under
+  "members", which resources each subject has
+- import_pack checks every file against its digest, places it in the
+  downloads library and registers the URL with the blob store, so pressing
+  Download on that resource later is answered from the local copy. File
+  names come from the pack, so one that is not a plain library name (a
+  path, "..", a hidden or temporary name) is reported and not written
+
+    python subject_pack.py build --catalog damasapp3 --subject Mathematics math.pack
+    python subject_pack.py import math.pack --downloads ./downloads
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import zipfile
+from urllib.parse import urlsplit
+
+from blob_store import file_sha256
+from http_session import STREAM_ERRORS, shared_session
+from library_index import is_library_name
+
+PACK_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+FETCH_LOG = "fetched.jsonl"
+# Formats that are already compressed are stored as they are
+STORED_EXTENSIONS = {".pdf", ".zip", ".docx", ".pptx", ".xlsx", ".epub", ".jpg", ".jpeg", ".png",
+                     ".gif", ".mp3", ".mp4", ".webm", ".gz", ".7z"}
+UNSAFE_NAME_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+def pack_file_name(resource, url, content_type):
+    # Library file name for a resource: its catalog name plus an extension from the URL or content type
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    if not ext or len(ext) > 6:
+        ext = mimetypes.guess_extension((content_type or "").split(";")[0].strip()) or ""
+    base = " ".join(UNSAFE_NAME_RE.sub(" ", resource["name"]).split()).strip(" .") or "resource"
+    return base + ext
+
+
+class HostLimiter:
+    """At most `connections` requests at once to one host, started at most `rate` per second."""
+
+    def __init__(self, connections, rate):
+        self.semaphore = asyncio.Semaphore(connections)
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_start = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self.next_start)
+        self.next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class PackBuilder:
+    def __init__(self, pack_path, session=None, concurrency=8, per_host=2, rate=2.0, progress=None):
+        # progress(done, total, resource, error) is called from the event loop after each transfer
+        self.pack_path = pack_path
+        self.staging = pack_path + ".staging"
+        self.session = session or shared_session()
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.progress = progress
+        self.hosts = {}     # host -> HostLimiter, per run
+
+    # ---------- Fetch ----------
+
+    def build(self, items):
+        """Download [(subject, {"name", "url"})] and write the pack; returns its manifest."""
+        return asyncio.run(self.build_async(items))
+
+    async def build_async(self, items):
+        os.makedirs(os.path.join(self.staging, "blobs"), exist_ok=True)
+        self.hosts = {}
+        fetched = self._load_log()
+        items = list(items)
+        members = {}
+        for subject, res in items:
+            members.setdefault(subject, []).append({"name": res["name"], "url": res["url"]})
+        # One fetch per URL; the first resource listing it names the file
+        by_url = {}
+        for _, res in items:
+            by_url.setdefault(res["url"], res)
+        todo = [res for url, res in by_url.items() if url not in fetched]
+        failed = {}
+        queue = asyncio.Queue()
+        for res in todo:
+            queue.put_nowait(res)
+        done = [len(by_url) - len(todo)]
+
+        async def worker():
+            while True:
+                try:
+                    res = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                error = None
+                host = urlsplit(res["url"]).hostname or ""
+                limiter = self.hosts.get(host)
+                if limiter is None:
+                    limiter = self.hosts[host] = HostLimiter(self.per_host, self.rate)
+                try:
+                    async with limiter:
+                        record = await asyncio.to_thread(self._fetch, res["url"])
+                    fetched[res["url"]] = record
+                    self._append_log(record)
+                except Exception as e:
+                    error = failed[res["url"]] = str(e)
+                done[0] += 1
+                if self.progress is not None:
+                    self.progress(done[0], len(by_url), res, error)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(todo)) or 1)))
+        entries = []
+        for url, res in by_url.items():
+            if url in fetched:
+                record = {key: value for key, value in fetched[url].items() if key not in ("subject", "name", "file")}
+                record.update(name=res["name"], file=pack_file_name(res, url, record["content_type"]))
+                entries.append(record)
+        manifest = {"format": PACK_FORMAT, "created": time.time(), "subjects": list(members),
+                    "members": members, "resources": entries,
+                    "failed": [{"url": url, "error": err} for url, err in failed.items()]}
+        await asyncio.to_thread(self._write_pack, manifest)
+        if not failed:
+            shutil.rmtree(self.staging, ignore_errors=True)
+        return manifest
+
+    def _fetch(self, url):
+        # Worker thread: stream the body to a staging file, hashing as it arrives
+        tmp = os.path.join(self.staging, f"incoming-{threading.get_ident()}.part")
+        attempt = 0
+        while True:
+            attempt += 1
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                with self.session.get(url, stream=True) as resp:
+                    resp.raise_for_status()
+                    with open(tmp, "wb") as f:
+                        for chunk in resp.iter_content(chunk_size=self.session.chunk_size):
+                            f.write(chunk)
+                            digest.update(chunk)
+                            size += len(chunk)
+                    headers = resp.headers
+                break
+            except STREAM_ERRORS:
+                if attempt > self.session.retries:
+                    raise
+                self.session.sleep_before_retry(attempt)
+        digest = digest.hexdigest()
+        os.replace(tmp, os.path.join(self.staging, "blobs", digest))
+        return {"url": url, "digest": digest, "size": size, "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"), "content_type": headers.get("Content-Type")}
+
+    def _load_log(self):
+        fetched = {}
+        try:
+            with open(os.path.join(self.staging, FETCH_LOG), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue    # torn last line from an interrupted run
+                    if os.path.exists(os.path.join(self.staging, "blobs", record["digest"])):
+                        fetched[record["url"]] = record
+        except FileNotFoundError:
+            pass
+        return fetched
+
+    def _append_log(self, record):
+        with open(os.path.join(self.staging, FETCH_LOG), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    # ---------- Archive ----------
+
+    def _write_pack(self, manifest):
+        tmp = self.pack_path + ".tmp"
+        written = set()
+        with zipfile.ZipFile(tmp, "w", allowZip64=True) as z:
+            z.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=1),
+                       compress_type=zipfile.ZIP_DEFLATED)
+            for entry in manifest["resources"]:
+                if entry["digest"] in written:
+                    continue
+                written.add(entry["digest"])
+                stored = os.path.splitext(entry["file"])[1].lower() in STORED_EXTENSIONS
+                z.write(os.path.join(self.staging, "blobs", entry["digest"]), f"blobs/{entry['digest']}",
+                        compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+        os.replace(tmp, self.pack_path)
+
+
+def _read_manifest(z):
+    manifest = json.loads(z.read(MANIFEST_NAME))
+    if manifest.get("format") != PACK_FORMAT:
+        raise ValueError(f"unsupported pack format: {manifest.get('format')!r}")
+    return manifest
+
+
+def read_manifest(pack_path):
+    with zipfile.ZipFile(pack_path) as z:
+        return _read_manifest(z)
+
+
+def import_pack(pack_path, downloads_dir, blob_store=None, progress=None):
+    """Copy a pack's files into the library; returns {"imported", "present", "corrupt"} name lists
+    and "failed", (file name, reason) pairs for entries that were not written."""
+    report = {"imported": [], "present": [], "corrupt": [], "failed": []}
+    with zipfile.ZipFile(pack_path) as z:
+        entries = _read_manifest(z)["resources"]
+        for n, entry in enumerate(entries, 1):
+            dest = _import_entry(z, entry, downloads_dir, report)
+            if dest is not None and blob_store is not None:
+                blob_store.ingest(dest, entry["url"], entry.get("etag"), entry.get("last_modified"),
+                                  digest=entry["digest"])
+            if progress is not None:
+                progress(n, len(entries), entry)
+    return report
+
+
+def _import_entry(z, entry, downloads_dir, report):
+    # Returns the library path now holding the entry's content, or None if the pack copy is damaged
+    name = _library_file_name(entry.get("file"))
+    if name is None:
+        report["failed"].append((entry.get("file"), "not a plain file name"))
+        return None
+    base, ext = os.path.splitext(name)
+    copy = 1
+    while os.path.exists(os.path.join(downloads_dir, name)):
+        if file_sha256(os.path.join(downloads_dir, name)) == entry["digest"]:
+            report["present"].append(name)
+            return os.path.join(downloads_dir, name)
+        copy += 1
+        name = f"{base} ({copy}){ext}"
+    dest = os.path.join(downloads_dir, name)
+    tmp = dest + ".import"
+    digest = hashlib.sha256()
+    with z.open(f"blobs/{entry['digest']}") as src, open(tmp, "wb") as out:
+        for chunk in iter(lambda: src.read(1024 * 1024), b""):
+            digest.update(chunk)
+            out.write(chunk)
+    if digest.hexdigest() != entry["digest"]:
+        os.remove(tmp)
+        report["corrupt"].append(name)
+        return None
+    os.replace(tmp, dest)
+    report["imported"].append(name)
+    return dest
+
+
+def _library_file_name(name):
+    # The pack's file name reduced to a name inside the library, or None if it cannot be one
+    if not isinstance(name, str):
+        return None
+    name = os.path.basename(name)
+    if name in ("", ".", "..") or any(sep in name for sep in ("/", "\\", os.sep, "\0")):
+        return None
+    return name if is_library_name(name) else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or import offline subject packs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="download a subject's resources into a pack")
+    build.add_argument("pack")
+    build.add_argument("--catalog", default="damasapp3", help="catalog name (content/<name>.jsonl) or path")
+    build.add_argument("--subject", action="append", help="subject to include (repeatable; default all)")
+    build.add_argument("--concurrency", type=int, default=8, help="transfers in flight")
+    build.add_argument("--per-host", type=int, default=2, help="connections per host")
+    build.add_argument("--rate", type=float, default=2.0, help="requests per second per host")
+    imp = commands.add_parser("import", help="copy a pack's files into a downloads library")
+    imp.add_argument("pack")
+    imp.add_argument("--downloads", default=os.path.join(os.getcwd(), "downloads"))
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from catalog import Catalog
+        catalog = Catalog(args.catalog)
+        subjects = args.subject or catalog.subjects(has="resources")
+
+        def report(done, total, res, error):
+            print(f"[{done}/{total}] {'FAILED ' + error if error else 'ok'}  {res['url']}", file=sys.stderr)
+
+        items = [(subject, res) for subject in subjects for res in catalog.resources(subject)]
+        manifest = PackBuilder(args.pack, concurrency=args.concurrency, per_host=args.per_host,
+                               rate=args.rate, progress=report).build(items)
+        print(f"{len(manifest['resources'])} resources packed, {len(manifest['failed'])} failed "
+              f"(run again to retry them) -> {args.pack}")
+    else:
+        from blob_store import BlobStore
+        os.makedirs(args.downloads, exist_ok=True)
+        store = BlobStore(args.downloads)
+        try:
+            result = import_pack(args.pack, args.downloads, store)
+        finally:
+            store.close()
+        for name, reason in result["failed"]:
+            print(f"FAILED {name!r}: {reason}")
+        print(f"{len(result['imported'])} imported, {len(result['present'])} already present, "
+              f"{len(result['corrupt'])} damaged, {len(result['failed'])} refused")
+
+
+if __name__ == "__main__":
+    main()
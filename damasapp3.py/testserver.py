@@ -0,0 +1,179 @@
+"""
+Local HTTP server for exercising the download manager offline.
+- Serves a directory with Content-Length, ETag, Last-Modified and Accept-Ranges
+- Honours Range / If-Range (single byte ranges, 206 Partial Content)
+- Answers If-None-Match / If-Modified-Since with 304 Not Modified
+- Can drop every connection after N body bytes to simulate a flaky uplink
+
+Run it from a shell:
+    python testserver.py --dir ./fixtures --port 8765 --drop-after 1000000
+
+or from Python:
+    with serve("fixtures") as base_url:
+        manager.submit(base_url + "/textbook.pdf", "out.pdf")
+"""
+
+import argparse
+import contextlib
+import email.utils
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, keep-alive clients hit 40 ms delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def serve(self, send_body):
+        self.server.request_count += 1
+        name = self.path.split("?", 1)[0].lstrip("/")
+        path = os.path.realpath(os.path.join(self.server.directory, name))
+        if not path.startswith(self.server.directory + os.sep) or not os.path.isfile(path):
+            self.send_error(404, "File not found")
+            return
+
+        stat = os.stat(path)
+        size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        if self.not_modified(etag, stat.st_mtime):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = 0, size - 1
+        status = 200
+
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and self.server.ranges and (if_range is None or if_range in (etag, last_modified)):
+            match = RANGE_RE.match(range_header.strip())
+            if match and (match.group(1) or match.group(2)):
+                if match.group(1):
+                    start = int(match.group(1))
+                    end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+                else:
+                    start = max(0, size - int(match.group(2)))
+                if start >= size or start > end:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status = 206
+
+        length = end - start + 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if not send_body:
+            return
+
+        budget = self.server.drop_after or length
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = min(length, budget)
+            while remaining > 0:
+                chunk = f.read(min(64 * 1024, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+        if budget < length:
+            # Simulate the uplink going away mid-transfer
+            self.close_connection = True
+            self.connection.shutdown(2)
+
+
+    def not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since
+        return False
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, directory, port=0, ranges=True, drop_after=0, verbose=False):
+        self.directory = os.path.realpath(directory)
+        self.ranges = ranges
+        self.drop_after = drop_after
+        self.verbose = verbose
+        self.request_count = 0
+        super().__init__(("127.0.0.1", port), FixtureHandler)
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-response is expected here (pause, cancel, simulated outages)
+        if self.verbose:
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+@contextlib.contextmanager
+def serve(directory, **options):
+    server = FixtureServer(directory, **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.base_url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a directory for offline download testing")
+    parser.add_argument("--dir", default=".", help="directory to serve")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--no-ranges", action="store_true", help="ignore Range headers (always 200)")
+    parser.add_argument("--drop-after", type=int, default=0, help="cut each response after this many bytes")
+    args = parser.parse_args()
+    server = FixtureServer(args.dir, args.port, ranges=not args.no_ranges,
+                           drop_after=args.drop_after, verbose=True)
+    print(f"Serving {server.directory} at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Central theme registry for the Resource Hub.
+- Widgets register their role ("text", "button", ...) once when they are
+  created; a role names which theme colors the widget takes
+- A theme change recolors each role with one batched Tcl loop instead of a
+  Python configure call (and try/except) per widget
+- Widgets are grouped by scope (one per subject tab). Only the global scope
+  and the scopes currently on screen are recolored right away; the others
+  are marked stale and recolored when they are next shown, so toggling
+  costs the same however many tabs have been filled
+- ttk widgets (the Treeviews) are recolored through their named styles
+"""
+
+from tkinter import ttk
+
+ROLES = {
+    "surface": {"background": "bg"},
+    "text": {"background": "bg", "foreground": "fg"},
+    "title_surface": {"background": "title_bg"},
+    "title": {"background": "title_bg", "foreground": "title_fg"},
+    "button": {"background": "button_bg", "foreground": "button_fg"},
+}
+
+
+class ThemeRegistry:
+    def __init__(self, root, theme):
+        self.root = root
+        self.theme = theme
+        self.version = 0
+        self.scopes = {}    # scope -> {"roles": {role: [widget path]}, "version": theme version applied}
+        self.styles = []    # callables(theme, style) that configure ttk styles
+
+    def register(self, widget, role, scope=None):
+        # The caller creates the widget with the current colors; later changes come from here
+        if role not in ROLES:
+            raise ValueError(f"unknown theme role: {role!r}")
+        entry = self.scopes.get(scope)
+        if entry is None:
+            entry = self.scopes[scope] = {"roles": {}, "version": self.version}
+        entry["roles"].setdefault(role, []).append(str(widget))
+        return widget
+
+    def add_style(self, configure):
+        self.styles.append(configure)
+        configure(self.theme, ttk.Style(self.root))
+
+    def forget(self, scope):
+        self.scopes.pop(scope, None)
+
+    def apply(self, theme, visible=()):
+        self.theme = theme
+        self.version += 1
+        style = ttk.Style(self.root)
+        for configure in self.styles:
+            configure(theme, style)
+        self.refresh(None)
+        for scope in visible:
+            self.refresh(scope)
+
+    def refresh(self, scope):
+        # Bring one scope up to the current theme (no-op when it already is)
+        entry = self.scopes.get(scope)
+        if entry is None or entry["version"] == self.version:
+            return
+        for role, paths in entry["roles"].items():
+            options = " ".join(f"-{option} {{{self.theme[key]}}}" for option, key in ROLES[role].items())
+            # One Tcl call per role; widgets destroyed since they registered are skipped by catch
+            self.root.tk.call("foreach", "w", tuple(paths), f"catch {{$w configure {options}}}")
+        entry["version"] = self.version
+
+    def widget_count(self):
+        return sum(len(paths) for entry in self.scopes.values() for paths in entry["roles"].values())
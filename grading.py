@@ -0,0 +1,164 @@
+"""
+Batch grading of answer sheets against a quiz answer key.
+- Sheets are a 2-D table of chosen option indices, one row per learner and
+  one column per question, -1 for a blank answer
+- With NumPy installed a whole class is graded with a few array operations
+  (thousands of sheets per call); without it the same results come from a
+  plain Python loop
+- Besides scores, the report gives per-question difficulty (share of
+  learners correct) and blank counts for exam analysis
+
+Command line (server-side grading of a class):
+
+    python grading.py --catalog damasapp2 --subject Mathematics \\
+        --questions 0,1,2 sheets.csv > scores.csv
+
+where each sheets.csv row is a learner name followed by one answer per
+question, as an option letter (A, B, ...), a 0-based index, or empty.
+"""
+
+import argparse
+import csv
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BLANK = -1
+
+
+class AnswerKey:
+    def __init__(self, correct, option_counts, positions=None):
+        # correct[i]: index of the right option for question i; option_counts[i]: how many options it has
+        if len(correct) != len(option_counts):
+            raise ValueError("correct and option_counts differ in length")
+        self.correct = list(correct)
+        self.option_counts = list(option_counts)
+        self.positions = list(positions) if positions is not None else list(range(len(correct)))
+
+    def __len__(self):
+        return len(self.correct)
+
+    @classmethod
+    def from_questions(cls, questions, positions=None):
+        correct = []
+        for n, q in enumerate(questions):
+            try:
+                correct.append(q["options"].index(q["answer"]))
+            except ValueError:
+                raise ValueError(f"question {n}: answer {q['answer']!r} is not one of its options") from None
+        return cls(correct, [len(q["options"]) for q in questions], positions)
+
+    @classmethod
+    def from_catalog(cls, catalog, subject, positions):
+        return cls.from_questions([catalog.quiz_question(subject, p) for p in positions], positions)
+
+
+class GradeReport:
+    def __init__(self, scores, correct, blanks, total):
+        self.scores = scores            # correct answers per sheet
+        self.correct = correct          # per sheet, per question: answered correctly
+        self.blanks = blanks            # blank answers per question
+        self.total = total
+
+    @property
+    def percents(self):
+        if np is not None and isinstance(self.scores, np.ndarray):
+            return self.scores * (100.0 / self.total) if self.total else self.scores * 0.0
+        return [100.0 * s / self.total if self.total else 0.0 for s in self.scores]
+
+    @property
+    def difficulty(self):
+        # Share of sheets that got each question right (1.0 = everyone)
+        sheets = len(self.scores)
+        if np is not None and isinstance(self.correct, np.ndarray):
+            return self.correct.mean(axis=0) if sheets else np.zeros(self.total)
+        return [sum(row[i] for row in self.correct) / sheets if sheets else 0.0 for i in range(self.total)]
+
+
+def grade(key, answers):
+    """Grade a (sheets x questions) table of option indices; returns a GradeReport."""
+    if np is not None:
+        return _grade_numpy(key, answers)
+    return _grade_python(key, answers)
+
+
+def _grade_numpy(key, answers):
+    answers = np.asarray(answers, dtype=np.int32)
+    if answers.ndim != 2 or answers.shape[1] != len(key):
+        raise ValueError(f"expected a (sheets, {len(key)}) table of answers, got shape {answers.shape}")
+    counts = np.asarray(key.option_counts, dtype=np.int32)
+    invalid = (answers < BLANK) | (answers >= counts)
+    if invalid.any():
+        row, col = np.argwhere(invalid)[0]
+        raise ValueError(f"sheet {row}, question {col}: no option {answers[row, col]}")
+    correct = answers == np.asarray(key.correct, dtype=np.int32)
+    return GradeReport(correct.sum(axis=1), correct, (answers == BLANK).sum(axis=0), len(key))
+
+
+def _grade_python(key, answers):
+    correct_rows = []
+    blanks = [0] * len(key)
+    for row_no, row in enumerate(answers):
+        row = list(row)
+        if len(row) != len(key):
+            raise ValueError(f"sheet {row_no}: expected {len(key)} answers, got {len(row)}")
+        marks = []
+        for col, (choice, right, count) in enumerate(zip(row, key.correct, key.option_counts)):
+            if not BLANK <= choice < count:
+                raise ValueError(f"sheet {row_no}, question {col}: no option {choice}")
+            if choice == BLANK:
+                blanks[col] += 1
+            marks.append(choice == right)
+        correct_rows.append(marks)
+    return GradeReport([sum(marks) for marks in correct_rows], correct_rows, blanks, len(key))
+
+
+def parse_choice(text):
+    # "A" / "b" -> 0 / 1, "2" -> 2, "" -> blank
+    text = text.strip()
+    if not text:
+        return BLANK
+    if text.isdigit():
+        return int(text)
+    if len(text) == 1 and text.isalpha():
+        return ord(text.upper()) - ord("A")
+    raise ValueError(f"cannot read answer {text!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade a class's answer sheets against a catalog quiz.")
+    parser.add_argument("sheets", help="CSV: learner, then one answer per question")
+    parser.add_argument("--catalog", required=True, help="catalog name (content/<name>.jsonl) or path")
+    parser.add_argument("--subject", required=True)
+    parser.add_argument("--questions", required=True, help="comma-separated question positions in the bank")
+    args = parser.parse_args(argv)
+
+    from catalog import Catalog
+    catalog = Catalog(args.catalog)
+    try:
+        key = AnswerKey.from_catalog(catalog, args.subject, [int(p) for p in args.questions.split(",")])
+    except KeyError as e:
+        parser.error(f"no such question in the catalog: {e}")
+    learners, answers = [], []
+    try:
+        with open(args.sheets, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if not row:
+                    continue
+                learners.append(row[0])
+                choices = [parse_choice(cell) for cell in row[1:]]
+                answers.append(choices + [BLANK] * (len(key) - len(choices)))
+        report = grade(key, answers)
+    except ValueError as e:
+        parser.error(str(e))
+    out = csv.writer(sys.stdout)
+    out.writerow(["learner", "score", "total", "percent"])
+    for learner, score, percent in zip(learners, report.scores, report.percents):
+        out.writerow([learner, int(score), report.total, f"{percent:.1f}"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Headless core shared by the three apps (and by scripts / a server).
+- Wraps the content catalog, resource search, quiz engine, attempt store and
+  batch grading behind one object with no Tkinter import, so everything the
+  apps do with content can also run on a machine without a display
+- The Tk apps only build widgets and call into this; none of them touch
+  SQLite, the search index or grading directly
+- Heavier parts are created on first use: the progress store only when a
+  quiz or summary is asked for, the search index on the first search (or
+  ahead of it, from a worker thread: see resource_index_ready), and
+  grading (with NumPy) is imported on the first class to grade
+"""
+
+import threading
+
+from catalog import Catalog
+from quiz_engine import QuizEngine, DEFAULT_LEARNER, QUIZ_LENGTH
+
+
+class HubCore:
+    def __init__(self, catalog, progress_path=None):
+        # catalog: a catalog name ("damasapp2") or a path, see catalog.Catalog
+        self.catalog = catalog if isinstance(catalog, Catalog) else Catalog(catalog)
+        self.progress_path = progress_path
+        self._lock = threading.Lock()
+        # The search index has its own lock: building it takes most of a second for a large catalog
+        self._index_lock = threading.Lock()
+        self._store = None
+        self._engine = None
+        self._resource_index = None
+
+    # ---------- Content ----------
+
+    def subjects(self, has=None):
+        return self.catalog.subjects(has=has)
+
+    def topic_names(self, subject):
+        return self.catalog.topic_names(subject)
+
+    def topic(self, subject, topic):
+        return self.catalog.topic(subject, topic)
+
+    def resources(self, subject):
+        return self.catalog.resources(subject)
+
+    def resource_index(self):
+        with self._index_lock:
+            if self._resource_index is None:
+                from resource_search import ResourceIndex
+                self._resource_index = ResourceIndex(self.catalog.iter_resources())
+            return self._resource_index
+
+    def resource_index_ready(self):
+        # True once search_resources answers without building the index first
+        return self._resource_index is not None
+
+    def search_resources(self, query, limit=100):
+        # [(score, name, subject, url)], best first
+        return self.resource_index().search(query, limit=limit)
+
+    # ---------- Quizzes and progress ----------
+
+    @property
+    def store(self):
+        with self._lock:
+            if self._store is None:
+                from attempt_store import AttemptStore
+                self._store = AttemptStore(self.progress_path)
+            return self._store
+
+    @property
+    def quiz_engine(self):
+        store = self.store
+        with self._lock:
+            if self._engine is None:
+                self._engine = QuizEngine(self.catalog, store=store)
+            return self._engine
+
+    def start_quiz(self, subject, learner=DEFAULT_LEARNER, length=QUIZ_LENGTH):
+        return self.quiz_engine.start(subject, learner=learner, length=length)
+
+    def learner_summary(self, learner):
+        return self.store.learner_summary(learner)
+
+    def subject_summary(self):
+        return self.store.subject_summary()
+
+    def pending_writes(self):
+        # Answers and results queued for the background writer (0 before the first quiz)
+        store = self._store
+        return store.pending_writes() if store is not None else 0
+
+    # ---------- Grading ----------
+
+    def answer_key(self, subject, positions):
+        from grading import AnswerKey
+        return AnswerKey.from_catalog(self.catalog, subject, positions)
+
+    def grade_class(self, subject, positions, answers):
+        # answers: (learners x questions) option indices, -1 for blank; see grading.grade
+        from grading import grade
+        return grade(self.answer_key(subject, positions), answers)
+
+    def close(self):
+        with self._lock:
+            store, self._store, self._engine = self._store, None, None
+        if store is not None:
+            store.close()
+        self.catalog.close()
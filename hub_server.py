@@ -0,0 +1,571 @@
+"""
+Classroom server: the headless core (hub_core) over HTTP/JSON on the LAN.
+- One process serves catalog pages, resource search, quiz sessions, batch
+  grading and the downloads library to every PC in the room, instead of
+  each PC loading its own copy of the content
+- asyncio: a connection is a coroutine, not a thread, so hundreds of
+  keep-alive clients cost little; the number open at once is capped and
+  idle connections are closed
+- Every GET response carries a strong ETag (If-None-Match gets a 304).
+  Catalog and search responses are rendered once and kept, together with
+  their gzipped form, in an LRU cache
+- Library files are streamed with loop.sendfile (zero-copy where the OS
+  supports it); grading runs on a worker thread so a big class upload does
+  not hold up other clients
+
+    python hub_server.py --catalog damasapp2 --port 8080 --downloads ./downloads
+
+Endpoints (JSON unless noted):
+    GET  /subjects[?has=topics|resources|quizzes]
+    GET  /subjects/<subject>/topics
+    GET  /subjects/<subject>/topics/<topic>
+    GET  /subjects/<subject>/resources
+    GET  /search?q=<query>[&limit=N]
+    POST /quizzes                    {"subject", "learner", "length"?}
+    GET  /quizzes/<id>
+    POST /quizzes/<id>/answer        {"choice": option text}
+    GET  /learners/<learner>/summary
+    POST /grade                      {"subject", "positions", "answers": [[option index, ...], ...]}
+    GET  /downloads
+    GET  /downloads/<name>           (file)
+    GET  /blobs/<sha256>             (file, from the download cache)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from hub_core import HubCore
+from quiz_engine import DEFAULT_LEARNER, QUIZ_LENGTH
+
+# Library helpers live with the Resource Hub app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "damasapp3.py"))
+from library_index import is_library_name
+
+MAX_CONNECTIONS = 1000
+KEEPALIVE_TIMEOUT = 15.0
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+CACHE_ENTRIES = 2048
+GZIP_MIN_BYTES = 1024
+SESSION_TTL = 2 * 3600
+MAX_SESSIONS = 10000
+DIGEST_RE = re.compile(r"[0-9a-f]{64}$")
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HttpError(400, "request body is not valid JSON") from None
+        if not isinstance(data, dict):
+            raise HttpError(400, "request body must be a JSON object")
+        return data
+
+    def param(self, name, default=None):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def accepts_gzip(self):
+        return "gzip" in self.headers.get("accept-encoding", "")
+
+
+class Rendered:
+    """A JSON response body with its ETag; the gzipped form is made on first request."""
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self._gzipped = None
+
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class FileBody:
+    def __init__(self, path, etag, content_type="application/octet-stream", immutable=False):
+        self.path = path
+        self.etag = etag
+        self.content_type = content_type
+        self.immutable = immutable
+
+
+def render(data):
+    return Rendered(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def question_view(quiz_id, session):
+    # The current question without its answer
+    question = session.question()
+    view = {"id": quiz_id, "index": session.index, "total": session.total,
+            "score": session.score, "finished": session.finished}
+    if question is not None:
+        view["question"] = question["question"]
+        view["options"] = question["options"]
+    return view
+
+
+class HubServer:
+    def __init__(self, core, downloads_dir=None, max_connections=MAX_CONNECTIONS):
+        self.core = core
+        self.downloads_dir = downloads_dir
+        self.max_connections = max_connections
+        self.connections = 0
+        self.requests = 0
+        self.cache = OrderedDict()      # (path, query) -> Rendered, most recently used last
+        self.sessions = OrderedDict()   # quiz id -> (QuizSession, last used), least recently used first
+        self.server = None
+        self.routes = [
+            ("GET", re.compile(r"/subjects$"), self.get_subjects, True),
+            ("GET", re.compile(r"/subjects/([^/]+)/topics$"), self.get_topic_names, True),
+            ("GET", re.compile(r"/subjects/([^/]+)/topics/([^/]+)$"), self.get_topic, True),
+            ("GET", re.compile(r"/subjects/([^/]+)/resources$"), self.get_resources, True),
+            ("GET", re.compile(r"/search$"), self.get_search, True),
+            ("POST", re.compile(r"/quizzes$"), self.post_quiz, False),
+            ("GET", re.compile(r"/quizzes/([0-9a-f]+)$"), self.get_quiz, False),
+            ("POST", re.compile(r"/quizzes/([0-9a-f]+)/answer$"), self.post_answer, False),
+            ("GET", re.compile(r"/learners/([^/]+)/summary$"), self.get_summary, False),
+            ("POST", re.compile(r"/grade$"), self.post_grade, False),
+            ("GET", re.compile(r"/downloads$"), self.get_downloads, False),
+            ("GET", re.compile(r"/downloads/([^/]+)$"), self.get_download, False),
+            ("GET", re.compile(r"/blobs/([^/]+)$"), self.get_blob, False),
+        ]
+
+    async def start(self, host="0.0.0.0", port=8080):
+        # Build the search index before the first client can wait on it
+        self.core.resource_index()
+        self.server = await asyncio.start_server(self.handle_connection, host, port,
+                                                 backlog=self.max_connections, limit=MAX_HEADER_BYTES)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    # ---------- Connections ----------
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        try:
+            if self.connections > self.max_connections:
+                await self.send_error(writer, HttpError(503, "server busy"), keep_alive=False)
+                return
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), KEEPALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except HttpError as e:
+                    await self.send_error(writer, e, keep_alive=False)
+                    return
+                if request is None:
+                    return
+                self.requests += 1
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                try:
+                    await self.dispatch(request, writer, keep_alive)
+                except HttpError as e:
+                    await self.send_error(writer, e, keep_alive)
+                except ConnectionError:
+                    raise
+                except Exception as e:
+                    # A bug in one handler must not take the server down; this connection is dropped
+                    print(f"hub_server: {request.method} {request.path} failed: {e!r}", file=sys.stderr)
+                    await self.send_error(writer, HttpError(500, "internal error"), keep_alive=False)
+                    return
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled: the server is shutting down with this connection idle
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None     # client closed an idle keep-alive connection
+            raise
+        except asyncio.LimitOverrunError:
+            raise HttpError(400, "request headers too large") from None
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HttpError(400, "malformed request line") from None
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        if version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive":
+            headers["connection"] = "close"
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HttpError(400, "bad Content-Length") from None
+        if length < 0:
+            raise HttpError(400, "bad Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        return Request(method, url.path, parse_qs(url.query), headers, body)
+
+    # ---------- Dispatch and responses ----------
+
+    async def dispatch(self, request, writer, keep_alive):
+        for method, pattern, handler, cacheable in self.routes:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                continue
+            args = [unquote(arg) for arg in match.groups()]
+            key = (request.path, tuple(sorted((k, tuple(v)) for k, v in request.query.items())))
+            rendered = self.cache.get(key) if cacheable else None
+            if rendered is not None:
+                self.cache.move_to_end(key)
+            else:
+                result = handler(request, *args)
+                if asyncio.iscoroutine(result):
+                    result = await result
+                if isinstance(result, FileBody):
+                    await self.send_file(writer, request, result, keep_alive)
+                    return
+                rendered = result if isinstance(result, Rendered) else render(result)
+                if cacheable:
+                    self.cache[key] = rendered
+                    if len(self.cache) > CACHE_ENTRIES:
+                        self.cache.popitem(last=False)
+            await self.send_rendered(writer, request, rendered, keep_alive)
+            return
+        if any(pattern.match(request.path) for _, pattern, _, _ in self.routes):
+            raise HttpError(405, f"{request.method} not allowed on {request.path}")
+        raise HttpError(404, f"no such resource: {request.path}")
+
+    async def send_rendered(self, writer, request, rendered, keep_alive):
+        headers = {"Content-Type": "application/json; charset=utf-8", "ETag": rendered.etag,
+                   "Vary": "Accept-Encoding"}
+        if request.method == "GET" and request.headers.get("if-none-match") == rendered.etag:
+            await self.send(writer, 304, headers, b"", keep_alive)
+            return
+        body = rendered.body
+        if len(body) >= GZIP_MIN_BYTES and request.accepts_gzip():
+            body = rendered.gzipped()
+            headers["Content-Encoding"] = "gzip"
+        await self.send(writer, 200, headers, body, keep_alive)
+
+    async def send_error(self, writer, error, keep_alive):
+        body = render({"error": str(error)}).body
+        await self.send(writer, error.status, {"Content-Type": "application/json; charset=utf-8"},
+                        body, keep_alive)
+
+    async def send(self, writer, status, headers, body, keep_alive):
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        head.append(f"Content-Length: {len(body)}")
+        head.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def send_file(self, writer, request, file_body, keep_alive):
+        headers = {"Content-Type": file_body.content_type, "ETag": file_body.etag}
+        if file_body.immutable:
+            headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        if request.headers.get("if-none-match") == file_body.etag:
+            await self.send(writer, 304, headers, b"", keep_alive)
+            return
+        try:
+            f = open(file_body.path, "rb")
+        except OSError:
+            raise HttpError(404, "file not found") from None
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            head = [f"HTTP/1.1 200 OK", f"Content-Length: {size}",
+                    "Connection: keep-alive" if keep_alive else "Connection: close"]
+            head += [f"{name}: {value}" for name, value in headers.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            await writer.drain()
+            await asyncio.get_running_loop().sendfile(writer.transport, f)
+
+    @staticmethod
+    async def blocking(fn, *args):
+        # SQLite reads and waits on the progress writer run on a worker thread, so other clients keep going
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    # ---------- Catalog ----------
+
+    async def get_subjects(self, request):
+        has = request.param("has")
+        try:
+            return await self.blocking(self.core.subjects, has)
+        except ValueError as e:
+            raise HttpError(400, str(e)) from None
+
+    async def get_topic_names(self, request, subject):
+        return await self.blocking(self.core.topic_names, subject)
+
+    async def get_topic(self, request, subject, topic):
+        try:
+            return await self.blocking(self.core.topic, subject, topic)
+        except KeyError:
+            raise HttpError(404, f"no topic {topic!r} in {subject!r}") from None
+
+    async def get_resources(self, request, subject):
+        return await self.blocking(self.core.resources, subject)
+
+    async def get_search(self, request):
+        try:
+            limit = min(int(request.param("limit", 50)), 500)
+        except ValueError:
+            raise HttpError(400, "limit must be a number") from None
+        results = await self.blocking(self.core.search_resources, request.param("q", ""), limit)
+        return [{"name": name, "subject": subject, "url": url, "score": round(score, 4)}
+                for score, name, subject, url in results]
+
+    # ---------- Quiz sessions ----------
+
+    async def post_quiz(self, request):
+        data = request.json()
+        subject = data.get("subject")
+        if not isinstance(subject, str):
+            raise HttpError(400, "subject must be a string")
+        bank_size = await self.blocking(self.core.catalog.quiz_count, subject)
+        if not bank_size:
+            raise HttpError(404, f"no quiz for subject {subject!r}")
+        length = data.get("length", QUIZ_LENGTH)
+        if "length" in data:
+            if isinstance(length, bool) or not isinstance(length, int) or not 1 <= length <= bank_size:
+                raise HttpError(400, f"length must be a whole number from 1 to {bank_size}")
+        learner = data.get("learner") or DEFAULT_LEARNER
+        if not isinstance(learner, str):
+            raise HttpError(400, "learner must be a string")
+        # Picking flushes queued answers (a wait on the writer's commits) and reads the review history
+        session = await self.blocking(self.core.start_quiz, subject, learner, length)
+        await self.blocking(session.question)
+        quiz_id = uuid.uuid4().hex
+        self.sessions[quiz_id] = (session, time.monotonic())
+        self.expire_sessions()
+        return question_view(quiz_id, session)
+
+    def session(self, quiz_id):
+        entry = self.sessions.get(quiz_id)
+        if entry is None:
+            raise HttpError(404, "no such quiz (finished or expired)")
+        self.sessions[quiz_id] = (entry[0], time.monotonic())
+        self.sessions.move_to_end(quiz_id)
+        return entry[0]
+
+    def expire_sessions(self):
+        cutoff = time.monotonic() - SESSION_TTL
+        while self.sessions:
+            quiz_id, (_, used) = next(iter(self.sessions.items()))
+            if used >= cutoff and len(self.sessions) <= MAX_SESSIONS:
+                break
+            del self.sessions[quiz_id]
+
+    async def get_quiz(self, request, quiz_id):
+        session = self.session(quiz_id)
+        await self.blocking(session.question)
+        return question_view(quiz_id, session)
+
+    async def post_answer(self, request, quiz_id):
+        session = self.session(quiz_id)
+        if session.finished:
+            raise HttpError(400, "quiz already finished")
+        choice = request.json().get("choice")
+        if not isinstance(choice, str):
+            raise HttpError(400, "choice must be the option text")
+        # Answering only queues writes and uses the question already served; the next one is read off the loop
+        correct, answer = session.answer(choice)
+        await self.blocking(session.question)
+        view = question_view(quiz_id, session)
+        view.update(correct=correct, answer=answer)
+        if session.finished:
+            # Another final answer or expire_sessions may have dropped it during the await
+            self.sessions.pop(quiz_id, None)
+        return view
+
+    async def get_summary(self, request, learner):
+        # Include attempts whose results are still queued for the background writer
+        await self.blocking(self.core.store.flush)
+        return await self.blocking(self.core.learner_summary, learner)
+
+    # ---------- Grading ----------
+
+    async def post_grade(self, request):
+        data = request.json()
+        subject = data.get("subject")
+        if not isinstance(subject, str):
+            raise HttpError(400, "subject must be a string")
+        try:
+            key = await self.blocking(self.core.answer_key, subject, [int(p) for p in data["positions"]])
+        except (TypeError, ValueError):
+            raise HttpError(400, "positions must be a list of numbers") from None
+        except KeyError as e:
+            raise HttpError(404 if e.args and isinstance(e.args[0], tuple) else 400,
+                            f"unknown question or missing field: {e}") from None
+        answers = data.get("answers", [])
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self.grade_to_json, key, answers)
+        except ValueError as e:
+            raise HttpError(400, str(e)) from None
+
+    @staticmethod
+    def grade_to_json(key, answers):
+        # Worker thread: grading and encoding the report can be large for a whole school
+        from grading import grade
+        report = grade(key, answers)
+        as_list = lambda values: values.tolist() if hasattr(values, "tolist") else list(values)
+        return render({"total": report.total, "scores": as_list(report.scores),
+                       "percents": as_list(report.percents), "difficulty": as_list(report.difficulty),
+                       "blanks": as_list(report.blanks)})
+
+    # ---------- Downloads library ----------
+
+    def library_dir(self):
+        if not self.downloads_dir or not os.path.isdir(self.downloads_dir):
+            raise HttpError(404, "no downloads library on this server")
+        return self.downloads_dir
+
+    def get_downloads(self, request):
+        files = []
+        with os.scandir(self.library_dir()) as it:
+            for entry in it:
+                if is_library_name(entry.name) and entry.is_file():
+                    st = entry.stat()
+                    files.append({"name": entry.name, "size": st.st_size, "mtime": st.st_mtime})
+        files.sort(key=lambda f: f["name"].lower())
+        return files
+
+    def get_download(self, request, name):
+        if "/" in name or "\\" in name or not is_library_name(name):
+            raise HttpError(404, "file not found")
+        path = os.path.join(self.library_dir(), name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            raise HttpError(404, "file not found") from None
+        return FileBody(path, f'"{st.st_size:x}-{st.st_mtime_ns:x}"')
+
+    def get_blob(self, request, digest):
+        # Content-addressed, so the digest is a permanent ETag
+        if not DIGEST_RE.match(digest):
+            raise HttpError(404, "no such blob")
+        path = os.path.join(self.library_dir(), ".store", "blobs", digest[:2], digest)
+        if not os.path.isfile(path):
+            raise HttpError(404, "no such blob")
+        return FileBody(path, f'"{digest}"', immutable=True)
+
+
+@contextlib.contextmanager
+def serve(catalog, downloads_dir=None, host="127.0.0.1", port=0, progress_path=None, **kwargs):
+    """Run a HubServer on its own thread and event loop; yields the base URL."""
+    # The core is opened on the server thread; its catalog is also read from the loop's worker threads
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    state = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        core = HubCore(catalog, progress_path=progress_path)
+        try:
+            state["server"] = HubServer(core, downloads_dir, **kwargs)
+            state["address"] = loop.run_until_complete(state["server"].start(host, port))
+        except BaseException as e:
+            state["error"] = e
+            core.close()
+            started.set()
+            return
+        started.set()
+        loop.run_forever()
+        loop.run_until_complete(state["server"].close())
+        # Idle keep-alive connections are still waiting for a request
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        core.close()
+
+    thread = threading.Thread(target=run, name="hub-server", daemon=True)
+    thread.start()
+    started.wait()
+    if "error" in state:
+        thread.join()
+        raise state["error"]
+    try:
+        host, port = state["address"]
+        yield f"http://{host}:{port}"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the education hub's content, search and quizzes over HTTP.")
+    parser.add_argument("--catalog", default="damasapp2", help="catalog name (content/<name>.jsonl) or path")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--downloads", default=os.path.join(os.getcwd(), "downloads"),
+                        help="downloads library to share")
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS)
+    args = parser.parse_args(argv)
+
+    core = HubCore(args.catalog)
+    server = HubServer(core, args.downloads, max_connections=args.max_connections)
+
+    async def run():
+        host, port = await server.start(args.host, args.port)
+        print(f"Serving {args.catalog} on http://{host}:{port}")
+        async with server.server:
+            await server.server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        core.close()
+
+
+if __name__ == "__main__":
+    main()
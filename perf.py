@@ -0,0 +1,229 @@
+"""
+Hot-path instrumentation for the apps (and anything headless).
+- @timed("name") on a function or `with span("name"):` around a block
+  records how long it took. While tracing is off both cost one flag check,
+  so they stay in place in production builds
+- Every name gets a latency histogram with log-spaced buckets (4 per
+  doubling, 1 µs to about 1 min): count, total, max and percentiles without
+  keeping samples
+- Counters (widget counts, queue depths) keep their latest value; byte
+  counters (download traffic) give a throughput over the last few seconds
+- The newest spans and counter values are kept in a ring buffer and can
+  be written as Chrome trace-event JSON (open it in chrome://tracing or
+  ui.perfetto.dev)
+- Tracing starts with --perf on the command line (the app's main passes
+  its arguments to trace_from_command_line) or when the overlay is turned
+  on (F12, see perf_overlay.py); --perf also prints a summary of every
+  histogram when the app exits
+
+    python damasapp3.py/damasapp3.py --perf
+"""
+
+import atexit
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+FLAG = "--perf"
+BUCKETS_PER_DOUBLING = 4
+MIN_SECONDS = 1e-6
+BUCKETS = BUCKETS_PER_DOUBLING * 26     # up to 2**26 µs, about 67 s
+RATE_WINDOW = 5.0                       # seconds of traffic behind a throughput figure
+TRACE_CAPACITY = 200_000
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max", "last")
+
+    def __init__(self):
+        self.counts = [0] * (BUCKETS + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        if seconds <= MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = min(BUCKETS, int(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_DOUBLING) + 1)
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @staticmethod
+    def upper_bound(bucket):
+        return MIN_SECONDS * 2 ** (bucket / BUCKETS_PER_DOUBLING)
+
+    def percentile(self, fraction):
+        # Upper edge of the bucket holding that fraction of samples (at most 19% above the true value)
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.upper_bound(bucket), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class Tracer:
+    def __init__(self, enabled=False, capacity=TRACE_CAPACITY):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self.events = deque(maxlen=capacity)    # ("X", name, start, duration, thread, args) / ("C", name, at, value)
+        self._traffic = {}                      # name -> deque of (time, bytes)
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    # ---------- Recording ----------
+
+    def record(self, name, start, end, **args):
+        # start and end are time.perf_counter() readings; may be called from any thread
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(end - start)
+            self.events.append(("X", name, start, end - start, threading.get_ident(), args))
+
+    def count(self, name, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = value
+            self.events.append(("C", name, time.perf_counter(), value, None, None))
+
+    def add_bytes(self, name, amount):
+        if not self.enabled or amount <= 0:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            traffic = self._traffic.get(name)
+            if traffic is None:
+                traffic = self._traffic[name] = deque()
+            traffic.append((now, amount))
+            while traffic and traffic[0][0] < now - RATE_WINDOW:
+                traffic.popleft()
+
+    def rate(self, name):
+        # Bytes per second over the last RATE_WINDOW seconds
+        now = time.perf_counter()
+        with self._lock:
+            traffic = self._traffic.get(name, ())
+            return sum(amount for at, amount in traffic if at >= now - RATE_WINDOW) / RATE_WINDOW
+
+    def span(self, name, **args):
+        return _Span(self, name, args) if self.enabled else _NO_SPAN
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.events.clear()
+            self._traffic.clear()
+
+    # ---------- Output ----------
+
+    def export_trace(self, path):
+        # Chrome trace-event format: complete events ("X") and counters ("C"), times in µs
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+        out = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": os.path.basename(sys.argv[0])}}]
+        for kind, name, at, value, thread, args in events:
+            ts = (at - self._origin) * 1e6
+            if kind == "X":
+                out.append({"name": name, "cat": "app", "ph": "X", "ts": round(ts, 1),
+                            "dur": round(value * 1e6, 1), "pid": pid, "tid": thread, "args": args or {}})
+            else:
+                out.append({"name": name, "ph": "C", "ts": round(ts, 1), "pid": pid, "args": {name: value}})
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f)
+        os.replace(tmp, path)
+        return len(out) - 1
+
+    def summary_lines(self):
+        with self._lock:
+            items = sorted(self.histograms.items(), key=lambda item: -item[1].total)
+        lines = [f"{'span':<32} {'count':>7} {'mean ms':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"]
+        for name, h in items:
+            lines.append(f"{name:<32} {h.count:7d} {h.mean * 1000:9.2f} {h.percentile(0.5) * 1000:8.2f} "
+                         f"{h.percentile(0.95) * 1000:8.2f} {h.percentile(0.99) * 1000:8.2f} {h.max * 1000:8.2f}")
+        return lines
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start, time.perf_counter(), **self.args)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+tracer = Tracer()
+
+
+def trace_from_command_line(argv):
+    # --perf: trace from startup and print the summary at exit
+    if FLAG in argv and not tracer.enabled:
+        tracer.enabled = True
+        atexit.register(lambda: print("\n".join(tracer.summary_lines()), file=sys.stderr))
+    return tracer.enabled
+
+
+def span(name, **args):
+    return tracer.span(name, **args)
+
+
+def timed(name=None):
+    """Decorator: record each call's duration under name (default: the function's qualified name)."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tracer.record(label, start, time.perf_counter())
+        return wrapper
+    return decorate
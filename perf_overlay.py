@@ -0,0 +1,158 @@
+"""
+On-screen performance overlay for the Tk apps; F12 shows and hides it.
+- Frame rate of the Tk event loop: a 60 Hz after() heartbeat counts the
+  ticks that actually ran each second, and the worst gap between two ticks
+  is the longest the window could not repaint or take input
+- Latency (last call and p95) of the spans the app names, see perf.timed
+- Queue depths supplied by the app, the number of widgets in the window
+  and download throughput
+- Shift+F12 writes the session's Chrome trace to the working directory
+- Showing the overlay turns tracing on; it stays on once the overlay is
+  hidden again so the trace keeps covering the session
+- The heartbeat and the readings run only while the overlay is shown, or
+  for the whole session under --perf; the widget tree is walked only while
+  the overlay is shown
+"""
+
+import os
+import sys
+import time
+import tkinter as tk
+
+from perf import tracer
+
+TICK_MS = 16
+UPDATE_MS = 500
+NOTE_SECONDS = 6.0
+
+# Counts a widget and its descendants in Tcl, without a Python object per widget
+COUNT_WIDGETS_TCL = """
+proc ::perf_overlay_count {w} {
+    set n 1
+    foreach child [winfo children $w] { incr n [::perf_overlay_count $child] }
+    return $n
+}
+"""
+
+
+class PerfOverlay:
+    def __init__(self, root, spans=(), queues=None, traffic="download"):
+        # queues: {label: callable returning the current depth}; traffic: perf byte counter to show
+        self.root = root
+        self.spans = list(spans)
+        self.queues = queues or {}
+        self.traffic = traffic
+        self.label = None
+        self.visible = False
+        self.running = False
+        self.always = tracer.enabled    # --perf: keep the loop readings in the trace while hidden
+        self.after_ids = {}
+        self.note = None            # (text, shown until)
+        self.ticks = 0
+        self.last_tick = None
+        self.worst_gap = 0.0
+        self.window_start = None
+        root.tk.eval(COUNT_WIDGETS_TCL)
+        root.bind("<F12>", lambda e: self.toggle(), add="+")
+        root.bind("<Shift-F12>", lambda e: self.export(), add="+")
+        if tracer.enabled:
+            self.start()
+
+    def toggle(self):
+        if self.visible:
+            self.label.place_forget()
+            self.visible = False
+            if not self.always:
+                self.stop()
+            return
+        if self.label is None:
+            self.label = tk.Label(self.root, justify=tk.LEFT, anchor="nw", font=("Courier", 9),
+                                  bg="#101418", fg="#7CFC00", padx=6, pady=4)
+        self.label.place(relx=1.0, x=-8, y=8, anchor="ne")
+        self.label.lift()
+        self.visible = True
+        tracer.enabled = True
+        self.start()
+        self.update()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.last_tick = self.window_start = time.perf_counter()
+        self.ticks, self.worst_gap = 0, 0.0
+        self.after_ids["tick"] = self.root.after(TICK_MS, self.tick)
+        self.after_ids["update"] = self.root.after(UPDATE_MS, self.update_loop)
+
+    def stop(self):
+        self.running = False
+        for after_id in self.after_ids.values():
+            self.root.after_cancel(after_id)
+        self.after_ids.clear()
+
+    # ---------- Heartbeat ----------
+
+    def tick(self):
+        now = time.perf_counter()
+        self.worst_gap = max(self.worst_gap, now - self.last_tick)
+        self.last_tick = now
+        self.ticks += 1
+        self.after_ids["tick"] = self.root.after(TICK_MS, self.tick)
+
+    def update_loop(self):
+        self.update()
+        self.after_ids["update"] = self.root.after(UPDATE_MS, self.update_loop)
+
+    def update(self):
+        now = time.perf_counter()
+        elapsed = now - self.window_start
+        if elapsed < 0.05:
+            return
+        fps = self.ticks / elapsed
+        worst = self.worst_gap
+        self.ticks, self.worst_gap, self.window_start = 0, 0.0, now
+        widgets = int(self.root.tk.call("::perf_overlay_count", str(self.root))) if self.visible else None
+        depths = {name: depth() for name, depth in self.queues.items()}
+        rate = tracer.rate(self.traffic) if self.traffic else 0.0
+        tracer.count("loop fps", round(fps, 1))
+        tracer.count("loop worst gap ms", round(worst * 1000, 1))
+        if widgets is not None:
+            tracer.count("widgets", widgets)
+        for name, depth in depths.items():
+            tracer.count(f"queue {name}", depth)
+        if self.traffic:
+            tracer.count(f"{self.traffic} MB/s", round(rate / 1e6, 2))
+        if self.visible:
+            self.label.configure(text="\n".join(self.lines(fps, worst, widgets, depths, rate, now)))
+
+    def lines(self, fps, worst, widgets, depths, rate, now):
+        lines = [f"loop {fps:5.1f} fps  worst gap {worst * 1000:6.1f} ms", f"widgets {widgets:,}"]
+        if depths:
+            lines.append("  ".join(f"{name} {depth}" for name, depth in depths.items()))
+        if self.traffic:
+            lines.append(f"{self.traffic} {rate / 1e6:6.2f} MB/s")
+        for name in self.spans:
+            h = tracer.histograms.get(name)
+            if h is not None:
+                lines.append(f"{name:<24} {h.last * 1000:7.1f} ms  p95 {h.percentile(0.95) * 1000:7.1f}  "
+                             f"n={h.count}")
+        if self.note is not None and now < self.note[1]:
+            lines.append(self.note[0])
+        lines.append("F12 hide · Shift+F12 save trace")
+        return lines
+
+    # ---------- Trace ----------
+
+    def export(self):
+        if not tracer.enabled:
+            self.note = ("tracing is off (F12 starts it)", time.perf_counter() + NOTE_SECONDS)
+            return
+        path = os.path.join(os.getcwd(), time.strftime("perf-trace-%Y%m%d-%H%M%S.json"))
+        try:
+            events = tracer.export_trace(path)
+            text = f"saved {events} events to {os.path.basename(path)}"
+            print(f"[perf] {text} ({path})", file=sys.stderr)
+        except OSError as e:
+            text = f"could not save trace: {e}"
+        self.note = (text, time.perf_counter() + NOTE_SECONDS)
+        self.update()
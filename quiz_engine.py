@@ -0,0 +1,277 @@
+"""
+Adaptive quiz engine over the catalog's question banks.
+- A quiz is a short list of question positions drawn from the subject's
+  bank; question bodies are fetched from the catalog only when served, so
+  an attempt never copies or shuffles the bank (100k+ questions is fine)
+- Per-learner review state (Leitner box, due time) lives in SQLite, keyed by
+  the question's stable id (see catalog.question_id), so editing or
+  reordering a bank keeps every schedule on its own question. Each
+  quiz mixes questions that are due for review, new questions sampled
+  uniformly from the unseen part of the bank, and a weighted sample of
+  weak questions (lower box = more likely)
+- Learners who answer well get more new material, learners who struggle
+  get more review
+- With an AttemptStore, every attempt and answer is logged, and review
+  updates go through the store's background writer instead of the Tk thread
+"""
+
+import heapq
+import itertools
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+
+QUIZ_LENGTH = 10
+# Seconds until a question in each Leitner box is due again (box 0 = just missed)
+BOX_INTERVALS = (60, 10 * 60, 24 * 3600, 3 * 24 * 3600, 7 * 24 * 3600, 21 * 24 * 3600)
+DEFAULT_LEARNER = "default"
+
+
+def default_history_path():
+    return os.path.join(os.getcwd(), "progress", "quiz.sqlite")
+
+
+# Next box and due time computed in SQL, so an answer is one write with no read first
+NEXT_BOX = f"CASE WHEN excluded.correct THEN MIN(box + 1, {len(BOX_INTERVALS) - 1}) ELSE 0 END"
+INTERVAL_OF = "CASE {} " + " ".join(f"WHEN {box} THEN {secs}" for box, secs in enumerate(BOX_INTERVALS)) + " END"
+RECORD_SQL = f"""
+    INSERT INTO reviews VALUES (?1, ?2, ?3, ?4, ?5 + ?6, 1, ?7)
+    ON CONFLICT (learner, subject, question) DO UPDATE SET
+        box = {NEXT_BOX}, due = ?5 + {INTERVAL_OF.format(NEXT_BOX)},
+        seen = seen + 1, correct = correct + excluded.correct
+"""
+
+
+def weighted_sample(items, weights, k, rng=random):
+    # Efraimidis-Spirakis reservoir: one pass, keeps the k largest u ** (1 / w) keys
+    # (log form: log(u) / w), with a min-heap so each item costs O(log k)
+    reservoir = []
+    for n, (item, weight) in enumerate(zip(items, weights)):
+        if weight <= 0:
+            continue
+        key = math.log(rng.random() or 1e-300) / weight
+        if len(reservoir) < k:
+            heapq.heappush(reservoir, (key, n, item))
+        elif key > reservoir[0][0]:
+            heapq.heapreplace(reservoir, (key, n, item))
+    return [item for _, _, item in sorted(reservoir, reverse=True)]
+
+
+class ReviewHistory:
+    """Per-learner, per-question review state; questions are catalog question ids."""
+
+    def __init__(self, path=None, writer=None):
+        # writer: an attempt_store.BatchWriter on the same file, to keep writes off the caller's thread
+        path = path or default_history_path()
+        self.writer = writer
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(reviews)")}
+        if "position" in columns:
+            # Written before questions had ids; kept aside until migrate_positions() maps them
+            self._db.execute("ALTER TABLE reviews RENAME TO reviews_by_position")
+            self._db.execute("DROP INDEX IF EXISTS reviews_due")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS reviews (
+                learner TEXT, subject TEXT, question TEXT, box INTEGER, due REAL,
+                seen INTEGER, correct INTEGER, PRIMARY KEY (learner, subject, question));
+            CREATE INDEX IF NOT EXISTS reviews_due ON reviews (learner, subject, due);
+        """)
+        self._db.commit()
+
+    def migrate_positions(self, question_id):
+        # Re-key rows saved by bank position, reading positions against the bank as it is now (the
+        # same reading they always had); question_id(subject, position) raises KeyError for a gone one
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'reviews_by_position'").fetchone() is None:
+                return 0
+            rows = self._db.execute("SELECT learner, subject, position, box, due, seen, correct"
+                                    " FROM reviews_by_position").fetchall()
+        moved = []
+        for learner, subject, position, *state in rows:
+            try:
+                moved.append((learner, subject, question_id(subject, position), *state))
+            except KeyError:
+                continue
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR IGNORE INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?)", moved)
+            self._db.execute("DROP TABLE reviews_by_position")
+        return len(moved)
+
+    def due(self, learner, subject, now, limit):
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                "SELECT question FROM reviews WHERE learner = ? AND subject = ? AND due <= ? ORDER BY due LIMIT ?",
+                (learner, subject, now, limit))]
+
+    def seen(self, learner, subject, question):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM reviews WHERE learner = ? AND subject = ? AND question = ?",
+                                    (learner, subject, question)).fetchone() is not None
+
+    def seen_questions(self, learner, subject):
+        with self._lock:
+            return {row[0] for row in self._db.execute(
+                "SELECT question FROM reviews WHERE learner = ? AND subject = ?", (learner, subject))}
+
+    def seen_count(self, learner, subject):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM reviews WHERE learner = ? AND subject = ?",
+                                    (learner, subject)).fetchone()[0]
+
+    def reviewed(self, learner, subject, now):
+        # (question, box) for everything seen but not yet due
+        with self._lock:
+            return self._db.execute(
+                "SELECT question, box FROM reviews WHERE learner = ? AND subject = ? AND due > ?",
+                (learner, subject, now)).fetchall()
+
+    def accuracy(self, learner, subject):
+        with self._lock:
+            seen, correct = self._db.execute(
+                "SELECT COALESCE(SUM(seen), 0), COALESCE(SUM(correct), 0) FROM reviews"
+                " WHERE learner = ? AND subject = ?", (learner, subject)).fetchone()
+        return correct / seen if seen else None
+
+    def record(self, learner, subject, question, correct, now):
+        box = 1 if correct else 0
+        params = (learner, subject, question, box, now, BOX_INTERVALS[box], int(correct))
+        if self.writer is not None:
+            self.writer.execute(RECORD_SQL, params)
+            return
+        with self._lock:
+            self._db.execute(RECORD_SQL, params)
+            self._db.commit()
+
+    def flush(self):
+        # Make queued answers visible before the next quiz is picked
+        if self.writer is not None:
+            return self.writer.flush()
+        return []
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class QuizSession:
+    def __init__(self, engine, learner, subject, positions):
+        self.engine = engine
+        self.learner = learner
+        self.subject = subject
+        self.positions = positions
+        self.index = 0
+        self.score = 0
+        self.answers = []   # (position, chosen option, correct)
+        self._questions = {}
+        self.attempt_id = None
+        if engine.store is not None:
+            self.attempt_id = engine.store.start_attempt(learner, subject, len(positions), engine.clock())
+
+    @property
+    def total(self):
+        return len(self.positions)
+
+    @property
+    def finished(self):
+        return self.index >= len(self.positions)
+
+    def question(self, index=None):
+        # Fetched from the catalog the first time it is asked for
+        index = self.index if index is None else index
+        if index >= len(self.positions):
+            return None
+        if index not in self._questions:
+            self._questions[index] = self.engine.catalog.quiz_question(self.subject, self.positions[index])
+        return self._questions[index]
+
+    def answer(self, choice):
+        # Grade the current question, update the learner's schedule and move on; returns (correct, answer)
+        question = self.question()
+        correct = choice == question["answer"]
+        position = self.positions[self.index]
+        now = self.engine.clock()
+        self.engine.history.record(self.learner, self.subject, question["id"], correct, now)
+        self.answers.append((position, choice, correct))
+        if correct:
+            self.score += 1
+        store = self.engine.store
+        if store is not None:
+            store.record_answer(self.attempt_id, self.index, position, choice, correct, now)
+        self.index += 1
+        if store is not None and self.finished:
+            store.finish_attempt(self.attempt_id, self.learner, self.subject, self.score, self.total, now)
+        return correct, question["answer"]
+
+
+class QuizEngine:
+    def __init__(self, catalog, history=None, store=None, rng=None, clock=time.time):
+        # store: an attempt_store.AttemptStore to log attempts and answers (optional)
+        self.catalog = catalog
+        self.store = store
+        if history is None:
+            history = ReviewHistory(store.path, writer=store.writer) if store is not None else ReviewHistory()
+        self.history = history
+        self.history.migrate_positions(catalog.quiz_id)
+        self.rng = rng or random.Random()
+        self.clock = clock
+
+    def start(self, subject, learner=DEFAULT_LEARNER, length=QUIZ_LENGTH):
+        return QuizSession(self, learner, subject, self.pick(subject, learner, length))
+
+    def pick(self, subject, learner, length):
+        bank_size = self.catalog.quiz_count(subject)
+        length = min(length, bank_size)
+        now = self.clock()
+        self.history.flush()
+        # Reviews of questions since removed from the bank are left out
+        due = self.history.due(learner, subject, now, length)
+        positions = self.catalog.quiz_positions(subject, due)
+        picked = [positions[question] for question in due if question in positions]
+        # Strong learners see more new material, weak ones more review
+        accuracy = self.history.accuracy(learner, subject)
+        new_share = 0.5 if accuracy is None else min(0.8, max(0.3, accuracy))
+        want_new = length - len(picked) if accuracy is None else max(0, round((length - len(picked)) * new_share))
+        picked.extend(self._sample_unseen(subject, learner, bank_size, want_new, set(picked)))
+        if len(picked) < length:
+            picked.extend(self._sample_weak(subject, learner, now, length - len(picked), set(picked)))
+        if len(picked) < length:
+            picked.extend(self._sample_unseen(subject, learner, bank_size, length - len(picked), set(picked)))
+        self.rng.shuffle(picked)
+        return picked
+
+    def _sample_unseen(self, subject, learner, bank_size, k, exclude):
+        # Rejection sampling over positions: only the candidates drawn are looked up.
+        # The seen count may include questions no longer in the bank, so unseen is a lower bound;
+        # rejection is only used while it surely has k candidates left to find
+        if k <= 0:
+            return []
+        unseen = bank_size - self.history.seen_count(learner, subject)
+        if unseen < bank_size // 4 or unseen - len(exclude) < k:
+            # Mostly seen bank: rejection would keep missing, so sample the remaining positions directly
+            seen = set(self.catalog.quiz_positions(subject, self.history.seen_questions(learner, subject)).values())
+            remaining = (p for p in range(bank_size) if p not in exclude and p not in seen)
+            return weighted_sample(remaining, itertools.repeat(1.0), k, self.rng)
+        found = []
+        taken = set(exclude)
+        while len(found) < k:
+            position = self.rng.randrange(bank_size)
+            if position in taken:
+                continue
+            taken.add(position)
+            if not self.history.seen(learner, subject, self.catalog.quiz_id(subject, position)):
+                found.append(position)
+        return found
+
+    def _sample_weak(self, subject, learner, now, k, exclude):
+        reviewed = self.history.reviewed(learner, subject, now)
+        positions = self.catalog.quiz_positions(subject, (question for question, _ in reviewed))
+        rows = [(positions[question], box) for question, box in reviewed
+                if question in positions and positions[question] not in exclude]
+        return weighted_sample((p for p, _ in rows), (1.0 / (box + 1) for _, box in rows), k, self.rng)
@@ -0,0 +1,191 @@
+"""
+Search index over the resource catalog (subject -> [{"name", "url"}], or a
+stream of (subject, {"name", "url"}) pairs straight from catalog.Catalog).
+- Built once: names, subjects and URL words are tokenized, and Kiswahili /
+  English equivalents are indexed alongside, so "hisabati" finds Mathematics
+- Prefix matching through a sorted vocabulary (bisect), typo tolerance
+  through a deletion-neighbourhood table (one edit, two for long words)
+- Results are scored by match quality, field and rarity (IDF), and only the
+  top hits are ranked, so lookups stay fast for tens of thousands of links
+"""
+
+import bisect
+import heapq
+import math
+import re
+from urllib.parse import urlparse
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Both directions are indexed, so a query in either language finds the resource
+SYNONYMS = {
+    "mathematics": ["hisabati", "math", "maths"],
+    "math": ["hisabati", "mathematics"],
+    "science": ["sayansi"],
+    "geography": ["jiografia"],
+    "history": ["historia"],
+    "civics": ["uraia"],
+    "english": ["kiingereza"],
+    "kiswahili": ["swahili"],
+    "books": ["vitabu", "textbooks"],
+    "textbooks": ["vitabu", "books"],
+    "book": ["kitabu"],
+    "papers": ["mitihani"],
+    "past": ["iliyopita"],
+    "lessons": ["masomo"],
+    "simulations": ["majaribio"],
+}
+REVERSE_SYNONYMS = {}
+for _word, _others in SYNONYMS.items():
+    for _other in _others:
+        REVERSE_SYNONYMS.setdefault(_other, []).append(_word)
+
+FIELD_WEIGHTS = {"name": 1.0, "subject": 0.7, "alias": 0.6, "url": 0.3}
+MATCH_WEIGHTS = {"exact": 3.0, "prefix": 2.0, "fuzzy": 1.0}
+URL_STOPWORDS = {"https", "http", "www", "com", "org", "go", "tz", "html", "php", "results", "search_query"}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def url_tokens(url):
+    parsed = urlparse(url)
+    words = tokenize(parsed.netloc) + tokenize(parsed.path.replace("_", " ")) + tokenize(parsed.query.replace("+", " "))
+    return [w for w in words if w not in URL_STOPWORDS]
+
+
+def deletions(word, distance):
+    # Every string reachable from word by removing up to `distance` characters
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a, b, limit):
+    # Damerau-Levenshtein with an early exit once every cell in a row exceeds limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def typo_budget(word):
+    if len(word) >= 8:
+        return 2
+    if len(word) >= 4:
+        return 1
+    return 0
+
+
+class ResourceIndex:
+    def __init__(self, resources):
+        # resources: {subject: [{"name": ..., "url": ...}, ...]} or an iterable of (subject, res)
+        self.docs = []
+        self.postings = {}      # token -> {doc_id: best field weight}
+        self.deletes = {}       # deletion variant -> {token}
+        if isinstance(resources, dict):
+            resources = ((subject, res) for subject, links in resources.items() for res in links)
+        for subject, res in resources:
+            self._add(subject, res)
+        self.vocabulary = sorted(self.postings)
+
+    def add(self, subject, res):
+        # Incremental insert after the initial build
+        new_tokens = self._add(subject, res)
+        for token in new_tokens:
+            bisect.insort(self.vocabulary, token)
+
+    def _add(self, subject, res):
+        doc_id = len(self.docs)
+        self.docs.append((res["name"], subject, res["url"]))
+        fields = [("name", tokenize(res["name"])), ("subject", tokenize(subject)), ("url", url_tokens(res["url"]))]
+        aliases = []
+        for _, words in fields[:2]:
+            for word in words:
+                aliases.extend(SYNONYMS.get(word, ()))
+                aliases.extend(REVERSE_SYNONYMS.get(word, ()))
+        fields.append(("alias", aliases))
+        new_tokens = []
+        for field, words in fields:
+            weight = FIELD_WEIGHTS[field]
+            for word in words:
+                postings = self.postings.get(word)
+                if postings is None:
+                    postings = self.postings[word] = {}
+                    new_tokens.append(word)
+                    for variant in deletions(word, typo_budget(word)):
+                        self.deletes.setdefault(variant, set()).add(word)
+                if postings.get(doc_id, 0) < weight:
+                    postings[doc_id] = weight
+        return new_tokens
+
+    def __len__(self):
+        return len(self.docs)
+
+    # ---------- Query ----------
+
+    def search(self, query, limit=50):
+        # [(score, name, subject, url)] best first
+        terms = tokenize(query)
+        if not terms:
+            return []
+        per_term = [self._term_scores(term) for term in terms]
+        # Every word should match; if that leaves nothing, rank by whatever did match
+        candidates = set.intersection(*(set(scores) for scores in per_term))
+        if not candidates:
+            candidates = set().union(*per_term)
+        ranked = heapq.nlargest(limit, candidates,
+                                key=lambda doc_id: (sum(s.get(doc_id, 0.0) for s in per_term), -doc_id))
+        results = []
+        for doc_id in ranked:
+            name, subject, url = self.docs[doc_id]
+            results.append((sum(s.get(doc_id, 0.0) for s in per_term), name, subject, url))
+        return results
+
+    def _term_scores(self, term):
+        scores = {}
+        for token, kind in self._expand(term):
+            postings = self.postings[token]
+            idf = math.log(1 + len(self.docs) / len(postings))
+            for doc_id, field_weight in postings.items():
+                score = MATCH_WEIGHTS[kind] * field_weight * idf
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def _expand(self, term, max_prefix=200):
+        # Vocabulary tokens that match term exactly, as a prefix, or within the typo budget
+        matches = {}
+        if term in self.postings:
+            matches[term] = "exact"
+        start = bisect.bisect_left(self.vocabulary, term)
+        for token in self.vocabulary[start:start + max_prefix]:
+            if not token.startswith(term):
+                break
+            matches.setdefault(token, "prefix")
+        budget = typo_budget(term)
+        if budget:
+            seen = set()
+            for variant in deletions(term, budget):
+                for token in self.deletes.get(variant, ()):
+                    if token in matches or token in seen:
+                        continue
+                    seen.add(token)
+                    if edit_distance(term, token, budget) <= budget:
+                        matches[token] = "fuzzy"
+        return matches.items()
@@ -0,0 +1,210 @@
+"""
+Watchdog for stalls of the Tk thread.
+- A root.after heartbeat stamps the time every 50 ms. A watchdog thread
+  checks the stamp; once it is older than the threshold (250 ms) the event
+  loop is stuck and the thread samples the main thread's Python stack
+  every 10 ms until the heartbeat comes back
+- Each stall is logged as one JSON line (logs/stalls.jsonl in the working
+  directory) with its duration, the call that was running in most samples
+  (innermost frame, usually inside a library) and the app's own frame that
+  made it, plus that stack; a one-line note goes to stderr as well
+- When the app exits, the worst offenders of the session are printed,
+  grouped by the app frame that blocked. The same report over log files
+  collected from several machines:
+
+    python stall_watchdog.py logs/stalls.jsonl other-pc/stalls.jsonl --top 10
+
+- Stalls also appear as spans in the perf trace when tracing is on
+- While the loop runs, the watchdog thread only wakes when the heartbeat
+  would be overdue (a few times a second); it samples every 10 ms only
+  during a stall
+- --no-watchdog on an app's command line turns it off (the app's main
+  checks it, see wanted)
+"""
+
+import argparse
+import atexit
+import collections
+import datetime
+import json
+import linecache
+import os
+import sys
+import threading
+import time
+
+from perf import tracer
+
+FLAG_OFF = "--no-watchdog"
+HEARTBEAT_SECONDS = 0.05
+THRESHOLD_SECONDS = 0.25
+SAMPLE_SECONDS = 0.01
+STACK_DEPTH = 40
+LOG_PATH = os.path.join("logs", "stalls.jsonl")
+# Frames in files under this directory are the app's own code
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def wanted(argv):
+    return FLAG_OFF not in argv
+
+
+def describe(frame):
+    filename, lineno, name = frame
+    return f"{os.path.relpath(filename, APP_DIR) if is_app_file(filename) else filename}:{lineno} in {name}"
+
+
+def is_app_file(filename):
+    return (filename.startswith(APP_DIR + os.sep) and "site-packages" not in filename
+            and not filename.endswith("stall_watchdog.py"))
+
+
+class StallWatchdog:
+    def __init__(self, root, threshold=THRESHOLD_SECONDS, log_path=LOG_PATH, enabled=True):
+        self.root = root
+        self.enabled = enabled
+        self.threshold = threshold
+        self.log_path = log_path
+        self.stalls = []            # logged records of this session
+        self._last_beat = None      # perf_counter of the latest heartbeat; None until the loop runs
+        self._stop = threading.Event()
+        self._thread = None
+        self._main_id = threading.main_thread().ident
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return self
+        self.root.bind("<Destroy>", self._destroyed, add="+")
+        self.root.after(0, self._beat)
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if self.stalls:
+            print("\n".join(report_lines(self.stalls, top=5)), file=sys.stderr)
+
+    # ---------- Tk thread ----------
+
+    def _beat(self):
+        self._last_beat = time.perf_counter()
+        if not self._stop.is_set():
+            self.root.after(int(HEARTBEAT_SECONDS * 1000), self._beat)
+
+    def _destroyed(self, event):
+        # The root binding also sees its children being destroyed
+        if event.widget is self.root:
+            self._stop.set()
+
+    # ---------- Watchdog thread ----------
+
+    def _watch(self):
+        while True:
+            # Sleep until the heartbeat would be overdue; a beat in the meantime just moves the deadline
+            beat = self._last_beat
+            wait = self.threshold if beat is None else beat + self.threshold + HEARTBEAT_SECONDS - time.perf_counter()
+            if wait > 0:
+                if self._stop.wait(wait):
+                    return
+                continue
+            samples = collections.Counter()
+            while self._last_beat == beat and not self._stop.is_set():
+                stack = self._main_stack()
+                if stack:
+                    samples[stack] += 1
+                time.sleep(SAMPLE_SECONDS)
+            if self._stop.is_set():
+                return
+            # The loop was due at beat + one interval; everything after that was the stall
+            start = beat + HEARTBEAT_SECONDS
+            self._log(start, self._last_beat, samples)
+
+    def _main_stack(self):
+        frame = sys._current_frames().get(self._main_id)
+        stack = []
+        while frame is not None and len(stack) < STACK_DEPTH:
+            stack.append((frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name))
+            frame = frame.f_back
+        return tuple(reversed(stack))       # outermost first
+
+    def _log(self, start, end, samples):
+        record = stall_record(start, end, samples)
+        self.stalls.append(record)
+        print(f"[watchdog] main thread blocked {record['duration_ms'] / 1000:.2f} s in {record['app_frame']}"
+              f"{': ' + record['call'] if record['call'] else ''}", file=sys.stderr)
+        if tracer.enabled:
+            tracer.record("stall", start, end, where=record["app_frame"], blocking=record["blocking"])
+        if self.log_path:
+            try:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError:
+                pass
+
+
+def stall_record(start, end, samples):
+    total = sum(samples.values())
+    stack = samples.most_common(1)[0][0] if samples else ()
+    app_frames = [frame for frame in stack if is_app_file(frame[0])]
+    app_frame = app_frames[-1] if app_frames else (stack[-1] if stack else None)
+    innermost = stack[-1] if stack else None
+    return {
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "app": os.path.basename(sys.argv[0]),
+        "duration_ms": round((end - start) * 1000, 1),
+        "samples": total,
+        # Share of samples in the most common stack: low means the stall moved between calls
+        "share": round(samples.most_common(1)[0][1] / total, 2) if samples else 0.0,
+        "app_frame": describe(app_frame) if app_frame else "?",
+        "call": linecache.getline(app_frame[0], app_frame[1]).strip() if app_frame else "",
+        "blocking": describe(innermost) if innermost else "?",
+        "stack": [describe(frame) for frame in stack[-12:]],
+    }
+
+
+def report_lines(records, top=10):
+    groups = collections.defaultdict(list)
+    for record in records:
+        groups[record["app_frame"]].append(record)
+    worst = sorted(groups.items(), key=lambda item: -sum(r["duration_ms"] for r in item[1]))[:top]
+    lines = [f"[watchdog] {len(records)} stall(s), {sum(r['duration_ms'] for r in records) / 1000:.1f} s blocked; "
+             f"worst offenders:"]
+    for where, group in worst:
+        longest = max(group, key=lambda r: r["duration_ms"])
+        lines.append(f"[watchdog]   {sum(r['duration_ms'] for r in group) / 1000:7.2f} s  {len(group):4d}x  "
+                     f"max {longest['duration_ms'] / 1000:6.2f} s  {where}")
+        if longest["call"]:
+            lines.append(f"[watchdog]   {'':<32}{longest['call']}")
+        if longest["blocking"] != where:
+            lines.append(f"[watchdog]   {'':<32}blocked in {longest['blocking']}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize stall logs written by the apps' watchdog.")
+    parser.add_argument("logs", nargs="+", help="stalls.jsonl files")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+    records = []
+    for path in args.logs:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue    # torn line from a crash
+    if not records:
+        print("no stalls logged")
+        return
+    print("\n".join(line.replace("[watchdog] ", "", 1) for line in report_lines(records, args.top)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Startup profiling for the three apps:
+
+    python damas.py --profile-startup
+    python damasapp3.py/damasapp3.py --profile-startup
+
+- Each app imports this module before tkinter and its own modules and,
+  when run as a script, hands it the command line right away
+  (profile_from_command_line). With --profile-startup every module
+  imported after that is timed (with and without what it imported in
+  turn); without the flag the import machinery is left alone and marks
+  cost one attribute check
+- The app marks its stages (core opened, window built, tabs filled ...)
+  and the first paint is taken from the first <Expose> of the main window
+- When the app says it is ready, a report goes to stderr: time to first
+  paint, time to ready, each stage and the slowest imports. Modules
+  loaded later, on first use, are reported as they load
+"""
+
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+
+FLAG = "--profile-startup"
+START = time.perf_counter()
+# Imports faster than this are left out of the report
+REPORT_MIN_SECONDS = 0.002
+
+
+class StartupProfile:
+    def __init__(self, enabled=False):
+        self.enabled = False
+        self.marks = []             # (label, seconds since START)
+        self.imports = []           # (module, total, own, nested) for every module loaded while timing
+        self.first_paint = None
+        self.ready_at = None
+        self._local = threading.local()
+        self._real_import = None
+        if enabled:
+            self.start()
+
+    def start(self):
+        # Time every import from here on
+        if self.enabled:
+            return
+        self.enabled = True
+        self._real_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    # ---------- Marks (Tk thread) ----------
+
+    def mark(self, label):
+        if self.enabled:
+            self.marks.append((label, time.perf_counter() - START))
+
+    def watch_first_paint(self, window):
+        if not self.enabled:
+            return
+
+        def exposed(event):
+            if self.first_paint is None:
+                self.first_paint = time.perf_counter() - START
+                window.unbind("<Expose>", binding)
+                if self.ready_at is not None:
+                    self.report()
+
+        binding = window.bind("<Expose>", exposed, add="+")
+
+    def ready(self):
+        # The window is fully populated; reported once the first paint has also happened
+        if not self.enabled or self.ready_at is not None:
+            return
+        self.ready_at = time.perf_counter() - START
+        if self.first_paint is not None:
+            self.report()
+
+    # ---------- Import timing ----------
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = name
+        if level:
+            try:
+                module = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+            except (ImportError, ValueError):
+                pass
+        if module in sys.modules:
+            submodules = self._new_submodules(module, fromlist)
+            if not submodules:
+                return self._real_import(name, globals, locals, fromlist, level)
+            module = ", ".join(f"{module}.{item}" for item in submodules)
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._real_import(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += total
+            self.imports.append((module, total, total - nested, len(stack)))
+            if self.ready_at is not None and not stack and total >= REPORT_MIN_SECONDS:
+                print(f"[startup] first use: {module} imported in {total * 1000:.1f} ms "
+                      f"(at {time.perf_counter() - START:.2f} s)", file=sys.stderr)
+
+    @staticmethod
+    def _new_submodules(module, fromlist):
+        # "from package import submodule" loads modules under a package that is already there
+        package = sys.modules[module]
+        if not fromlist or not hasattr(package, "__path__"):
+            return []
+        return [item for item in fromlist
+                if item != "*" and f"{module}.{item}" not in sys.modules and not hasattr(package, item)]
+
+    # ---------- Report ----------
+
+    def report(self, file=None, top=12):
+        file = file or sys.stderr
+        print(f"[startup] first paint {self.first_paint * 1000:.0f} ms, ready {self.ready_at * 1000:.0f} ms",
+              file=file)
+        previous = 0.0
+        for label, at in self.marks:
+            print(f"[startup]   {label:<24} {(at - previous) * 1000:8.1f} ms   (at {at * 1000:.0f} ms)", file=file)
+            previous = at
+        direct = [entry for entry in self.imports if entry[3] == 0]
+        print(f"[startup] imports: {len(self.imports)} modules, "
+              f"{sum(entry[1] for entry in direct) * 1000:.0f} ms in total", file=file)
+        # Imports made by the app itself, with everything they pulled in, then the costliest modules
+        for title, entries, key in (("imported by the app", direct, 1), ("slowest modules", self.imports, 2)):
+            print(f"[startup]   {title:<32} {'total ms':>9} {'own ms':>8}", file=file)
+            for module, total, own, _ in sorted(entries, key=lambda entry: -entry[key])[:top]:
+                if (total, own)[key - 1] < REPORT_MIN_SECONDS:
+                    break
+                print(f"[startup]   {module:<32} {total * 1000:9.1f} {own * 1000:8.1f}", file=file)
+
+
+profile = StartupProfile()
+
+
+def profile_from_command_line(argv):
+    # --profile-startup: called by an app run as a script, before its own imports
+    if FLAG in argv:
+        profile.start()
+    return profile.enabled
@@ -0,0 +1,200 @@
+"""
+Windowed renderer for topic pages (description, headings, worked examples).
+- Blocks are drawn as canvas text / rectangle items instead of one Frame and
+  Label per example, and only the blocks inside the viewport (plus a small
+  overscan margin) have items at all
+- Items scrolled out of view go back to a per-style pool and are reused for
+  the blocks scrolling in, so scrolling never creates or destroys widgets
+- Text is wrapped in Python (word widths are measured once per font) and the
+  resulting layout is cached per wrap width, so resizing back and forth
+  does not re-measure anything
+"""
+
+import bisect
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import font as tkfont
+from tkinter import ttk
+
+WRAP_LENGTH = 600
+MAX_LAYOUTS = 8
+
+# margin: space around the block, padding: space inside its box
+STYLES = {
+    "body": {"font": ("Arial", 12), "fg": "black", "box": None, "margin": (20, 20, 20, 20), "padding": 0},
+    "heading": {"font": ("Arial", 14, "bold"), "fg": "black", "box": None, "margin": (20, 20, 20, 10), "padding": 0},
+    "example": {"font": ("Courier", 11), "fg": "black", "box": "#f9f9f9", "outline": "#b0b0b0",
+                "margin": (20, 5, 20, 5), "padding": 10},
+}
+
+
+class TextMeasure:
+    """Word widths for one font, measured once and cached."""
+
+    def __init__(self, font):
+        self.font = font
+        self.linespace = font.metrics("linespace")
+        self.fixed = font.metrics("fixed")
+        self.char_width = font.measure("0")
+        self.space = font.measure(" ")
+        self._words = {}
+
+    def width(self, text):
+        if self.fixed:
+            return len(text) * self.char_width
+        w = self._words.get(text)
+        if w is None:
+            w = self._words[text] = self.font.measure(text)
+        return w
+
+    def wrap(self, text, width):
+        lines = []
+        for para in text.split("\n"):
+            if self.width(para) <= width:
+                lines.append(para)
+                continue
+            # Keep the paragraph's indentation on its first line (code examples)
+            indent = para[:len(para) - len(para.lstrip(" "))]
+            line, line_w = indent, self.width(indent)
+            for word in para.split():
+                word_w = self.width(word)
+                if line.strip() and line_w + self.space + word_w > width:
+                    lines.append(line)
+                    line, line_w = word, word_w
+                elif line.strip():
+                    line, line_w = f"{line} {word}", line_w + self.space + word_w
+                else:
+                    line, line_w = line + word, line_w + word_w
+            lines.append(line)
+        return lines
+
+
+class Layout:
+    """Wrapped text and vertical position of every block at one wrap width."""
+
+    def __init__(self, blocks, measures, wrap_width):
+        self.tops = []
+        self.heights = []
+        self.texts = []
+        y = 0
+        for style_name, text in blocks:
+            style = STYLES[style_name]
+            left, top, right, bottom = style["margin"]
+            pad = style["padding"]
+            measure = measures[style_name]
+            lines = measure.wrap(text, wrap_width - 2 * pad)
+            height = len(lines) * measure.linespace + 2 * pad
+            y += top
+            self.tops.append(y)
+            self.heights.append(height)
+            self.texts.append("\n".join(lines))
+            y += height + bottom
+        self.total_height = y
+
+
+class TopicBody:
+    def __init__(self, parent, blocks, bg="white", overscan=400):
+        # blocks: [(style name, text)] in display order
+        self.blocks = blocks
+        self.overscan = overscan
+        self.canvas = tk.Canvas(parent, bg=bg, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.measures = {name: TextMeasure(tkfont.Font(root=self.canvas, font=style["font"]))
+                         for name, style in STYLES.items()}
+        self.layouts = OrderedDict()    # wrap width -> Layout, most recently used last
+        self.layout = None
+        self.view_width = 0
+        self.shown = {}                 # block index -> (box item or None, text item)
+        self.pool = {name: [] for name in STYLES}
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.yview("scroll", -3, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.yview("scroll", 3, "units"))
+
+    def pack(self):
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self._render()
+
+    def item_count(self):
+        return sum(2 if box else 1 for box, _ in self.shown.values())
+
+    # ---------- Layout ----------
+
+    def _layout_for(self, wrap_width):
+        layout = self.layouts.get(wrap_width)
+        if layout is None:
+            layout = self.layouts[wrap_width] = Layout(self.blocks, self.measures, wrap_width)
+            if len(self.layouts) > MAX_LAYOUTS:
+                self.layouts.popitem(last=False)
+        self.layouts.move_to_end(wrap_width)
+        return layout
+
+    def _on_configure(self, event):
+        wrap_width = max(100, min(WRAP_LENGTH, event.width - 40))
+        layout = self._layout_for(wrap_width)
+        if layout is not self.layout or event.width != self.view_width:
+            self.layout = layout
+            self.view_width = event.width
+            self.canvas.configure(scrollregion=(0, 0, event.width, layout.total_height),
+                                  yscrollincrement=self.measures["body"].linespace)
+            # Positions, wrapping or box widths changed: give every item back and redraw the viewport
+            for index in list(self.shown):
+                self._release(index)
+        self._render()
+
+    def _on_wheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+
+    # ---------- Windowing ----------
+
+    def _render(self):
+        layout = self.layout
+        if layout is None:
+            return
+        top = self.canvas.canvasy(0) - self.overscan
+        bottom = self.canvas.canvasy(self.canvas.winfo_height()) + self.overscan
+        first = max(0, bisect.bisect_right(layout.tops, top) - 1)
+        last = bisect.bisect_left(layout.tops, bottom)
+        for index in list(self.shown):
+            if not first <= index < last:
+                self._release(index)
+        for index in range(first, last):
+            if index not in self.shown:
+                self._draw(index)
+
+    def _draw(self, index):
+        layout = self.layout
+        style_name = self.blocks[index][0]
+        style = STYLES[style_name]
+        left = style["margin"][0]
+        pad = style["padding"]
+        y = layout.tops[index]
+        pool = self.pool[style_name]
+        if pool:
+            box, text = pool.pop()
+            self.canvas.itemconfigure(text, text=layout.texts[index], state="normal")
+            if box:
+                self.canvas.itemconfigure(box, state="normal")
+        else:
+            box = None
+            if style["box"]:
+                box = self.canvas.create_rectangle(0, 0, 0, 0, fill=style["box"], outline=style["outline"])
+            text = self.canvas.create_text(0, 0, text=layout.texts[index], anchor="nw",
+                                           font=self.measures[style_name].font, fill=style["fg"])
+        if box:
+            width = max(self.view_width - 2 * left, 0)
+            self.canvas.coords(box, left, y, left + width, y + layout.heights[index])
+        self.canvas.coords(text, left + pad, y + pad)
+        self.shown[index] = (box, text)
+
+    def _release(self, index):
+        box, text = self.shown.pop(index)
+        self.canvas.itemconfigure(text, state="hidden")
+        if box:
+            self.canvas.itemconfigure(box, state="hidden")
+        self.pool[self.blocks[index][0]].append((box, text))
@@ -0,0 +1,95 @@
+"""
+Page cache for the Education Hub content area.
+
+Each page (a subject, the welcome screen, the quiz list, ...) is built into
+its own Frame the first time it is shown. Switching pages afterwards only
+unpacks the current frame and packs the cached one, so nothing is rebuilt.
+Pages are kept in least-recently-used order and the oldest are destroyed
+once the cached pages hold more than max_widgets widgets in total (a page
+is recounted when it is left, since tabs inside it fill in lazily).
+"""
+
+import tkinter as tk
+from collections import OrderedDict
+
+
+def count_widgets(widget):
+    count = 1
+    stack = list(widget.winfo_children())
+    while stack:
+        child = stack.pop()
+        count += 1
+        stack.extend(child.winfo_children())
+    return count
+
+
+class ViewCache:
+    def __init__(self, container, bg="white", max_widgets=4000):
+        self.container = container
+        self.bg = bg
+        self.max_widgets = max_widgets
+        self.views = OrderedDict()  # key -> (frame, widget count), least recently used first
+        self.current = None
+        self._transient = None
+
+    def show(self, key, build):
+        # build(frame) fills a new frame the first time key is shown
+        self._recount_current()
+        if key in self.views:
+            frame = self.views[key][0]
+            self.views.move_to_end(key)
+        else:
+            frame = tk.Frame(self.container, bg=self.bg)
+            build(frame)
+            self.views[key] = (frame, count_widgets(frame))
+        self._swap(frame)
+        self._evict()
+        return frame
+
+    def show_transient(self):
+        # A fresh, uncached frame for one-off pages (quiz questions, results); replaces the previous one
+        frame = tk.Frame(self.container, bg=self.bg)
+        self._swap(frame)
+        return frame
+
+    def invalidate(self, key):
+        entry = self.views.pop(key, None)
+        if entry is not None:
+            if self.current is entry[0]:
+                self.current = None
+            entry[0].destroy()
+
+    def _recount_current(self):
+        # Pages can keep growing after they are built (tabs filled on first view)
+        for key, (frame, count) in self.views.items():
+            if frame is self.current:
+                self.views[key] = (frame, count_widgets(frame))
+                break
+
+    def widget_count(self):
+        return sum(count for _, count in self.views.values())
+
+    def _swap(self, frame):
+        if self.current is frame:
+            return
+        if self.current is not None:
+            self.current.pack_forget()
+        if self._transient is not None and self._transient is not frame:
+            self._transient.destroy()
+            self._transient = None
+        if not any(frame is cached for cached, _ in self.views.values()):
+            self._transient = frame
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.current = frame
+
+    def _evict(self):
+        total = self.widget_count()
+        for key in list(self.views):
+            if total <= self.max_widgets:
+                break
+            frame, count = self.views[key]
+            if frame is self.current:
+                continue
+            del self.views[key]
+            frame.destroy()
+            total -= count